@@ -0,0 +1,237 @@
+"""
+Dashboard analysis of a resume (score, breakdown, skill gap, salary) and its cache.
+
+A resume's skills never change after upload, so the analysis is computed
+once - when the resume is stored - and persisted next to the row in
+``resume_analysis`` as ready-to-send JSON with its ETag. ``AnalysisCache``
+keeps recently served results in memory (LRU, bounded size and TTL). Rows
+written under another ``ANALYSIS_VERSION`` (scoring code, salary table or
+extractor changed) are recomputed on first read.
+
+Salary estimates come from ``salary_table``, loaded once from the CSV at
+SALARY_DATA_PATH (default: salaries.csv next to this file) into a dict keyed
+by normalized skill name; the chart shows the SALARY_CHART_SKILLS best paid
+of all the resume's technical skills.
+"""
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import inference
+from extraction import EXTRACTOR_VERSION, HAS_NLP
+from metrics import ANALYSIS_CACHE, NLP_FALLBACKS, span
+
+
+ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE', 4096))
+ANALYSIS_CACHE_TTL = float(os.environ.get('ANALYSIS_CACHE_TTL', 3600))
+SALARY_DATA_PATH = os.environ.get('SALARY_DATA_PATH',
+                                  os.path.join(os.path.dirname(os.path.abspath(__file__)), 'salaries.csv'))
+SALARY_CHART_SKILLS = 6
+# shown when none of a resume's skills has salary data
+GENERAL_SALARY = 60000
+
+# Built-in medians, used when the salary data file cannot be read
+SALARY_MAPPING = {
+    'python': 95000,
+    'react': 85000,
+    'machine_learning': 120000,
+    'aws': 110000,
+    'docker': 100000,
+    'node.js': 90000,
+    'javascript': 85000,
+    'sql': 80000
+}
+
+
+def salary_key(skill):
+    """Normalized lookup key of a skill name ('Machine Learning' -> 'machine_learning')."""
+    return '_'.join(skill.lower().replace('_', ' ').split())
+
+
+class SalaryTable:
+    """Market salary bands per skill: salary_key -> {'p25', 'median', 'p75'}."""
+
+    def __init__(self, rows):
+        self._rows = {salary_key(skill): band for skill, band in rows.items()}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def fingerprint(self):
+        data = json.dumps(self._rows, sort_keys=True).encode('utf-8')
+        return hashlib.sha1(data).hexdigest()[:12]
+
+    def get(self, skill):
+        """The salary band of a skill, or None."""
+        return self._rows.get(salary_key(skill))
+
+    def estimates(self, skills, limit=SALARY_CHART_SKILLS):
+        """(skill, band) for the best-paid skills with data, highest median first."""
+        known = [(skill, self.get(skill)) for skill in dict.fromkeys(skills)]
+        known = [(skill, band) for skill, band in known if band]
+        known.sort(key=lambda item: item[1]['median'], reverse=True)
+        return known[:limit]
+
+
+def load_salary_table(path):
+    """Read a skill,p25,median,p75 CSV; falls back to SALARY_MAPPING (median only) if it cannot be read."""
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return SalaryTable({row['skill']: {'p25': int(row['p25']), 'median': int(row['median']),
+                                               'p75': int(row['p75'])} for row in csv.DictReader(f)})
+    except Exception as e:
+        print(f'Failed to load salary data {path}, using built-in medians: {e}')
+        return SalaryTable({skill: {'p25': value, 'median': value, 'p75': value}
+                            for skill, value in SALARY_MAPPING.items()})
+
+
+salary_table = load_salary_table(SALARY_DATA_PATH)
+# Bump when the scoring heuristic changes; salary data changes are covered by its fingerprint
+SCORING_VERSION = 'score-2' + ('+nlp' if HAS_NLP else '')
+ANALYSIS_VERSION = f'{SCORING_VERSION}:{EXTRACTOR_VERSION}:{salary_table.fingerprint()}'
+
+
+def init_analysis(db):
+    """Create the resume_analysis table if it does not exist."""
+    db.execute('''CREATE TABLE IF NOT EXISTS resume_analysis (
+        resume_id INTEGER PRIMARY KEY,
+        version TEXT NOT NULL,
+        etag TEXT NOT NULL,
+        body TEXT NOT NULL
+    )''')
+
+
+def compute_analysis(resume_id, filename, skills):
+    """Return chart-ready metrics for a resume's extracted skills."""
+    tech_skills = skills.get('technical_skills', [])
+    soft_skills = skills.get('soft_skills', [])
+    certs = skills.get('certifications', [])
+    tech_count = len(tech_skills)
+    soft_count = len(soft_skills)
+    cert_count = len(certs)
+
+    # If NLP module offers a scoring helper, use it for a more consistent score & breakdown
+    score = None
+    breakdown = None
+    if HAS_NLP:
+        try:
+            score_info = inference.nlp_call('compute_match_score', {
+                'technical_skills': tech_skills,
+                'soft_skills': soft_skills,
+                'certifications': certs
+            })
+            score = int(score_info.get('score', 0))
+            breakdown = score_info.get('breakdown', None)
+        except Exception as e:
+            NLP_FALLBACKS.inc(operation='compute_match_score')
+            print('NLP scoring failed, falling back to simple heuristic:', e)
+
+    if score is None:
+        # legacy heuristic fallback
+        score = min(99, 40 + tech_count * 8 + soft_count * 4 + cert_count * 6)
+        breakdown = {
+            'technical_pct': min(100, tech_count * 8),
+            'soft_pct': min(100, soft_count * 6),
+            'cert_pct': min(100, cert_count * 10)
+        }
+
+    competency_values = [
+        breakdown.get('technical_pct', 0),
+        breakdown.get('soft_pct', 0),
+        breakdown.get('cert_pct', 0),
+        score
+    ]
+    estimates = salary_table.estimates(tech_skills)
+    salary_labels = [skill for skill, _band in estimates]
+    salary_values = [band['median'] for _skill, band in estimates]
+    if not salary_labels:
+        salary_labels = ['General']
+        salary_values = [GENERAL_SALARY]
+    return {
+        'resume_id': resume_id,
+        'filename': filename,
+        'score': score,
+        'match_score': score,
+        'breakdown': breakdown,
+        'skills': {
+            'technical_skills': tech_skills,
+            'soft_skills': soft_skills,
+            'certifications': certs
+        },
+        'skill_gap': {
+            'labels': ['Technical Skills', 'Soft Skills', 'Certifications', 'Overall Match'],
+            'values': competency_values
+        },
+        'salary': {
+            'labels': salary_labels,
+            'values': salary_values
+        }
+    }
+
+
+def analysis_record(resume_id, filename, skills):
+    """Compute an analysis and serialize it: {'version', 'etag', 'body'}."""
+    with span('analysis_compute'):
+        body = json.dumps(compute_analysis(resume_id, filename, skills), sort_keys=True, separators=(',', ':'))
+    etag = hashlib.sha1(f'{ANALYSIS_VERSION}\n{body}'.encode('utf-8')).hexdigest()
+    return {'version': ANALYSIS_VERSION, 'etag': etag, 'body': body}
+
+
+class AnalysisCache:
+    """LRU of serialized analyses in front of the resume_analysis rows."""
+
+    def __init__(self, repo, maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL):
+        self.repo = repo
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # resume_id -> (expires, record)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, resume_id, record):
+        with self._lock:
+            self._entries[resume_id] = (time.monotonic() + self.ttl, record)
+            self._entries.move_to_end(resume_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def store(self, resume_id, filename, skills):
+        """Compute and persist the analysis of a newly stored resume."""
+        record = analysis_record(resume_id, filename, skills)
+        self.repo.put_analysis(resume_id, record)
+        self._remember(resume_id, record)
+        return record
+
+    def get(self, resume_id):
+        """Return the analysis record of a resume (computing it if missing or stale), or None if not found."""
+        with self._lock:
+            entry = self._entries.get(resume_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(resume_id)
+                ANALYSIS_CACHE.inc(result='memory')
+                return entry[1]
+        with span('analysis_load'):
+            record = self.repo.get_analysis(resume_id)
+        if record is None or record['version'] != ANALYSIS_VERSION:
+            row = self.repo.get_resume(resume_id, columns=('filename', 'extracted_skills'))
+            if row is None:
+                return None
+            ANALYSIS_CACHE.inc(result='computed')
+            return self.store(row['id'], row['filename'], row['extracted_skills'])
+        ANALYSIS_CACHE.inc(result='stored')
+        self._remember(resume_id, record)
+        return record
+
+    def invalidate(self, resume_id=None):
+        """Forget one resume's cached analysis (or all of them) in this process."""
+        with self._lock:
+            if resume_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(resume_id, None)
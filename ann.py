@@ -0,0 +1,272 @@
+"""
+Approximate nearest-neighbour index over whole-resume embeddings.
+
+An IVF (inverted file) index in plain NumPy: vectors are bucketed by their
+nearest k-means centroid and a query only scans the `nprobe` closest buckets.
+Inserts and deletes are incremental; the index is saved as one .npz file and
+topped up from ``embedding_rows`` at startup, so workers never re-cluster the
+whole matrix on boot.
+"""
+import os
+import tempfile
+import threading
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+ANN_NPROBE = int(os.environ.get('ANN_NPROBE', 8))
+# below this many vectors the index stays a single exact-search list
+ANN_MIN_TRAIN = int(os.environ.get('ANN_MIN_TRAIN', 2048))
+KMEANS_ITERATIONS = 10
+
+
+def default_nlist(n):
+    """Number of IVF lists for n vectors (about sqrt(n))."""
+    return max(1, int(np.sqrt(n)))
+
+
+def train_centroids(vectors, nlist, iterations=KMEANS_ITERATIONS, seed=0):
+    """Spherical k-means on (a sample of) unit vectors; returns (nlist, dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample = vectors
+    if len(vectors) > nlist * 64:
+        sample = vectors[rng.choice(len(vectors), nlist * 64, replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = (sample @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # re-seed empty clusters from random points
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        norms[empty] = np.linalg.norm(sums[empty], axis=1)
+        centroids = sums / norms[:, None]
+    return centroids.astype(np.float32)
+
+
+class _List:
+    """Growable (ids, vectors) bucket."""
+
+    __slots__ = ('ids', 'vectors', 'size')
+
+    def __init__(self, dim, ids=None, vectors=None):
+        if ids is None:
+            ids = np.zeros(0, dtype=np.int64)
+            vectors = np.zeros((0, dim), dtype=np.float32)
+        self.ids = ids
+        self.vectors = vectors
+        self.size = len(ids)
+
+    def append(self, key, vector):
+        if self.size == len(self.ids):
+            capacity = max(8, self.size * 2)
+            ids = np.zeros(capacity, dtype=np.int64)
+            vectors = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+            ids[:self.size] = self.ids[:self.size]
+            vectors[:self.size] = self.vectors[:self.size]
+            self.ids, self.vectors = ids, vectors
+        self.ids[self.size] = key
+        self.vectors[self.size] = vector
+        self.size += 1
+        return self.size - 1
+
+    def pop_at(self, pos):
+        """Remove the entry at pos by moving the last entry into it; returns the moved id or None."""
+        last = self.size - 1
+        moved = None
+        if pos != last:
+            self.ids[pos] = self.ids[last]
+            self.vectors[pos] = self.vectors[last]
+            moved = int(self.ids[pos])
+        self.size = last
+        return moved
+
+
+class IVFIndex:
+    """Inverted-file ANN index of unit vectors keyed by integer id (inner product = cosine)."""
+
+    def __init__(self, dim, nprobe=ANN_NPROBE, min_train=ANN_MIN_TRAIN):
+        if np is None:
+            raise RuntimeError('NumPy is required for the ANN index')
+        self.dim = dim
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.centroids = None
+        self.trained_size = 0
+        self.watermark = -1  # last embedding row folded in by refresh()
+        self.unsaved = 0
+        self._lists = [_List(dim)]
+        self._where = {}  # id -> (list, position)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def _assign(self, vectors):
+        if self.centroids is None:
+            return np.zeros(len(vectors), dtype=np.int64)
+        return (vectors @ self.centroids.T).argmax(axis=1)
+
+    def add(self, key, vector):
+        """Insert or replace one vector."""
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            self.remove(key)
+            li = int(self._assign(vector[None, :])[0])
+            self._where[key] = (li, self._lists[li].append(key, vector))
+            if len(self._where) >= max(self.min_train, 4 * self.trained_size):
+                self.train()
+
+    def add_many(self, keys, vectors):
+        """Insert several vectors (retrains at most once)."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            for key in keys:
+                self.remove(key)
+            for key, li, vector in zip(keys, self._assign(vectors), vectors):
+                self._where[key] = (int(li), self._lists[li].append(key, vector))
+            if len(self._where) >= max(self.min_train, 4 * self.trained_size):
+                self.train()
+
+    def remove(self, key):
+        """Delete a vector; returns True if it was present."""
+        with self._lock:
+            loc = self._where.pop(key, None)
+            if loc is None:
+                return False
+            li, pos = loc
+            moved = self._lists[li].pop_at(pos)
+            if moved is not None:
+                self._where[moved] = (li, pos)
+            return True
+
+    def _all(self):
+        ids = np.concatenate([lst.ids[:lst.size] for lst in self._lists])
+        vectors = np.concatenate([lst.vectors[:lst.size] for lst in self._lists])
+        return ids, vectors
+
+    def train(self, nlist=None):
+        """(Re)cluster every stored vector into nlist lists."""
+        with self._lock:
+            ids, vectors = self._all()
+            nlist = min(nlist or default_nlist(len(ids)), len(ids))
+            self.centroids = train_centroids(vectors, nlist) if len(ids) else None
+            self.trained_size = len(ids)
+            self._rebuild(ids, vectors)
+
+    def _rebuild(self, ids, vectors):
+        assign = self._assign(vectors)
+        nlist = 1 if self.centroids is None else len(self.centroids)
+        order = np.argsort(assign, kind='stable')
+        bounds = np.searchsorted(assign[order], np.arange(nlist + 1))
+        self._lists = []
+        self._where = {}
+        for li in range(nlist):
+            sel = order[bounds[li]:bounds[li + 1]]
+            self._lists.append(_List(self.dim, ids[sel].copy(), vectors[sel].copy()))
+            for pos, key in enumerate(ids[sel].tolist()):
+                self._where[key] = (li, pos)
+
+    def search(self, query, k=10, nprobe=None, exclude=()):
+        """Return [(id, similarity), ...] for the k nearest vectors, best first."""
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        nprobe = nprobe or self.nprobe
+        with self._lock:
+            if self.centroids is None:
+                probe = [0]
+            else:
+                scores = self.centroids @ query
+                n = min(nprobe, len(scores))
+                probe = np.argpartition(-scores, n - 1)[:n]
+            ids = []
+            sims = []
+            for li in probe:
+                lst = self._lists[li]
+                if lst.size:
+                    ids.append(lst.ids[:lst.size])
+                    sims.append(lst.vectors[:lst.size] @ query)
+            if not ids:
+                return []
+            ids = np.concatenate(ids)
+            sims = np.concatenate(sims)
+        if exclude:
+            keep = ~np.isin(ids, np.asarray(list(exclude), dtype=np.int64))
+            ids, sims = ids[keep], sims[keep]
+        k = min(k, len(ids))
+        if k <= 0:
+            return []
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind='stable')]
+        return [(int(ids[i]), float(sims[i])) for i in top]
+
+    def save(self, path):
+        """Write the index atomically to path (.npz)."""
+        with self._lock:
+            ids, vectors = self._all()
+            sizes = np.array([lst.size for lst in self._lists], dtype=np.int64)
+            centroids = self.centroids if self.centroids is not None else np.zeros((0, self.dim), dtype=np.float32)
+            meta = np.array([self.dim, self.trained_size, self.watermark], dtype=np.int64)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, meta=meta, centroids=centroids, sizes=sizes, ids=ids, vectors=vectors)
+            os.replace(tmp, path)
+            self.unsaved = 0
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path, nprobe=ANN_NPROBE, min_train=ANN_MIN_TRAIN):
+        """Load an index written by save()."""
+        with np.load(path) as data:
+            dim, trained_size, watermark = (int(x) for x in data['meta'])
+            index = cls(dim, nprobe=nprobe, min_train=min_train)
+            index.centroids = data['centroids'] if len(data['centroids']) else None
+            index.trained_size = trained_size
+            index.watermark = watermark
+            sizes, ids, vectors = data['sizes'], data['ids'], data['vectors']
+        bounds = np.concatenate([[0], np.cumsum(sizes)])
+        index._lists = [_List(dim, ids[bounds[i]:bounds[i + 1]].copy(), vectors[bounds[i]:bounds[i + 1]].copy())
+                        for i in range(len(sizes))]
+        index._where = {key: (li, pos) for li, lst in enumerate(index._lists)
+                        for pos, key in enumerate(lst.ids.tolist())}
+        return index
+
+    def refresh(self, store, db):
+        """Fold in 'resume' embeddings appended since the last refresh (by any worker); returns the count."""
+        rows = db.execute("SELECT row, resume_id FROM embedding_rows WHERE kind = 'resume' AND row > ? ORDER BY row",
+                          (self.watermark,)).fetchall()
+        if not rows:
+            return 0
+        self.add_many([r[1] for r in rows], store.vectors([r[0] for r in rows]))
+        self.watermark = rows[-1][0]
+        self.unsaved += len(rows)
+        return len(rows)
+
+
+ANN_SAVE_EVERY = int(os.environ.get('ANN_SAVE_EVERY', 256))
+
+
+def open_index(path, store, db):
+    """Load the index from path (or start empty), catch up from db, and persist if it changed much."""
+    index = None
+    if os.path.exists(path):
+        try:
+            index = IVFIndex.load(path)
+        except Exception as e:
+            print(f'Could not load ANN index {path}, rebuilding: {e}')
+    if index is None or index.dim != store.dim:
+        index = IVFIndex(store.dim)
+    index.refresh(store, db)
+    if index.unsaved >= ANN_SAVE_EVERY or not os.path.exists(path):
+        index.save(path)
+    return index
@@ -5,25 +5,42 @@ Flask backend for AI Skill Matcher
 Handles resume uploads, skill extraction, analysis, and real-time updates.
 """
 import os
-import re
 import json
+import shutil
 import sqlite3
-import uuid
+import tempfile
+import threading
+import time
+import zipfile
 from datetime import datetime
-from queue import Queue
-from flask import Flask, request, jsonify, send_from_directory, Response, g, session, redirect, url_for, render_template
+from urllib.parse import quote
+# Startup time is measured from here (framework and model imports, schema, indexes; see create_app)
+IMPORT_STARTED = time.perf_counter()
+from flask import Flask, request, jsonify, Response, g, session, redirect, url_for, render_template, stream_with_context, has_request_context
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
-import PyPDF2
-# Optional NLP module (provides improved skill extraction when installed)
+from werkzeug.utils import secure_filename, send_file
 import sys
-# Ensure backend folder is on sys.path so we can import local nlp.py regardless of how the app is started
+# Ensure backend folder is on sys.path so we can import local modules regardless of how the app is started
 sys.path.insert(0, os.path.dirname(__file__))
-try:
-    import nlp as nlp_module
-except Exception:
-    nlp_module = None
+from extraction import EXTRACTOR_VERSION, extract_resume
+from jobs import ExtractionJobs
+from connections import ConnectionPool, connect
+from db import migrate, resume_row
+from matching import (HAS_NUMPY, MAX_JOB_SKILLS, BitsetMatrix, analyze_match, candidate_skill_list,
+                      score_jobs_for_candidate)
+from search import SkillIndex, normalized_skills
+from repository import iter_resumes, open_repository
+from analysis import AnalysisCache
+from profiles import PROFILE_STATUSES, ProfileMatcher, profile_skills
+from insights import Insights
+import ann
+import auth
+import embeddings
+import events
+import inference
+import ingest
+import metrics
+import storage
 
 
 app = Flask(
@@ -32,107 +49,183 @@ app = Flask(
     static_folder='static',
     static_url_path='/static'
 )
-app.config['UPLOAD_FOLDER'] = 'uploads'
+# DATA_DIR holds data.db and the embedding/ANN files (default: next to this file)
+DATA_DIR = os.environ.get('DATA_DIR', os.path.dirname(os.path.abspath(__file__)))
+app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', 'uploads')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB max upload
 app.config['TEMPLATES_AUTO_RELOAD'] = True  # Enable template auto-reload
+# Default upload mode; clients can override per request with ?async=1 / ?async=0
+app.config['ASYNC_EXTRACTION'] = os.environ.get('ASYNC_EXTRACTION', '').lower() in ('1', 'true', 'yes')
+# Bulk ingestion accepts whole archives and fans extraction out over BULK_WORKERS processes (0 = CPU count)
+app.config['BULK_MAX_CONTENT_LENGTH'] = int(os.environ.get('BULK_MAX_CONTENT_LENGTH', 512 * 1024 * 1024))
+app.config['BULK_WORKERS'] = int(os.environ.get('BULK_WORKERS', 0))
+# SSE: 'memory' (one process), 'sqlite' (several processes on one host) or a redis:// URL
+app.config['SSE_BACKEND'] = os.environ.get('SSE_BACKEND', 'memory')
+app.config['SSE_BUFFER_SIZE'] = int(os.environ.get('SSE_BUFFER_SIZE', 256))
+app.config['SSE_HISTORY_SIZE'] = int(os.environ.get('SSE_HISTORY_SIZE', 1000))
+app.config['SSE_SLOW_CLIENT_POLICY'] = os.environ.get('SSE_SLOW_CLIENT_POLICY', events.DROP)
+app.config['SSE_HEARTBEAT'] = float(os.environ.get('SSE_HEARTBEAT', 15))
+# Downloads: with an X-Accel-Redirect prefix (an `internal` nginx location aliased to UPLOAD_FOLDER,
+# e.g. /_protected_uploads/) the app only authorizes and nginx sends the file; unset, the app serves it
+app.config['DOWNLOAD_ACCEL_PREFIX'] = os.environ.get('DOWNLOAD_ACCEL_PREFIX', '')
 CORS(app)
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 # Minimal secret key for session cookies (override via SECRET_KEY env var in production)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key')
+# PRELOAD_MODELS loads and warms the NLP models in create_app, so gunicorn's preload_app shares them
+# copy-on-write with every worker; MODEL_WARMUP warms them in the background after startup instead.
+# Both are skipped when INFERENCE_SOCKET points at the inference sidecar, which owns the models.
+app.config['PRELOAD_MODELS'] = os.environ.get('PRELOAD_MODELS', '').lower() in ('1', 'true', 'yes')
+app.config['MODEL_WARMUP'] = os.environ.get('MODEL_WARMUP', '').lower() in ('1', 'true', 'yes')
+
+
+# Metrics: /metrics is public unless METRICS_TOKEN is set (then it needs "Authorization: Bearer <token>").
+# PROFILE_SLOW_MS=<ms> turns on the sampling profiler; slower requests are written to PROFILE_DIR.
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+app.config['PROFILE_SLOW_MS'] = float(os.environ.get('PROFILE_SLOW_MS', 0))
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', os.path.join(os.path.dirname(__file__), 'profiles'))
+profiler = (metrics.SamplingProfiler(app.config['PROFILE_DIR'], app.config['PROFILE_SLOW_MS'] / 1000)
+            if app.config['PROFILE_SLOW_MS'] > 0 else None)
+
+
+@app.before_request
+def start_request_timer():
+    """Start the request's latency clock, stage timings and (if enabled) profile."""
+    g._started = time.perf_counter()
+    metrics.begin_request()
+    if profiler is not None:
+        profiler.begin()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Record request latency and return the stage timings as a Server-Timing header."""
+    started = g.pop('_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.REQUEST_SECONDS.observe(elapsed, method=request.method, endpoint=endpoint,
+                                    status=response.status_code)
+    timings = metrics.end_request()
+    if timings:
+        response.headers['Server-Timing'] = metrics.server_timing(timings)
+    if profiler is not None:
+        path = profiler.end(elapsed, f'{request.method}-{endpoint}')
+        if path:
+            print(f'Slow request {request.method} {request.path} ({elapsed * 1000:.0f} ms) profiled to {path}')
+    return response
 
 
 # DB and SSE setup
-DB_PATH = os.path.join(os.path.dirname(__file__), 'data.db')
-subscribers = []
+DB_PATH = os.path.join(DATA_DIR, 'data.db')
+EMBEDDINGS_PATH = os.path.join(DATA_DIR, 'data.embeddings')
+ANN_INDEX_PATH = os.path.join(DATA_DIR, 'data.ann.npz')
+sse_hub = events.SSEHub(events.backend_from_url(app.config['SSE_BACKEND'], DB_PATH),
+                        buffer_size=app.config['SSE_BUFFER_SIZE'],
+                        history_size=app.config['SSE_HISTORY_SIZE'],
+                        policy=app.config['SSE_SLOW_CLIENT_POLICY'])
+
+
+db_pool = ConnectionPool(DB_PATH, row_factory=sqlite3.Row)
+# Resumes and users live in DATABASE_URL (PostgreSQL, sqlite:///path or memory://), else in data.db;
+# node-local tables (extraction cache, jobs, embeddings, SSE events) always stay in data.db
+repo = open_repository(os.environ.get('DATABASE_URL'), DB_PATH, pool=db_pool)
+analysis_cache = AnalysisCache(repo)
+profile_matcher = ProfileMatcher(repo)
+insights = Insights(repo)
 
 
 def get_db():
-    """Get a database connection for the current request context."""
+    """Get a pooled connection to the local SQLite database for the current request context."""
     db = getattr(g, '_database', None)
     if db is None:
-        db = g._database = sqlite3.connect(DB_PATH)
-        db.row_factory = sqlite3.Row
+        db = g._database = db_pool.acquire()
     return db
 
 
 def init_db():
-    """Initialize the resumes table if it does not exist."""
-    db = get_db()
-    db.execute('''CREATE TABLE IF NOT EXISTS resumes (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        filename TEXT NOT NULL,
-        file_path TEXT NOT NULL,
-        extracted_text TEXT,
-        extracted_skills TEXT,
-        created_at TEXT NOT NULL
-    )''')
-    # Users table for simple auth (email + password hash)
-    db.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        email TEXT NOT NULL UNIQUE,
-        name TEXT,
-        password_hash TEXT NOT NULL,
-        created_at TEXT NOT NULL
-    )''')
-    db.commit()
+    """Create or migrate the database schema (once per process, at startup)."""
+    db = connect(DB_PATH)
+    try:
+        migrate(db)
+    finally:
+        db.close()
+    repo.create_all()
 
 
 @app.teardown_appcontext
 def close_connection(exception):
-    """Close the database connection at the end of the request."""
-    db = getattr(g, '_database', None)
+    """Return the request's database connection to the pool."""
+    db = g.pop('_database', None)
     if db is not None:
-        db.close()
+        db_pool.release(db)
 
-# Simple skill lists
-TECH_SKILLS = ["Python", "JavaScript", "Java", "C++", "React", "Node.js", "SQL", "MongoDB", "AWS", "Docker", "Kubernetes", "Git", "DevOps", "Agile", "Scrum"]
-SOFT_SKILLS = ["Leadership", "Communication", "Teamwork", "Problem Solving", "Critical Thinking", "Adaptability", "Time Management", "Project Management", "Creativity", "Analytical Thinking"]
 
+def store_resume(filename, file_path, content_hash, text, skills):
+    """Insert a resume row and return its id."""
+    with metrics.span('db_insert'):
+        resume_id = repo.insert_resume(resume_row(filename, file_path, content_hash, text, skills,
+                                                  extractor_version=EXTRACTOR_VERSION))
+    analysis_cache.store(resume_id, filename, skills)
+    resume_stored(resume_id, filename, skills)
+    return resume_id
 
-def extract_text(file_path):
-    """Extract text from a PDF or TXT file."""
-    if file_path.lower().endswith('.pdf'):
-        try:
-            with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                return "\n".join([page.extract_text() or "" for page in reader.pages])
-        except Exception as e:
-            print(f"Error extracting PDF text: {e}")
-            return ""
-    elif file_path.lower().endswith('.txt'):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            print(f"Error reading TXT file: {e}")
-            return ""
-    return ""
-
-
-def extract_skills(text):
-    """Extract technical skills, soft skills, and certifications from text."""
-    text_lower = text.lower()
-    tech = [skill for skill in TECH_SKILLS if skill.lower() in text_lower]
-    soft = [skill for skill in SOFT_SKILLS if skill.lower() in text_lower]
-    certs = re.findall(r"certified in ([\w\s]+)|([\w\s]+) certification|([\w\s]+) certified", text, re.IGNORECASE)
-    certs_flat = [c.strip() for tup in certs for c in tup if c]
-    return {"technical_skills": tech, "soft_skills": soft, "certifications": certs_flat}
-
-
-def analyze_match(candidate_skills, job_skills):
-    """Analyze skill match between candidate and job requirements."""
-    candidate_set = set(s.lower() for s in candidate_skills)
-    job_set = set(s.lower() for s in job_skills)
-    matching = candidate_set & job_set
-    missing = job_set - candidate_set
-    additional = candidate_set - job_set
-    percent = round(len(matching) / len(job_set) * 100, 2) if job_set else 0
-    return {
-        "match_percentage": percent,
-        "matching_skills": list(matching),
-        "missing_skills": list(missing),
-        "additional_skills": list(additional)
-    }
+
+def resume_stored(resume_id, filename, skills):
+    """Index a newly stored resume and match it against the open job profiles (single and bulk uploads)."""
+    skill_index.add(resume_id, normalized_skills(skills))
+    embedding_indexer.submit(resume_id)
+    for match in profile_matcher.match_resume(resume_id, skills):
+        owner_id = match.pop('owner_id')
+        publish(dict(match, type='match_found', resume_id=resume_id, filename=filename), user_id=owner_id)
+
+
+_embedding_store = None
+
+
+def get_embedding_store():
+    """Open the shared memory-mapped embedding store on first use (None without NumPy)."""
+    global _embedding_store
+    if _embedding_store is None and embeddings.np is not None:
+        _embedding_store = embeddings.EmbeddingStore(EMBEDDINGS_PATH)
+    return _embedding_store
+
+
+_ann_index = None
+_ann_lock = threading.Lock()
+
+
+def get_ann_index(db):
+    """Return the resume similarity index, loading it from disk and catching up with new embeddings."""
+    global _ann_index
+    store = get_embedding_store()
+    if store is None:
+        return None
+    with _ann_lock:
+        if _ann_index is None:
+            _ann_index = ann.open_index(ANN_INDEX_PATH, store, db)
+        else:
+            _ann_index.refresh(store, db)
+            if _ann_index.unsaved >= ann.ANN_SAVE_EVERY:
+                _ann_index.save(ANN_INDEX_PATH)
+    return _ann_index
+
+
+def _resume_embedded(db):
+    """Insert freshly embedded resumes into the similarity index if it is loaded."""
+    if _ann_index is not None:
+        get_ann_index(db)
+
+
+embedding_indexer = embeddings.EmbeddingIndexer(get_embedding_store, DB_PATH, repo, on_embedded=_resume_embedded)
+
+
+def publish(event, user_id=None):
+    """Send an event dict to the SSE subscribers of its user, resume and job topics."""
+    if user_id is None and has_request_context():
+        user_id = session.get('user_id')
+    sse_hub.publish(event, events.event_topics(event, user_id))
 
 
 @app.route('/')
@@ -153,54 +246,155 @@ def upload_resume():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
     original_filename = secure_filename(file.filename)
-    unique_prefix = uuid.uuid4().hex
-    saved_filename = f"{unique_prefix}_{original_filename}"
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], saved_filename)
     try:
-        file.save(file_path)
+        with metrics.span('save_upload'):
+            content_hash, file_path, saved_filename = storage.save_upload(
+                file.stream, app.config['UPLOAD_FOLDER'], original_filename)
     except Exception as e:
         return jsonify({'error': f'Failed to save file: {e}'}), 500
-    text = extract_text(file_path)
-    # Prefer NLP module extraction when available
-    if nlp_module:
-        try:
-            skills = nlp_module.extract_skills(text)
-        except Exception as e:
-            print('NLP extraction failed, falling back to simple extractor:', e)
-            skills = extract_skills(text)
-    else:
-        skills = extract_skills(text)
     db = get_db()
-    cur = db.cursor()
-    created_at = datetime.utcnow().isoformat()
-    cur.execute(
-        'INSERT INTO resumes (filename, file_path, extracted_text, extracted_skills, created_at) VALUES (?, ?, ?, ?, ?)',
-        (original_filename, file_path, text, json.dumps(skills), created_at)
-    )
-    db.commit()
-    resume_id = cur.lastrowid
+    with metrics.span('cache_lookup'):
+        cached = storage.get_cached_extraction(db, content_hash, EXTRACTOR_VERSION)
+    metrics.EXTRACTION_CACHE.inc(result='miss' if cached is None else 'hit')
+    if cached is None and wants_async_extraction():
+        # Defer parsing to the worker pool; results arrive via /api/jobs/<id> and /stream
+        job_id = extraction_jobs.create(original_filename, file_path, content_hash, session.get('user_id'))
+        publish({
+            'type': 'resume_uploaded',
+            'job_id': job_id,
+            'filename': original_filename,
+            'saved_filename': saved_filename
+        })
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': url_for('get_job', job_id=job_id),
+            'filename': original_filename,
+            'saved_filename': saved_filename
+        }), 202
+    if cached is not None:
+        text, skills = cached
+    else:
+        text, skills = extract_resume(file_path, parallel=True)
+        with metrics.span('cache_store'):
+            storage.put_cached_extraction(db, content_hash, EXTRACTOR_VERSION, text, skills)
+            db.commit()
+    resume_id = store_resume(original_filename, file_path, content_hash, text, skills)
     # Notify SSE subscribers
-    message = json.dumps({
+    publish({
         'type': 'resume_uploaded',
         'resume_id': resume_id,
         'filename': original_filename,
         'saved_filename': saved_filename
     })
-    for q in list(subscribers):
-        try:
-            q.put(message)
-        except Exception:
-            pass
     return jsonify({
         'success': True,
         'resume_id': resume_id,
         'filename': original_filename,
         'saved_filename': saved_filename,
         'extracted_skills': skills,
-        'text_preview': text[:500]
+        'text_preview': text[:500],
+        'cached': cached is not None
     })
 
 
+def wants_async_extraction():
+    """Return True when the client (or server config) asks for deferred extraction."""
+    flag = request.args.get('async', request.form.get('async'))
+    if flag is None:
+        return app.config['ASYNC_EXTRACTION']
+    return flag.lower() in ('1', 'true', 'yes')
+
+
+def _job_done(job, text, skills):
+    """Store the result of a background extraction job and notify subscribers."""
+    with app.app_context():
+        db = get_db()
+        if job['content_hash']:
+            storage.put_cached_extraction(db, job['content_hash'], EXTRACTOR_VERSION, text, skills)
+            db.commit()
+        resume_id = store_resume(job['filename'], job['file_path'], job['content_hash'], text, skills)
+    publish({
+        'type': 'resume_processed',
+        'job_id': job['id'],
+        'resume_id': resume_id,
+        'filename': job['filename'],
+        'extracted_skills': skills
+    }, user_id=job.get('user_id'))
+    return resume_id
+
+
+def _job_failed(job, error):
+    """Notify subscribers that a background extraction job failed."""
+    publish({'type': 'resume_failed', 'job_id': job['id'], 'filename': job['filename'], 'error': str(error)},
+            user_id=job.get('user_id'))
+
+
+extraction_jobs = ExtractionJobs(DB_PATH, _job_done, _job_failed,
+                                 max_workers=int(os.environ.get('EXTRACTION_WORKERS', 0)) or None)
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Return the status of a background extraction job."""
+    job = extraction_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Not found'}), 404
+    result = {
+        'job_id': job['id'],
+        'status': job['status'],
+        'filename': job['filename'],
+        'resume_id': job['resume_id'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at']
+    }
+    if job['status'] == 'failed':
+        result['error'] = job['error']
+    if job['status'] == 'done' and job['resume_id']:
+        row = repo.get_resume(job['resume_id'], columns=('extracted_skills',))
+        if row and row['extracted_skills']:
+            result['extracted_skills'] = row['extracted_skills']
+    return jsonify(result)
+
+
+@app.route('/api/bulk-upload', methods=['POST'])
+def bulk_upload():
+    """Ingest a ZIP archive (field 'file') or several files (field 'files') and stream per-file status as NDJSON."""
+    try:
+        # Flask >= 3.1 allows a per-request limit; older versions keep MAX_CONTENT_LENGTH
+        request.max_content_length = app.config['BULK_MAX_CONTENT_LENGTH']
+    except AttributeError:
+        pass
+    workdir = tempfile.mkdtemp(prefix='bulk-', dir=app.config['UPLOAD_FOLDER'])
+    if 'file' in request.files and request.files['file'].filename:
+        source = os.path.join(workdir, 'upload.zip')
+        request.files['file'].save(source)
+    elif request.files.getlist('files'):
+        source = workdir
+        for f in request.files.getlist('files'):
+            if f.filename:
+                f.save(os.path.join(workdir, secure_filename(f.filename)))
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+        return jsonify({'error': 'No file provided'}), 400
+    if source != workdir and not zipfile.is_zipfile(source):
+        shutil.rmtree(workdir, ignore_errors=True)
+        return jsonify({'error': 'Expected a ZIP archive'}), 400
+
+    def gen():
+        try:
+            for status in ingest.ingest(source, DB_PATH, app.config['UPLOAD_FOLDER'],
+                                        workers=app.config['BULK_WORKERS'] or None, repo=repo,
+                                        on_stored=resume_stored):
+                yield json.dumps(status) + '\n'
+                if status['status'] == 'summary':
+                    publish({'type': 'bulk_ingested', **status})
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return Response(stream_with_context(gen()), mimetype='application/x-ndjson')
+
+
 @app.route('/api/analyze-match', methods=['POST'])
 def api_analyze_match():
     """Analyze skill match between candidate and job skills."""
@@ -211,128 +405,263 @@ def api_analyze_match():
     return jsonify({'success': True, 'match_analysis': result})
 
 
+skill_index = SkillIndex()
+
+
+@app.route('/api/search/candidates', methods=['POST'])
+def search_candidates():
+    """Rank all stored resumes against a job's skill list using the inverted skill index."""
+    data = request.get_json() or {}
+    job_skills = data.get('job_skills', [])
+    if not job_skills:
+        return jsonify({'error': 'job_skills required'}), 400
+    try:
+        limit = max(1, min(int(data.get('limit', 20)), 500))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be an integer'}), 400
+    skill_index.refresh(repo)
+    total, ranked = skill_index.search(job_skills, limit)
+    names = repo.resume_filenames([resume_id for resume_id, _ in ranked])
+    results = [dict(match, resume_id=resume_id, filename=names.get(resume_id)) for resume_id, match in ranked]
+    return jsonify({'success': True, 'total_matches': total, 'results': results})
+
+
+def _is_string_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+@app.route('/api/match/jobs', methods=['POST'])
+def match_jobs():
+    """Score one candidate (resume_id or candidate_skills) against many job postings in one vectorized pass."""
+    if not HAS_NUMPY:
+        return jsonify({'error': 'Batched matching requires NumPy'}), 501
+    data = request.get_json() or {}
+    jobs = data.get('jobs') or []
+    if not jobs:
+        return jsonify({'error': 'jobs required'}), 400
+    if not isinstance(jobs, list) or not all(isinstance(job, dict) for job in jobs):
+        return jsonify({'error': 'jobs must be a list of objects'}), 400
+    if not all(_is_string_list(job.get('skills', [])) for job in jobs):
+        return jsonify({'error': 'job skills must be lists of strings'}), 400
+    if any(len(job.get('skills', [])) > MAX_JOB_SKILLS for job in jobs):
+        return jsonify({'error': f'at most {MAX_JOB_SKILLS} skills per job'}), 400
+    job_ids = [job.get('id', i) for i, job in enumerate(jobs)]
+    if not all(isinstance(job_id, (str, int)) and not isinstance(job_id, bool) for job_id in job_ids):
+        return jsonify({'error': 'job ids must be strings or integers'}), 400
+    if len(set(job_ids)) != len(job_ids):
+        return jsonify({'error': 'job ids must be unique'}), 400
+    candidate_skills = data.get('candidate_skills')
+    if candidate_skills is None:
+        row = repo.get_resume(data.get('resume_id'), columns=('extracted_skills',))
+        if not row:
+            return jsonify({'error': 'Not found'}), 404
+        candidate_skills = candidate_skill_list(row['extracted_skills'])
+    elif not _is_string_list(candidate_skills):
+        return jsonify({'error': 'candidate_skills must be a list of strings'}), 400
+    population = BitsetMatrix()
+    for job_id, job in zip(job_ids, jobs):
+        population.add(job_id, job.get('skills', []))
+    try:
+        limit = max(1, min(int(data['limit']), len(jobs))) if data.get('limit') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be an integer'}), 400
+    results = score_jobs_for_candidate(population, candidate_skills, limit=limit)
+    for r in results:
+        r['job_id'] = r.pop('key')
+    return jsonify({'success': True, 'results': results})
+
+
+@app.route('/api/job-profiles', methods=['POST'])
+def create_job_profile():
+    """Store a job profile; skills come from the `skills` list and/or the `description` text.
+
+    Resumes already stored are matched right away; later uploads are matched as they arrive.
+    """
+    data = request.get_json() or {}
+    title = (data.get('title') or '').strip()
+    if not title:
+        return jsonify({'error': 'title required'}), 400
+    description = data.get('description') or ''
+    skills = profile_skills(data.get('skills') or [], description)
+    if not skills:
+        return jsonify({'error': 'skills or a description naming known skills required'}), 400
+    if len(skills) > MAX_JOB_SKILLS:
+        return jsonify({'error': f'at most {MAX_JOB_SKILLS} skills per profile'}), 400
+    profile_id = repo.create_job_profile(title, description, skills, session.get('user_id'))
+    profile = repo.get_job_profile(profile_id)
+    skill_index.refresh(repo)
+    matched = profile_matcher.backfill(profile, skill_index)
+    profile_matcher.refresh(force=True)
+    return jsonify({'success': True, 'job_profile': profile, 'matches': matched}), 201
+
+
+@app.route('/api/job-profiles', methods=['GET'])
+def list_job_profiles():
+    """List job profiles; ?status=open|closed filters."""
+    status = request.args.get('status')
+    if status is not None and status not in PROFILE_STATUSES:
+        return jsonify({'error': f"status must be one of: {', '.join(PROFILE_STATUSES)}"}), 400
+    return jsonify({'job_profiles': repo.list_job_profiles(status=status)})
+
+
+@app.route('/api/job-profiles/<int:profile_id>', methods=['GET'])
+def get_job_profile(profile_id):
+    """Return one job profile."""
+    profile = repo.get_job_profile(profile_id)
+    if not profile:
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify({'job_profile': profile})
+
+
+@app.route('/api/job-profiles/<int:profile_id>', methods=['PATCH'])
+def update_job_profile(profile_id):
+    """Open or close a job profile ({"status": "open"|"closed"}); closed profiles stop matching new uploads."""
+    status = (request.get_json() or {}).get('status')
+    if status not in PROFILE_STATUSES:
+        return jsonify({'error': f"status must be one of: {', '.join(PROFILE_STATUSES)}"}), 400
+    if not repo.set_job_profile_status(profile_id, status):
+        return jsonify({'error': 'Not found'}), 404
+    profile_matcher.refresh(force=True)
+    return jsonify({'success': True, 'job_profile': repo.get_job_profile(profile_id)})
+
+
+@app.route('/api/job-profiles/<int:profile_id>/matches', methods=['GET'])
+def job_profile_matches(profile_id):
+    """Ranked candidates of a job profile, as persisted when each resume was stored."""
+    try:
+        limit = max(1, min(int(request.args.get('limit', 50)), 500))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    profile = repo.get_job_profile(profile_id)
+    if not profile:
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify({'job_profile': profile, 'matches': repo.job_matches(profile_id, limit)})
+
+
+@app.route('/api/resume/<int:resume_id>/semantic-match', methods=['POST'])
+def semantic_match(resume_id):
+    """Score a resume against job skills by embedding similarity (e.g. PyTorch ~ deep learning)."""
+    if not embeddings.available():
+        return jsonify({'error': 'Semantic matching requires NumPy and the embedding model'}), 501
+    data = request.get_json() or {}
+    job_skills = data.get('job_skills', [])
+    if not job_skills:
+        return jsonify({'error': 'job_skills required'}), 400
+    try:
+        threshold = float(data.get('threshold', 0.5))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'threshold must be a number'}), 400
+    if not repo.resume_exists(resume_id):
+        return jsonify({'error': 'Not found'}), 404
+    db = get_db()
+    store = get_embedding_store()
+    embeddings.embed_resumes(store, db, repo, [resume_id])
+    result = embeddings.semantic_match(store, db, resume_id, job_skills, threshold)
+    if result is None:
+        return jsonify({'error': 'Resume has no skills to compare'}), 422
+    return jsonify(dict(result, success=True, resume_id=resume_id))
+
+
+@app.route('/api/resume/<int:resume_id>/similar', methods=['GET'])
+def similar_resumes(resume_id):
+    """Return the resumes whose embeddings are closest to this one (approximate nearest neighbours)."""
+    if embeddings.np is None:
+        return jsonify({'error': 'Similarity search requires NumPy'}), 501
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), 100))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if not repo.resume_exists(resume_id):
+        return jsonify({'error': 'Not found'}), 404
+    db = get_db()
+    store = get_embedding_store()
+    if embeddings.available():
+        embeddings.embed_resumes(store, db, repo, [resume_id])
+    row = db.execute("SELECT row FROM embedding_rows WHERE resume_id = ? AND kind = 'resume' ORDER BY row DESC LIMIT 1",
+                     (resume_id,)).fetchone()
+    if not row:
+        return jsonify({'error': 'Resume has not been embedded'}), 409
+    index = get_ann_index(db)
+    hits = index.search(store.vectors([row['row']])[0], k=limit, exclude=(resume_id,))
+    names = repo.resume_filenames([key for key, _ in hits])
+    for key, _sim in hits:
+        if key not in names:  # resume row deleted since it was indexed
+            index.remove(key)
+    results = [{'resume_id': key, 'filename': names[key], 'similarity': round(sim, 4)}
+               for key, sim in hits if key in names]
+    return jsonify({'success': True, 'resume_id': resume_id, 'results': results})
+
+
+RESUME_DETAIL_FIELDS = ('filename', 'extracted_text', 'extracted_skills')
+
+
 @app.route('/api/resume/<int:resume_id>', methods=['GET'])
 def get_resume(resume_id):
-    """Get resume details by ID."""
-    db = get_db()
-    cur = db.cursor()
-    cur.execute('SELECT * FROM resumes WHERE id = ?', (resume_id,))
-    row = cur.fetchone()
+    """Get resume details by ID.
+
+    ?fields=filename,extracted_skills returns only those fields (plus id); the
+    extracted text is only read and decompressed when it is requested.
+    """
+    fields = request.args.get('fields')
+    columns = [f.strip() for f in fields.split(',') if f.strip()] if fields else RESUME_DETAIL_FIELDS
+    try:
+        row = repo.get_resume(resume_id, columns=columns)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     if not row:
         return jsonify({'error': 'Not found'}), 404
-    return jsonify({
-        'id': row['id'],
-        'filename': row['filename'],
-        'extracted_text': row['extracted_text'],
-        'extracted_skills': json.loads(row['extracted_skills']) if row['extracted_skills'] else {}
-    })
+    return jsonify(row)
 
 
 
 @app.route('/api/resume/<int:resume_id>/analysis', methods=['GET'])
 def analyze_resume(resume_id):
-    """Return chart-ready metrics for a resume: skill gap values, salary estimates, and overall score."""
-    db = get_db()
-    cur = db.cursor()
-    cur.execute('SELECT * FROM resumes WHERE id = ?', (resume_id,))
-    row = cur.fetchone()
-    if not row:
+    """Return chart-ready metrics for a resume: skill gap values, salary estimates, and overall score.
+
+    Served from the analysis cache (computed when the resume was stored) with an ETag.
+    """
+    record = analysis_cache.get(resume_id)
+    if record is None:
         return jsonify({'error': 'Not found'}), 404
-    skills = json.loads(row['extracted_skills']) if row['extracted_skills'] else {}
-    tech_skills = skills.get('technical_skills', [])
-    soft_skills = skills.get('soft_skills', [])
-    certs = skills.get('certifications', [])
-    tech_count = len(tech_skills)
-    soft_count = len(soft_skills)
-    cert_count = len(certs)
-
-    # If NLP module offers a scoring helper, use it for a more consistent score & breakdown
-    score = None
-    breakdown = None
-    if nlp_module:
-        try:
-            score_info = nlp_module.compute_match_score({
-                'technical_skills': tech_skills,
-                'soft_skills': soft_skills,
-                'certifications': certs
-            })
-            score = int(score_info.get('score', 0))
-            breakdown = score_info.get('breakdown', None)
-        except Exception as e:
-            print('NLP scoring failed, falling back to simple heuristic:', e)
-
-    if score is None:
-        # legacy heuristic fallback
-        score = min(99, 40 + tech_count * 8 + soft_count * 4 + cert_count * 6)
-        breakdown = {
-            'technical_pct': min(100, tech_count * 8),
-            'soft_pct': min(100, soft_count * 6),
-            'cert_pct': min(100, cert_count * 10)
-        }
+    response = Response(record['body'], mimetype='application/json')
+    # the analysis only changes with ANALYSIS_VERSION, so browsers revalidate and get 304s
+    response.set_etag(record['etag'])
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
-    competency_values = [
-        breakdown.get('technical_pct', 0),
-        breakdown.get('soft_pct', 0),
-        breakdown.get('cert_pct', 0),
-        score
-    ]
-    salary_mapping = {
-        'python': 95000,
-        'react': 85000,
-        'machine_learning': 120000,
-        'aws': 110000,
-        'docker': 100000,
-        'node.js': 90000,
-        'javascript': 85000,
-        'sql': 80000
-    }
-    salary_labels = []
-    salary_values = []
-    for s in tech_skills[:6]:
-        key = s.lower().replace(' ', '_')
-        val = salary_mapping.get(key)
-        if val:
-            salary_labels.append(s)
-            salary_values.append(val)
-    if not salary_labels:
-        salary_labels = ['General']
-        salary_values = [60000]
-    result = {
-        'resume_id': row['id'],
-        'filename': row['filename'],
-        'score': score,
-        'match_score': score,
-        'breakdown': breakdown,
-        'skills': {
-            'technical_skills': tech_skills,
-            'soft_skills': soft_skills,
-            'certifications': certs
-        },
-        'skill_gap': {
-            'labels': ['Technical Skills', 'Soft Skills', 'Certifications', 'Overall Match'],
-            'values': competency_values
-        },
-        'salary': {
-            'labels': salary_labels,
-            'values': salary_values
-        }
-    }
-    return jsonify(result)
 
 
+@app.route('/api/insights', methods=['GET'])
+def get_insights():
+    """Candidate-pool view from the maintained aggregates: top skills and the score distribution.
+
+    ?top=N sizes the skill ranking, ?skill=name adds that skill's frequency and
+    the skills most often listed with it, ?score=N adds the share of resumes
+    scoring at or below N.
+    """
+    try:
+        top = max(1, min(int(request.args.get('top', 20)), 100))
+        score = int(request.args['score']) if request.args.get('score') is not None else None
+    except ValueError:
+        return jsonify({'error': 'top and score must be integers'}), 400
+    insights.refresh()
+    result = {'resumes': insights.total, 'top_skills': insights.top_skills(top),
+              'scores': insights.score_distribution()}
+    skill = (request.args.get('skill') or '').strip()
+    if skill:
+        result['skill'] = insights.skill(skill, top)
+    if score is not None:
+        result['score_percentile'] = insights.score_percentile(score)
+    return jsonify(result)
+
 
 @app.route('/api/roadmap', methods=['GET'])
 def get_roadmap():
     """Generate a simple career roadmap based on the latest resume or optional resume_id query param."""
     resume_id = request.args.get('resume_id', None)
-    db = get_db()
-    cur = db.cursor()
-    if resume_id:
-        cur.execute('SELECT * FROM resumes WHERE id = ?', (resume_id,))
-        row = cur.fetchone()
-    else:
-        cur.execute('SELECT * FROM resumes ORDER BY id DESC LIMIT 1')
-        row = cur.fetchone()
+    columns = ('extracted_skills',)
+    row = repo.get_resume(resume_id, columns) if resume_id else repo.latest_resume(columns)
     if not row:
         roadmap = {
             'phases': [
@@ -342,7 +671,7 @@ def get_roadmap():
             ]
         }
         return jsonify(roadmap)
-    skills = json.loads(row['extracted_skills']) if row['extracted_skills'] else {}
+    skills = row['extracted_skills']
     tech = skills.get('technical_skills', [])
     phases = [
         {'phase': 'Foundation', 'skills': tech[:3] or ['Programming basics'], 'projects': ['Complete beginner projects']},
@@ -351,12 +680,7 @@ def get_roadmap():
     ]
     roadmap = {'phases': phases}
     # notify SSE subscribers that roadmap updated
-    msg = json.dumps({'type': 'roadmap_updated', 'resume_id': row['id']})
-    for q in list(subscribers):
-        try:
-            q.put(msg)
-        except Exception:
-            pass
+    publish({'type': 'roadmap_updated', 'resume_id': row['id']})
     return jsonify(roadmap)
 
 
@@ -365,21 +689,15 @@ def get_roadmap():
 def get_interview_questions():
     """Return simple interview questions based on latest resume or resume_id param."""
     resume_id = request.args.get('resume_id', None)
-    db = get_db()
-    cur = db.cursor()
-    if resume_id:
-        cur.execute('SELECT * FROM resumes WHERE id = ?', (resume_id,))
-        row = cur.fetchone()
-    else:
-        cur.execute('SELECT * FROM resumes ORDER BY id DESC LIMIT 1')
-        row = cur.fetchone()
+    columns = ('extracted_skills',)
+    row = repo.get_resume(resume_id, columns) if resume_id else repo.latest_resume(columns)
     base_questions = [
         {'category': 'Behavioral', 'difficulty': 'Medium', 'question': 'Tell me about a time you led a team project.'},
         {'category': 'Behavioral', 'difficulty': 'Easy', 'question': 'Describe a challenging problem you solved.'}
     ]
     if not row:
         return jsonify({'questions': base_questions})
-    skills = json.loads(row['extracted_skills']) if row['extracted_skills'] else {}
+    skills = row['extracted_skills']
     tech = skills.get('technical_skills', [])
     tech_questions = [
         {'category': 'Technical', 'difficulty': 'Hard', 'question': f'Explain how you would design a system that uses {s}.'}
@@ -387,24 +705,75 @@ def get_interview_questions():
     ]
     questions = base_questions + tech_questions
     # emit SSE event for interview update
-    msg = json.dumps({'type': 'interview_updated', 'resume_id': row['id']})
-    for q in list(subscribers):
-        try:
-            q.put(msg)
-        except Exception:
-            pass
+    publish({'type': 'interview_updated', 'resume_id': row['id']})
     return jsonify({'questions': questions})
 
 
 
+RESUMES_PAGE_SIZE = 50
+RESUMES_MAX_PAGE_SIZE = 500
+
+
+def skill_summary(skills):
+    """Per-category counts plus the first few technical skills of an extracted_skills dict."""
+    summary = {k: len(skills.get(k, [])) for k in ('technical_skills', 'soft_skills', 'certifications')}
+    summary['top_skills'] = skills.get('technical_skills', [])[:5]
+    return summary
+
+
+def _list_item(row, with_summary):
+    skills = row.pop('extracted_skills', None)
+    if with_summary:
+        row['skill_summary'] = skill_summary(skills or {})
+    return row
+
+
+def _iso_arg(name):
+    """Parse an ISO date/datetime query argument into the stored created_at format (None if absent)."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    return datetime.fromisoformat(value).isoformat()
+
+
 @app.route('/api/resumes', methods=['GET'])
 def list_resumes():
-    """List all uploaded resumes with basic info."""
-    db = get_db()
-    cur = db.cursor()
-    cur.execute('SELECT id, filename, created_at FROM resumes ORDER BY id DESC')
-    rows = cur.fetchall()
-    return jsonify({'resumes': [dict(r) for r in rows]})
+    """List uploaded resumes, newest first, one page at a time.
+
+    ?limit= (default 50, max 500) and ?after_id=<next_after_id of the previous
+    page> page through the table by id. ?since= / ?until= filter on upload
+    time (ISO dates), ?skill= (repeatable) keeps resumes that list every given
+    skill, and ?include=skill_summary adds per-item skill counts.
+    ?export=1 streams every matching resume as one JSON document instead,
+    reading the table page by page so memory stays flat.
+    """
+    try:
+        after_id = int(request.args['after_id']) if request.args.get('after_id') else None
+        limit = max(1, min(int(request.args.get('limit', RESUMES_PAGE_SIZE)), RESUMES_MAX_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'after_id and limit must be integers'}), 400
+    try:
+        since, until = _iso_arg('since'), _iso_arg('until')
+    except ValueError:
+        return jsonify({'error': 'since and until must be ISO dates'}), 400
+    skills = [s.strip() for value in request.args.getlist('skill') for s in value.split(',') if s.strip()]
+    with_summary = 'skill_summary' in request.args.get('include', '').split(',')
+    filters = {'since': since, 'until': until, 'skills': skills, 'with_skills': with_summary}
+
+    if request.args.get('export', '').lower() in ('1', 'true', 'yes'):
+        def gen():
+            yield '{"resumes": ['
+            for i, row in enumerate(iter_resumes(repo, after_id=after_id, **filters)):
+                yield (',' if i else '') + json.dumps(_list_item(row, with_summary))
+            yield ']}'
+        return Response(gen(), mimetype='application/json')
+
+    rows = [_list_item(r, with_summary) for r in repo.list_resumes(after_id=after_id, limit=limit, **filters)]
+    return jsonify({
+        'resumes': rows,
+        'limit': limit,
+        'next_after_id': rows[-1]['id'] if len(rows) == limit else None
+    })
 
 
 # --- Simple auth pages and APIs ---
@@ -424,6 +793,23 @@ def login_page():
     return render_template('login.html')
 
 
+# Hashing runs on its own bounded pool (HASH_WORKERS, HASH_QUEUE_LIMIT); see auth.py
+password_hasher = auth.PasswordHasher()
+login_cache = auth.LoginCache()
+
+
+def _password_rehashed(user_id, new_hash):
+    """Store a hash upgraded to the current PASSWORD_HASH_METHOD."""
+    repo.update_password_hash(user_id, new_hash)
+    login_cache.forget(user_id)
+
+
+@app.errorhandler(auth.HasherBusy)
+def hasher_busy(e):
+    """Shed login/signup load instead of queueing it without bound."""
+    return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
+
+
 @app.route('/api/signup', methods=['POST'])
 def api_signup():
     """Create a new user with email + password (hashed)."""
@@ -433,17 +819,12 @@ def api_signup():
     name = data.get('name') or ''
     if not email or not password:
         return jsonify({'error': 'email and password required'}), 400
-    db = get_db()
-    cur = db.cursor()
-    cur.execute('SELECT id FROM users WHERE email = ?', (email,))
-    if cur.fetchone():
+    if repo.find_user(email):
+        return jsonify({'error': 'User with that email already exists'}), 400
+    pw_hash = password_hasher.hash(password)
+    user_id = repo.create_user(email, name, pw_hash)
+    if user_id is None:
         return jsonify({'error': 'User with that email already exists'}), 400
-    pw_hash = generate_password_hash(password)
-    created_at = datetime.utcnow().isoformat()
-    cur.execute('INSERT INTO users (email, name, password_hash, created_at) VALUES (?, ?, ?, ?)',
-                (email, name, pw_hash, created_at))
-    db.commit()
-    user_id = cur.lastrowid
     return jsonify({'success': True, 'user_id': user_id, 'email': email})
 
 
@@ -455,15 +836,17 @@ def api_login():
     password = data.get('password') or ''
     if not email or not password:
         return jsonify({'error': 'email and password required'}), 400
-    db = get_db()
-    cur = db.cursor()
-    cur.execute('SELECT id, email, name, password_hash FROM users WHERE email = ?', (email,))
-    row = cur.fetchone()
+    row = repo.find_user(email)
     if not row:
         return jsonify({'error': 'Invalid credentials'}), 400
     stored_hash = row['password_hash']
-    if not check_password_hash(stored_hash, password):
-        return jsonify({'error': 'Invalid credentials'}), 400
+    if not login_cache.check(row['id'], stored_hash, password):
+        if not password_hasher.verify(stored_hash, password):
+            return jsonify({'error': 'Invalid credentials'}), 400
+        login_cache.remember(row['id'], stored_hash, password)
+        if password_hasher.needs_rehash(stored_hash):
+            user_id = row['id']
+            password_hasher.rehash_later(password, lambda new_hash: _password_rehashed(user_id, new_hash))
     # Set session
     session['user_id'] = row['id']
     session['user_email'] = row['email']
@@ -484,63 +867,120 @@ def logout():
 
 
 # Real-time updates via SSE (publish/subscribe)
+def stream_topics(user_id, requested):
+    """Topics a client may follow: its own user topic plus any requested resume/job/job_profile topics."""
+    topics = {f'user:{user_id}'} if user_id else set()
+    for topic in requested:
+        kind, _, key = topic.partition(':')
+        if kind in ('resume', 'job', 'job_profile') and key:
+            topics.add(f'{kind}:{key}')
+    return topics
+
+
+def last_event_id(value):
+    """Parse a Last-Event-ID header / last_event_id parameter."""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
 @app.route('/stream')
 def stream():
-    """Server-Sent Events endpoint for real-time updates."""
-    def gen():
-        q = Queue()
-        subscribers.append(q)
-        try:
-            while True:
-                msg = q.get()
-                yield f"data: {msg}\n\n"
-        except GeneratorExit:
-            pass
-        finally:
-            try:
-                subscribers.remove(q)
-            except ValueError:
-                pass
-    return Response(gen(), mimetype='text/event-stream')
+    """Server-Sent Events endpoint for real-time updates.
 
+    ?topics=resume:5,job:<id> adds topics to the caller's own user topic;
+    Last-Event-ID (or ?last_event_id=) replays recent events missed while disconnected.
+    """
+    topics = stream_topics(session.get('user_id'), request.args.get('topics', '').split(','))
+    after = last_event_id(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+    gen = sse_hub.stream(topics, after, heartbeat=app.config['SSE_HEARTBEAT'])
+    return Response(gen, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @app.route('/api/resume/<int:resume_id>/download', methods=['GET'])
 def download_resume(resume_id):
-    """Download the stored resume file associated with resume_id."""
-    db = get_db()
-    cur = db.cursor()
-    cur.execute('SELECT file_path, filename FROM resumes WHERE id = ?', (resume_id,))
-    row = cur.fetchone()
+    """Download the stored resume file associated with resume_id.
+
+    With DOWNLOAD_ACCEL_PREFIX set, files under UPLOAD_FOLDER are answered
+    with an empty X-Accel-Redirect response and nginx sends them (sendfile,
+    Range, conditional requests), so the worker is free again at once.
+    Otherwise the file is sent from here with Range and If-None-Match
+    support; its ETag is the content hash of the content-addressed upload,
+    and the server's wsgi.file_wrapper (gunicorn: sendfile) does the copy.
+    """
+    row = repo.get_resume(resume_id, columns=('filename', 'file_path', 'content_hash'))
     if not row:
         return jsonify({'error': 'Not found'}), 404
     file_path = row['file_path']
-    original_filename = row['filename'] or None
     # Resolve relative paths relative to this file
     if not os.path.isabs(file_path):
         candidate = os.path.join(os.path.dirname(__file__), file_path)
-        if os.path.exists(candidate):
-            file_path = candidate
-    if not os.path.exists(file_path):
-        return jsonify({'error': 'File not found on server'}), 404
-    directory = os.path.dirname(file_path)
-    saved_name = os.path.basename(file_path)
-    # Prefer download_name (Flask 2.x); fall back to attachment_filename for older versions
+        file_path = candidate if os.path.exists(candidate) else os.path.abspath(file_path)
+    accel_prefix = app.config['DOWNLOAD_ACCEL_PREFIX']
+    relative = os.path.relpath(file_path, os.path.abspath(app.config['UPLOAD_FOLDER']))
+    offload = bool(accel_prefix) and not relative.startswith(os.pardir)
     try:
-        return send_from_directory(directory, saved_name, as_attachment=True, download_name=original_filename or saved_name)
-    except TypeError:
-        return send_from_directory(directory, saved_name, as_attachment=True, attachment_filename=original_filename or saved_name)
-
-
-if __name__ == '__main__':
-    with app.app_context():
-        init_db()
-    app.run(debug=True, host='0.0.0.0', port=5000)
-
-
+        response = send_file(file_path, request.environ, as_attachment=True,
+                             download_name=row['filename'] or os.path.basename(file_path),
+                             conditional=not offload, etag=False if offload else (row['content_hash'] or True),
+                             use_x_sendfile=offload, response_class=app.response_class)
+    except FileNotFoundError:
+        return jsonify({'error': 'File not found on server'}), 404
+    if offload:
+        del response.headers['X-Sendfile']
+        # the body comes from nginx; an upstream Content-Length would not match the empty response
+        del response.headers['Content-Length']
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(relative.replace(os.sep, '/'))
+    metrics.DOWNLOADS.inc(mode='accel' if offload else 'direct')
+    return response
+
+
+# Startup phase -> seconds, filled once by create_app
+startup_timings = {}
+_startup_lock = threading.Lock()
+
+
+def load_skill_index():
+    """Index resumes stored before the skill index existed and load it into memory."""
+    repo.backfill_skill_index()
+    skill_index.refresh(repo)
+
+
+def create_app():
+    """Run the one-time startup work and return the app, ready to serve.
+
+    Migrates the schema, requeues extraction jobs orphaned by a dead process,
+    loads the skill index and (PRELOAD_MODELS=1) the models, timing each phase.
+    Call it once per process before serving; under gunicorn with preload_app
+    that is the master, so workers fork with all of it done. Later calls return
+    the app straight away. Each serving process then dispatches jobs through
+    extraction_jobs.start_recovery().
+    """
+    with _startup_lock:
+        if startup_timings:
+            return app
+        # requeue only: the master must not start the job pool before forking
+        phases = [('schema', init_db), ('jobs', extraction_jobs.requeue_orphans),
+                  ('skill_index', load_skill_index),
+                  ('job_profiles', lambda: profile_matcher.refresh(force=True)),
+                  ('insights', lambda: insights.refresh(force=True))]
+        if not inference.INFERENCE_SOCKET and app.config['PRELOAD_MODELS']:
+            phases.append(('models', inference.warm_up))
+        for name, fn in phases:
+            start = time.perf_counter()
+            fn()
+            startup_timings[name] = time.perf_counter() - start
+        # connections opened during startup must not be inherited by forked workers
+        db_pool.close_all()
+        repo.close()
+        startup_timings['total'] = time.perf_counter() - IMPORT_STARTED
+    if not inference.INFERENCE_SOCKET and not app.config['PRELOAD_MODELS'] and app.config['MODEL_WARMUP']:
+        threading.Thread(target=inference.warm_up, name='model-warmup', daemon=True).start()
+    print('Startup: ' + ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in startup_timings.items()))
+    return app
 
-# Ensure DB is ready before processing requests (one-time init)
-_db_initialized = False
 
 @app.before_request
 def auth_check():
@@ -550,7 +990,9 @@ def auth_check():
         '/login',
         '/signup',
         '/api/login',
-        '/api/signup'
+        '/api/signup',
+        '/metrics',
+        '/health'
     ]
     
     # Always allow access to static files
@@ -566,13 +1008,45 @@ def auth_check():
 
 @app.before_request
 def ensure_db_on_request():
-    """Ensure the database is initialized."""
-    global _db_initialized
-    if not _db_initialized:
-        init_db()
-        _db_initialized = True
+    """Finish startup if the server skipped create_app; start job recovery on servers without a worker hook."""
+    if not startup_timings:
+        create_app()
+    extraction_jobs.start_recovery()
+
+metrics.Gauge('skill_matcher_sse_subscribers', 'Connected SSE clients in this process.', lambda: len(sse_hub))
+metrics.Gauge('skill_matcher_analysis_cache_entries', 'Analyses held in the in-memory LRU.', lambda: len(analysis_cache))
+metrics.Gauge('skill_matcher_skill_index_resumes', 'Resumes in the in-memory skill index.', lambda: len(skill_index))
+metrics.Gauge('skill_matcher_open_job_profiles', 'Open job profiles loaded in this process.',
+              lambda: len(profile_matcher))
+metrics.Gauge('skill_matcher_password_hash_queued', 'Password hashing jobs waiting for a hash worker.',
+              lambda: password_hasher.queued())
+metrics.Gauge('skill_matcher_startup_seconds', 'Time from import to ready in the process that ran create_app.',
+              lambda: startup_timings['total'])
+
+
+@app.route('/health')
+def health():
+    """Liveness/readiness probe with the startup phase timings (the first request waits for startup)."""
+    return jsonify({'status': 'ok', 'startup_ms': {k: round(v * 1000, 1) for k, v in startup_timings.items()}})
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics of this process."""
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'error': 'Not authenticated'}), 401
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 
 @app.errorhandler(404)
 def not_found(e):
     """Handle 404 errors by returning a JSON response."""
     return jsonify(error=str(e)), 404
+
+
+if __name__ == '__main__':
+    # Development server only; production runs gunicorn -c gunicorn.conf.py (see README)
+    create_app()
+    extraction_jobs.start_recovery()
+    app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,108 @@
+"""
+ASGI entry point: ``/stream`` on asyncio, everything else on the Flask app.
+
+An idle SSE client under WSGI holds a whole worker thread; here it is one
+small coroutine, so a single process can keep ~10k streams open. Requires
+``asgiref`` (WSGI bridge) and an ASGI server:
+
+    gunicorn -c gunicorn.conf.py            # uvicorn workers, see gunicorn.conf.py
+    uvicorn asgi:app --workers 4
+
+Flask requests run on up to ASGI_THREADS threads per process (asgiref would
+otherwise run them all on one shared thread). With several workers set
+SSE_BACKEND=sqlite (or a redis:// URL) so events reach clients connected to
+any worker.
+"""
+import asyncio
+import os
+from urllib.parse import parse_qs
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+
+from app import create_app, extraction_jobs, last_event_id, sse_hub, stream_topics
+
+
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 16))
+
+flask_app = create_app()
+wsgi = WsgiToAsgi(flask_app)
+_wsgi_slots = None
+
+
+def _session_user_id(headers):
+    """Read user_id from the signed Flask session cookie, or None."""
+    cookie_name = flask_app.config.get('SESSION_COOKIE_NAME', 'session')
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    for name, value in headers:
+        if name != b'cookie' or serializer is None:
+            continue
+        for part in value.decode('latin-1').split(';'):
+            key, _, cookie = part.strip().partition('=')
+            if key == cookie_name:
+                try:
+                    lifetime = int(flask_app.permanent_session_lifetime.total_seconds())
+                    return serializer.loads(cookie, max_age=lifetime).get('user_id')
+                except Exception:
+                    return None
+    return None
+
+
+async def stream(scope, receive, send):
+    headers = scope.get('headers', [])
+    user_id = _session_user_id(headers)
+    if not user_id:
+        await send({'type': 'http.response.start', 'status': 401,
+                    'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': b'{"error": "Not authenticated"}'})
+        return
+    query = parse_qs(scope.get('query_string', b'').decode())
+    topics = stream_topics(user_id, ','.join(query.get('topics', [])).split(','))
+    header_id = next((v.decode() for k, v in headers if k == b'last-event-id'), None)
+    after = last_event_id(header_id or (query.get('last_event_id') or [None])[0])
+
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [
+        (b'content-type', b'text/event-stream'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no'),
+    ]})
+    messages = sse_hub.astream(topics, after, heartbeat=flask_app.config['SSE_HEARTBEAT'])
+
+    async def pump():
+        async for chunk in messages:
+            await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+
+    async def until_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    # servers may silently drop writes to a closed connection, so watch for the disconnect message
+    tasks = [asyncio.ensure_future(pump()), asyncio.ensure_future(until_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        if tasks[0].done() and not tasks[1].done():
+            # slow client cut off by the disconnect policy; it reconnects with Last-Event-ID
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await messages.aclose()
+
+
+async def app(scope, receive, send):
+    global _wsgi_slots
+    if scope['type'] == 'lifespan':
+        # create_app already ran at import; per worker, only the extraction job recovery timer
+        while (await receive())['type'] != 'lifespan.shutdown':
+            extraction_jobs.start_recovery()
+            await send({'type': 'lifespan.startup.complete'})
+        await send({'type': 'lifespan.shutdown.complete'})
+    elif scope['type'] == 'http' and scope['path'] == '/stream':
+        await stream(scope, receive, send)
+    else:
+        if _wsgi_slots is None:
+            _wsgi_slots = asyncio.Semaphore(ASGI_THREADS)
+        # a thread per request context (at most ASGI_THREADS at once) instead of asgiref's single shared thread
+        async with _wsgi_slots, ThreadSensitiveContext():
+            await wsgi(scope, receive, send)
@@ -0,0 +1,167 @@
+"""
+Password hashing off the request threads, and a short-lived login cache.
+
+``PasswordHasher`` runs werkzeug's generate/check_password_hash on a small
+dedicated thread pool. hashlib's scrypt and PBKDF2 release the GIL, so
+HASH_WORKERS bounds how many cores hashing can take while the other request
+threads keep serving uploads and analyses. At most HASH_QUEUE_LIMIT jobs wait
+for a worker; beyond that ``HasherBusy`` is raised at once (the app answers
+503 + Retry-After) instead of queueing a signup burst without limit.
+
+PASSWORD_HASH_METHOD is the werkzeug method for new hashes and sets the work
+factor (``scrypt:32768:8:1``, ``pbkdf2:sha256:1000000``, ...). Stored hashes
+made with other parameters are re-hashed in the background after the next
+successful login.
+
+``LoginCache`` remembers a successful verification for LOGIN_CACHE_TTL
+seconds so logging in again (another tab, a retry) skips the slow hash. It
+keeps an HMAC of the password under a random per-process key, bound to the
+user's current stored hash, never the password; LOGIN_CACHE_TTL=0 disables it.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from metrics import LOGIN_CACHE, PASSWORD_HASH_REJECTED, PASSWORD_HASH_SECONDS, PASSWORD_HASH_WAIT_SECONDS
+
+
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+HASH_WORKERS = int(os.environ.get('HASH_WORKERS', 0)) or max(1, (os.cpu_count() or 2) // 2)
+HASH_QUEUE_LIMIT = int(os.environ.get('HASH_QUEUE_LIMIT', 64))
+HASH_TIMEOUT = float(os.environ.get('HASH_TIMEOUT', 10))
+LOGIN_CACHE_TTL = float(os.environ.get('LOGIN_CACHE_TTL', 300))
+LOGIN_CACHE_SIZE = int(os.environ.get('LOGIN_CACHE_SIZE', 10000))
+
+
+class HasherBusy(Exception):
+    """The hash queue is full (or the job timed out); the client should retry shortly."""
+
+
+def canonical_method(method):
+    """Spell out werkzeug's default parameters so two method strings can be compared."""
+    name, *args = method.split(':')
+    if name == 'scrypt' and not args:
+        return 'scrypt:32768:8:1'
+    if name == 'pbkdf2' and len(args) < 2:
+        return f"pbkdf2:{args[0] if args else 'sha256'}:{DEFAULT_PBKDF2_ITERATIONS}"
+    return method
+
+
+class PasswordHasher:
+    """Bounded executor for password hashing."""
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=HASH_WORKERS, max_queue=HASH_QUEUE_LIMIT,
+                 timeout=HASH_TIMEOUT):
+        self.method = canonical_method(method)
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None  # created on first use, i.e. after any pre-fork import
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def queued(self):
+        """Jobs waiting for a free hash worker."""
+        return max(0, self._pending - self.workers)
+
+    def _submit(self, operation, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                PASSWORD_HASH_REJECTED.inc(operation=operation)
+                raise HasherBusy(f'{self._pending} password hashing jobs in flight')
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            PASSWORD_HASH_WAIT_SECONDS.observe(started - submitted, operation=operation)
+            try:
+                return fn(*args)
+            finally:
+                PASSWORD_HASH_SECONDS.observe(time.perf_counter() - started, operation=operation)
+                with self._lock:
+                    self._pending -= 1
+
+        return self._executor.submit(job)
+
+    def _wait(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HasherBusy('password hashing timed out') from None
+
+    def hash(self, password):
+        """Hash a new password with the configured method."""
+        return self._wait(self._submit('hash', generate_password_hash, password, self.method))
+
+    def verify(self, stored_hash, password):
+        """Check a password against a stored hash."""
+        return self._wait(self._submit('verify', check_password_hash, stored_hash, password))
+
+    def needs_rehash(self, stored_hash):
+        """True if stored_hash was made with other parameters than the configured method."""
+        return canonical_method(stored_hash.split('$', 1)[0]) != self.method
+
+    def rehash_later(self, password, on_done):
+        """Hash password in the background and pass the new hash to on_done (skipped when busy)."""
+        try:
+            future = self._submit('rehash', generate_password_hash, password, self.method)
+        except HasherBusy:
+            return  # the next login tries again
+
+        def done(f):
+            try:
+                on_done(f.result())
+            except Exception as e:
+                print('Password rehash failed:', e)
+
+        future.add_done_callback(done)
+
+
+class LoginCache:
+    """Recently verified (user, password) pairs, as keyed HMACs with an expiry."""
+
+    def __init__(self, ttl=LOGIN_CACHE_TTL, maxsize=LOGIN_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._key = secrets.token_bytes(32)
+        self._entries = OrderedDict()  # user_id -> (expires, stored_hash, digest)
+        self._lock = threading.Lock()
+
+    def _digest(self, user_id, password):
+        return hmac.new(self._key, f'{user_id}\0{password}'.encode('utf-8'), hashlib.sha256).digest()
+
+    def check(self, user_id, stored_hash, password):
+        """True if this password was verified for the user's current hash within the TTL."""
+        if self.ttl <= 0:
+            return False
+        with self._lock:
+            entry = self._entries.get(user_id)
+        hit = (entry is not None and entry[0] > time.monotonic() and entry[1] == stored_hash
+               and hmac.compare_digest(entry[2], self._digest(user_id, password)))
+        LOGIN_CACHE.inc(result='hit' if hit else 'miss')
+        return hit
+
+    def remember(self, user_id, stored_hash, password):
+        """Record a successful verification."""
+        if self.ttl <= 0:
+            return
+        entry = (time.monotonic() + self.ttl, stored_hash, self._digest(user_id, password))
+        with self._lock:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
@@ -0,0 +1,302 @@
+"""
+SQLite schema and shared queries for data.db.
+
+Used by the Flask app as well as offline tools (bulk ingestion CLI), so it
+must not depend on a Flask application context.
+"""
+import json
+import os
+from datetime import datetime
+
+import storage
+from analysis import analysis_record, init_analysis
+from connections import connect
+from embeddings import init_embeddings
+from insights import aggregate_deltas, apply_aggregates, init_aggregates, rebuild_aggregates
+from jobs import init_jobs
+from profiles import OPEN_PROFILE_MATCH, init_profiles
+from reextract import init_reextract
+from search import NEXT_SKILLS_SEQ, index_resume, init_index, skill_rows
+
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data.db')
+# extracted_text is no longer written here: the text goes compressed to storage's resume_texts table
+RESUME_INSERT_SQL = ('INSERT INTO resumes (filename, file_path, extracted_skills, created_at, content_hash, '
+                     f'extractor_version, skills_seq) VALUES (?, ?, ?, ?, ?, ?, {NEXT_SKILLS_SEQ})')
+
+
+def create_schema(db):
+    """Create all tables used by the app if they do not exist (caller commits)."""
+    db.execute('''CREATE TABLE IF NOT EXISTS resumes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filename TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        extracted_text TEXT,
+        extracted_skills TEXT,
+        created_at TEXT NOT NULL
+    )''')
+    # Users table for simple auth (email + password hash)
+    db.execute('''CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT NOT NULL UNIQUE,
+        name TEXT,
+        password_hash TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )''')
+    columns = [r[1] for r in db.execute('PRAGMA table_info(resumes)')]
+    if 'content_hash' not in columns:
+        db.execute('ALTER TABLE resumes ADD COLUMN content_hash TEXT')
+    if 'extractor_version' not in columns:
+        # NULL (rows from before this column) counts as stale for the re-extraction engine
+        db.execute('ALTER TABLE resumes ADD COLUMN extractor_version TEXT')
+    if 'skills_seq' not in columns:
+        # bumped on every write of the resume's skills, see search.SkillIndex.refresh
+        db.execute('ALTER TABLE resumes ADD COLUMN skills_seq INTEGER')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_resumes_skills_seq ON resumes (skills_seq)')
+    storage.init_cache(db)
+    storage.init_texts(db)
+    init_analysis(db)
+    init_jobs(db)
+    init_index(db)
+    init_embeddings(db)
+    init_profiles(db)
+    init_reextract(db)
+    init_aggregates(db)
+
+
+def _index_created_at(db):
+    # users(email) needs no extra index: its UNIQUE constraint already creates one
+    db.execute('CREATE INDEX IF NOT EXISTS idx_resumes_created_at ON resumes (created_at)')
+
+
+def _move_extracted_text(db):
+    # compress existing text into resume_texts and blank the inline column, so
+    # scans of resumes stop dragging hundreds of KB of overflow pages per row
+    # (run VACUUM afterwards to hand the freed pages back to the filesystem)
+    last_id = 0
+    while True:
+        rows = db.execute('SELECT id, extracted_text FROM resumes WHERE id > ? AND extracted_text IS NOT NULL '
+                          'ORDER BY id LIMIT 500', (last_id,)).fetchall()
+        if not rows:
+            break
+        storage.put_resume_texts(db, rows)
+        last_id = rows[-1][0]
+    db.execute('UPDATE resumes SET extracted_text = NULL WHERE extracted_text IS NOT NULL')
+
+
+def _create_tables(db):
+    # new tables come from create_schema(); the version bump makes migrate() run it
+    pass
+
+
+def _build_aggregates(db):
+    # count the analyses stored before the aggregate tables existed
+    rebuild_aggregates(db)
+
+
+def _analyze_stored_resumes(db, batch_size=500):
+    # resumes stored before resume_analysis existed get their analysis now,
+    # so the aggregate counts (built from the analyses) include them
+    last_id = 0
+    while True:
+        rows = db.execute('''SELECT r.id, r.filename, r.extracted_skills FROM resumes r WHERE r.id > ?
+            AND NOT EXISTS (SELECT 1 FROM resume_analysis a WHERE a.resume_id = r.id)
+            ORDER BY r.id LIMIT ?''', (last_id, batch_size)).fetchall()
+        if not rows:
+            break
+        _store_analyses(db, [(resume_id, analysis_record(resume_id, filename, json.loads(skills) if skills else {}))
+                             for resume_id, filename, skills in rows])
+        last_id = rows[-1][0]
+
+
+def _compress_cached_texts(db):
+    # the extraction cache kept a second, uncompressed copy of every resume text
+    # (run VACUUM afterwards to hand the freed pages back to the filesystem)
+    storage.compress_cached_texts(db)
+
+
+def _number_skill_writes(db):
+    # rows stored before skills_seq existed are numbered in id order
+    db.execute('UPDATE resumes SET skills_seq = id WHERE skills_seq IS NULL')
+
+
+# (version, step) pairs applied in order; append new steps, never edit old ones
+MIGRATIONS = [
+    (1, _index_created_at),
+    (2, _move_extracted_text),
+    (3, _create_tables),  # resume_analysis
+    (4, _create_tables),  # job_profiles, job_profile_matches
+    (5, _create_tables),  # resumes.extractor_version, reextract_checkpoints
+    (6, _build_aggregates),  # skill_counts, skill_pairs, score_counts
+    (7, _number_skill_writes),  # resumes.skills_seq
+    (8, _create_tables),  # idx_job_profile_matches_resume
+    (9, _analyze_stored_resumes),  # resume_analysis rows (and counts) for older resumes
+    (10, _compress_cached_texts),  # extraction_cache.text_codec, text_body
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(db):
+    """Bring the schema up to SCHEMA_VERSION (tracked in PRAGMA user_version) and commit.
+
+    A database that is already current costs one pragma read, so every
+    process can call this at startup.
+    """
+    version = db.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return version
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        # another process may have migrated while we waited for the write lock
+        version = db.execute('PRAGMA user_version').fetchone()[0]
+        create_schema(db)
+        for step_version, step in MIGRATIONS:
+            if step_version > version:
+                step(db)
+        db.execute(f'PRAGMA user_version = {SCHEMA_VERSION:d}')
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return SCHEMA_VERSION
+
+
+def create_all(database_url=None, db_path=DB_PATH):
+    """Create or migrate every schema the app uses (release step).
+
+    The local SQLite file always holds the node-local tables; resumes and
+    users go to DATABASE_URL when it names another backend.
+    """
+    db = connect(db_path)
+    try:
+        migrate(db)
+    finally:
+        db.close()
+    from repository import open_repository
+    url = database_url or os.environ.get('DATABASE_URL')
+    if url:
+        open_repository(url, db_path).create_all()
+
+
+def resume_row(filename, file_path, content_hash, text, skills, created_at=None, extractor_version=None):
+    """Build a resume tuple: (filename, file_path, text, skills_json, created_at, content_hash, extractor_version).
+
+    extractor_version is the EXTRACTOR_VERSION that produced skills; None marks
+    the row stale, so the re-extraction engine will process it.
+    """
+    return (filename, file_path, text, json.dumps(skills), created_at or datetime.utcnow().isoformat(), content_hash,
+            extractor_version)
+
+
+def _insert_params(row):
+    """Parameters for RESUME_INSERT_SQL: the resume_row() tuple without its text."""
+    return row[:2] + row[3:]
+
+
+def insert_resume(db, row):
+    """Insert one resume row plus its text and skill index entries, commit, and return the id."""
+    cur = db.cursor()
+    cur.execute(RESUME_INSERT_SQL, _insert_params(row))
+    resume_id = cur.lastrowid
+    storage.put_resume_texts(db, [(resume_id, row[2])])
+    index_resume(db, resume_id, json.loads(row[3]))
+    db.commit()
+    return resume_id
+
+
+def insert_resumes(db, rows):
+    """Insert many resume rows in one transaction and return their ids in order.
+
+    rows are tuples from resume_row(). BEGIN IMMEDIATE holds the write lock for
+    the whole batch, so AUTOINCREMENT ids are contiguous and can be derived
+    from last_insert_rowid().
+    """
+    if not rows:
+        return []
+    if db.in_transaction:
+        db.commit()
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        db.executemany(RESUME_INSERT_SQL, [_insert_params(row) for row in rows])
+        last_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
+        ids = range(last_id - len(rows) + 1, last_id + 1)
+        storage.put_resume_texts(db, [(resume_id, row[2]) for resume_id, row in zip(ids, rows)])
+        db.executemany('INSERT OR IGNORE INTO resume_skills (resume_id, skill) VALUES (?, ?)',
+                       [r for resume_id, row in zip(ids, rows) for r in skill_rows(resume_id, json.loads(row[3]))])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return list(ids)
+
+
+def update_extractions(db, items, analyses=(), matches=()):
+    """Replace the skills (and text, unless None) of existing resumes in one transaction.
+
+    items are (resume_id, text, skills, extractor_version); resume_skills rows
+    are rewritten so the index matches the new skills, and each resume gets a
+    new skills_seq so running skill indexes reload it. The resumes' new
+    analyses ((resume_id, record) pairs) and job matches ((resume_id, rows)
+    pairs, rows as for replace_job_matches) are written in the same
+    transaction, so a crash never leaves a resume with new skills but stale
+    analysis or matches.
+    """
+    if not items:
+        return
+    if db.in_transaction:
+        db.commit()
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        db.executemany('UPDATE resumes SET extracted_skills = ?, extractor_version = ?, '
+                       f'skills_seq = {NEXT_SKILLS_SEQ} WHERE id = ?',
+                       [(json.dumps(skills), version, resume_id) for resume_id, _text, skills, version in items])
+        storage.put_resume_texts(db, [(resume_id, text) for resume_id, text, _skills, _version in items])
+        db.executemany('DELETE FROM resume_skills WHERE resume_id = ?', [(item[0],) for item in items])
+        db.executemany('INSERT OR IGNORE INTO resume_skills (resume_id, skill) VALUES (?, ?)',
+                       [r for resume_id, _text, skills, _version in items for r in skill_rows(resume_id, skills)])
+        analyses = list(dict(analyses).items())
+        if analyses:
+            _store_analyses(db, analyses)
+        _replace_job_matches(db, matches)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _replace_job_matches(db, matches):
+    # replace_job_matches() for several resumes, without the transaction
+    now = datetime.utcnow().isoformat()
+    for resume_id, rows in matches:
+        db.execute(f'DELETE FROM job_profile_matches WHERE resume_id = ? AND {OPEN_PROFILE_MATCH}', (resume_id,))
+        db.executemany('INSERT OR REPLACE INTO job_profile_matches (job_profile_id, resume_id, match_percentage, '
+                       'matching_count, created_at) VALUES (?, ?, ?, ?, ?)', [tuple(r) + (now,) for r in rows])
+
+
+def put_analyses(db, items):
+    """Store (resume_id, analysis record) pairs and move the aggregate counts from the analyses they replace."""
+    items = list(dict(items).items())  # the last record of a resume wins
+    if not items:
+        return
+    if db.in_transaction:
+        db.commit()
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        _store_analyses(db, items)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _store_analyses(db, items):
+    # put_analyses() without the transaction: deduplicated (resume_id, record) pairs
+    ids = [resume_id for resume_id, _record in items]
+    old = []
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        old += [r[0] for r in db.execute(
+            f"SELECT body FROM resume_analysis WHERE resume_id IN ({','.join('?' * len(chunk))})", chunk)]
+    db.executemany('INSERT OR REPLACE INTO resume_analysis (resume_id, version, etag, body) VALUES (?, ?, ?, ?)',
+                   [(i, r['version'], r['etag'], r['body']) for i, r in items])
+    apply_aggregates(db, aggregate_deltas([r['body'] for _i, r in items], old))
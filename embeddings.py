@@ -0,0 +1,231 @@
+"""
+Persistent embedding store for semantic skill matching.
+
+Skill, section and whole-resume embeddings from the local MiniLM model are
+computed once at ingestion and appended to a raw float16/float32 matrix file
+beside data.db. The file is read through ``numpy.memmap``, and the
+``embedding_rows`` table maps each matrix row to (resume_id, kind, label), so
+similarity queries are a single matrix product with no re-encoding.
+"""
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import inference
+from connections import connect
+from matching import candidate_skill_list
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server only
+    fcntl = None
+
+
+EMBED_BATCH_SIZE = int(os.environ.get('EMBED_BATCH_SIZE', 64))
+MAX_SECTIONS = 40
+
+
+def encode(texts):
+    """Encode texts in CPU batches into L2-normalized float32 vectors (in-process or on the sidecar)."""
+    return inference.encode(texts, EMBED_BATCH_SIZE)
+
+
+def split_sections(text, max_sections=MAX_SECTIONS):
+    """Split resume text into paragraph-sized sections worth embedding."""
+    parts = [p.strip() for p in re.split(r'\n\s*\n', text or '') if len(p.strip()) > 20]
+    return [' '.join(p.split())[:1000] for p in parts[:max_sections]]
+
+
+def init_embeddings(db):
+    """Create the embedding_rows table if it does not exist."""
+    db.execute('''CREATE TABLE IF NOT EXISTS embedding_rows (
+        row INTEGER PRIMARY KEY,
+        resume_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        label TEXT
+    )''')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_embedding_rows_resume ON embedding_rows (resume_id, kind)')
+
+
+class EmbeddingStore:
+    """Append-only memory-mapped matrix of embeddings.
+
+    Rows are appended under an exclusive file lock so several web workers can
+    share the same file; readers re-map when the file has grown.
+    """
+
+    def __init__(self, path, dim=384, dtype='float16'):
+        if np is None:
+            raise RuntimeError('NumPy is required for the embedding store')
+        self.path = path
+        self.meta_path = path + '.json'
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            dim, dtype = meta['dim'], meta['dtype']
+        else:
+            with open(self.meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'dim': dim, 'dtype': dtype}, f)
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.row_bytes = self.dim * self.dtype.itemsize
+        self._map = None
+        self._map_rows = 0
+        self._lock = threading.Lock()
+        open(self.path, 'ab').close()
+
+    def __len__(self):
+        return os.path.getsize(self.path) // self.row_bytes
+
+    def append(self, db, resume_id, entries):
+        """Append (kind, label, vector) entries for a resume and record their rows (commits db)."""
+        if not entries:
+            return []
+        vectors = np.asarray([v for _kind, _label, v in entries], dtype=self.dtype).reshape(len(entries), self.dim)
+        with open(self.path, 'ab') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0, os.SEEK_END)
+                first = f.tell() // self.row_bytes
+                f.write(vectors.tobytes())
+                f.flush()
+                rows = list(range(first, first + len(entries)))
+                db.executemany('INSERT OR REPLACE INTO embedding_rows (row, resume_id, kind, label) VALUES (?, ?, ?, ?)',
+                               [(row, resume_id, kind, label) for row, (kind, label, _v) in zip(rows, entries)])
+                db.commit()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return rows
+
+    def matrix(self):
+        """Return a read-only memmap over every row written so far."""
+        rows = len(self)
+        with self._lock:
+            if self._map is None or rows != self._map_rows:
+                self._map = np.memmap(self.path, dtype=self.dtype, mode='r', shape=(rows, self.dim)) if rows else \
+                    np.zeros((0, self.dim), dtype=self.dtype)
+                self._map_rows = rows
+            return self._map
+
+    def vectors(self, rows):
+        """Gather rows as float32."""
+        return np.asarray(self.matrix()[np.asarray(rows, dtype=np.int64)], dtype=np.float32)
+
+    def similarity(self, queries, rows=None):
+        """Cosine similarity of query vectors against stored rows (all rows, or the given subset)."""
+        queries = np.asarray(queries, dtype=np.float32)
+        matrix = self.matrix() if rows is None else self.matrix()[np.asarray(rows, dtype=np.int64)]
+        return np.asarray(matrix, dtype=np.float32) @ queries.T
+
+
+def resume_entries(skills, text):
+    """Encode a resume's skills and sections; returns (kind, label, vector) entries.
+
+    A 'resume' entry (normalized mean of all vectors) is added for
+    resume-to-resume similarity.
+    """
+    skill_list = []
+    seen = set()
+    for skill in skills:
+        if skill.lower() not in seen:
+            seen.add(skill.lower())
+            skill_list.append(skill)
+    sections = split_sections(text)
+    texts = skill_list + sections
+    if not texts:
+        return []
+    labels = [('skill', s) for s in skill_list] + [('section', s[:200]) for s in sections]
+    vectors = encode(texts)
+    entries = [(kind, label, vec) for (kind, label), vec in zip(labels, vectors)]
+    mean = vectors.mean(axis=0)
+    norm = np.linalg.norm(mean)
+    entries.append(('resume', None, mean / norm if norm else mean))
+    return entries
+
+
+def available():
+    """True when NumPy and the embedding model can be used."""
+    return inference.encoder_available()
+
+
+def embed_resumes(store, db, repo, resume_ids):
+    """Encode and store embeddings for resumes that have none yet; returns the number embedded.
+
+    Resumes are read from repo; db is the local SQLite connection holding embedding_rows.
+    """
+    done = 0
+    for resume_id in resume_ids:
+        if db.execute('SELECT 1 FROM embedding_rows WHERE resume_id = ? LIMIT 1', (resume_id,)).fetchone():
+            continue
+        row = repo.get_resume(resume_id, columns=('extracted_text', 'extracted_skills'))
+        if not row:
+            continue
+        skills = candidate_skill_list(row['extracted_skills'])
+        store.append(db, resume_id, resume_entries(skills, row['extracted_text']))
+        done += 1
+    return done
+
+
+class EmbeddingIndexer:
+    """Embeds newly stored resumes on a single background thread so uploads never wait on the model."""
+
+    def __init__(self, store_factory, db_path, repo, on_embedded=None):
+        self.store_factory = store_factory
+        self.db_path = db_path
+        self.repo = repo
+        self.on_embedded = on_embedded
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='embeddings')
+
+    def submit(self, resume_id):
+        """Queue a resume for embedding."""
+        self._executor.submit(self._run, resume_id)
+
+    def _run(self, resume_id):
+        if not available():
+            return
+        db = connect(self.db_path)
+        try:
+            if embed_resumes(self.store_factory(), db, self.repo, [resume_id]) and self.on_embedded:
+                self.on_embedded(db)
+        except Exception as e:
+            print(f'Embedding resume {resume_id} failed: {e}')
+        finally:
+            db.close()
+
+
+def semantic_match(store, db, resume_id, job_skills, threshold=0.5):
+    """Score how well a resume's skills semantically cover job_skills.
+
+    Each job skill is credited with its best cosine similarity to any of the
+    resume's skill embeddings; similarities below threshold count as missing.
+    """
+    rows = db.execute("SELECT row, label FROM embedding_rows WHERE resume_id = ? AND kind = 'skill' ORDER BY row",
+                      (resume_id,)).fetchall()
+    job_skills = list(dict.fromkeys(job_skills))
+    if not job_skills:
+        return {'semantic_score': 0, 'skills': []}
+    if not rows:
+        return None
+    sims = store.similarity(encode(job_skills), [r[0] for r in rows])  # (resume skills, job skills)
+    best = sims.argmax(axis=0)
+    details = []
+    total = 0.0
+    for j, skill in enumerate(job_skills):
+        score = float(sims[best[j], j])
+        credited = score if score >= threshold else 0.0
+        total += credited
+        details.append({
+            'job_skill': skill,
+            'closest_skill': rows[best[j]][1],
+            'similarity': round(score, 4),
+            'satisfied': score >= threshold
+        })
+    return {'semantic_score': round(total / len(job_skills) * 100, 2), 'skills': details}
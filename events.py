@@ -0,0 +1,357 @@
+"""
+Server-Sent Events broadcast hub.
+
+Each web process runs one ``SSEHub``. Published events go through a backend
+that assigns ids and fans them out to every process's hub:
+
+* ``LocalBackend``  - single process (default, the dev server);
+* ``SQLiteBackend`` - several processes on one host, via an ``sse_events``
+  table in data.db; the local stand-in for Redis;
+* ``RedisBackend``  - Redis pub/sub (``SSE_BACKEND=redis://...``).
+
+Subscribers get a bounded ring buffer. When a slow client's buffer is full
+the hub either drops its oldest events or disconnects it (the client then
+reconnects with ``Last-Event-ID`` and is replayed from the history buffer).
+Events are delivered only to subscribers of one of their topics, e.g.
+``user:3`` or ``resume:42``; events without topics go to everyone.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from connections import connect
+
+try:
+    import redis
+except Exception:
+    redis = None
+
+
+DROP = 'drop'
+DISCONNECT = 'disconnect'
+
+
+def format_event(event):
+    """Encode an event dict as an SSE message (with id so clients can resume)."""
+    lines = []
+    if event.get('id') is not None:
+        lines.append(f"id: {event['id']}")
+    lines.extend(f'data: {line}' for line in event['data'].split('\n'))
+    return '\n'.join(lines) + '\n\n'
+
+
+HEARTBEAT = ': keepalive\n\n'
+
+
+class Subscriber:
+    """One connected client: a topic filter plus a bounded buffer of pending events."""
+
+    def __init__(self, topics, buffer_size, policy, notify=None):
+        self.topics = frozenset(topics)
+        self.buffer_size = buffer_size
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._notify = notify
+
+    def push(self, event):
+        with self._cond:
+            if self.closed:
+                return
+            if len(self._buffer) >= self.buffer_size:
+                if self.policy == DISCONNECT:
+                    self.closed = True
+                    self._buffer.clear()
+                else:
+                    self._buffer.popleft()
+                    self.dropped += 1
+            if not self.closed:
+                self._buffer.append(event)
+            self._cond.notify()
+        if self._notify:
+            self._notify()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+        if self._notify:
+            self._notify()
+
+    def drain(self):
+        """Return and clear pending events; a notice is prepended if events were dropped."""
+        with self._cond:
+            events = list(self._buffer)
+            self._buffer.clear()
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            events.insert(0, {'id': None, 'data': json.dumps({'type': 'events_dropped', 'count': dropped})})
+        return events
+
+    def wait(self, timeout):
+        """Block until events arrive, the subscriber closes, or timeout; returns drain()."""
+        with self._cond:
+            if not self._buffer and not self.closed:
+                self._cond.wait(timeout)
+        return self.drain()
+
+
+class SSEHub:
+    """Per-process registry of subscribers, fed by a backend shared between processes."""
+
+    def __init__(self, backend=None, buffer_size=256, history_size=1000, policy=DROP):
+        self.backend = backend or LocalBackend()
+        self.buffer_size = buffer_size
+        self.policy = policy
+        self._history = deque(maxlen=history_size)
+        self._by_topic = {}
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def _start(self):
+        # started lazily so backend threads are created after any pre-fork import
+        if not self._started:
+            with self._lock:
+                if not self._started:
+                    self.backend.start(self._deliver)
+                    self._started = True
+
+    def publish(self, data, topics=()):
+        """Publish a JSON-serializable dict to subscribers of any of topics (all subscribers if none)."""
+        self._start()
+        self.backend.publish(json.dumps(data), sorted(set(topics)))
+
+    def subscribe(self, topics, last_event_id=None, notify=None):
+        """Register a subscriber; events after last_event_id still in history are queued first."""
+        self._start()
+        sub = Subscriber(topics, self.buffer_size, self.policy, notify)
+        with self._lock:
+            if last_event_id is not None:
+                history = list(self._history)
+                missed = [e for e in history if e['id'] > last_event_id and self._matches(sub, e)]
+                # history no longer reaches back to last_event_id, or more was missed than fits the buffer
+                incomplete = (len(history) == self._history.maxlen and history[0]['id'] > last_event_id + 1) or \
+                    len(missed) > self.buffer_size
+                if incomplete:
+                    missed = missed[len(missed) - self.buffer_size + 1:] if len(missed) >= self.buffer_size else missed
+                    sub.push({'id': None, 'data': json.dumps({'type': 'replay_incomplete'})})
+                for event in missed:
+                    sub.push(event)
+            self._subscribers.add(sub)
+            for topic in sub.topics:
+                self._by_topic.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+            for topic in sub.topics:
+                subs = self._by_topic.get(topic)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._by_topic[topic]
+        sub.close()
+
+    @staticmethod
+    def _matches(sub, event):
+        return not event['topics'] or not sub.topics.isdisjoint(event['topics'])
+
+    def _deliver(self, event):
+        """Called by the backend (from any thread) for every event, in id order."""
+        with self._lock:
+            self._history.append(event)
+            if event['topics']:
+                targets = set()
+                for topic in event['topics']:
+                    targets.update(self._by_topic.get(topic, ()))
+            else:
+                targets = list(self._subscribers)
+        for sub in targets:
+            sub.push(event)
+
+    def stream(self, topics, last_event_id=None, heartbeat=15):
+        """Blocking generator of SSE text for WSGI servers (one thread per client)."""
+        sub = self.subscribe(topics, last_event_id)
+        try:
+            yield 'retry: 3000\n\n'
+            while not sub.closed:
+                events = sub.wait(heartbeat)
+                if not events:
+                    yield HEARTBEAT
+                for event in events:
+                    yield format_event(event)
+        finally:
+            self.unsubscribe(sub)
+
+    async def astream(self, topics, last_event_id=None, heartbeat=15):
+        """Async generator of SSE text for asyncio servers; an idle client costs one small object."""
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        sub = self.subscribe(topics, last_event_id, notify=lambda: loop.call_soon_threadsafe(wake.set))
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                wake.clear()
+                events = sub.drain()
+                for event in events:
+                    yield format_event(event)
+                if sub.closed:
+                    break
+                if not events:
+                    try:
+                        await asyncio.wait_for(wake.wait(), heartbeat)
+                    except asyncio.TimeoutError:
+                        yield HEARTBEAT
+        finally:
+            self.unsubscribe(sub)
+
+
+class LocalBackend:
+    """In-process fan-out; ids start from the clock so they keep increasing across restarts."""
+
+    def __init__(self):
+        self._next_id = int(time.time() * 1000)
+        self._lock = threading.Lock()
+        self._deliver = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, data, topics):
+        # the lock keeps ids and delivery order consistent across request threads
+        with self._lock:
+            self._next_id += 1
+            self._deliver({'id': self._next_id, 'data': data, 'topics': frozenset(topics)})
+
+
+class SQLiteBackend:
+    """Cross-process fan-out through an append-only table polled by every process."""
+
+    def __init__(self, db_path, poll_interval=0.25, keep=5000):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.keep = keep
+        self._local = threading.local()
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = connect(self.db_path)
+        return db
+
+    @staticmethod
+    def init_table(db):
+        db.execute('''CREATE TABLE IF NOT EXISTS sse_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            topics TEXT NOT NULL,
+            data TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )''')
+
+    def start(self, deliver):
+        db = self._db()
+        self.init_table(db)
+        db.commit()
+        last = db.execute('SELECT MAX(id) FROM sse_events').fetchone()[0] or 0
+        threading.Thread(target=self._poll, args=(deliver, last), name='sse-poll', daemon=True).start()
+
+    def publish(self, data, topics):
+        db = self._db()
+        db.execute('INSERT INTO sse_events (topics, data, created_at) VALUES (?, ?, ?)',
+                   (json.dumps(topics), data, datetime.utcnow().isoformat()))
+        db.commit()
+
+    def _poll(self, deliver, last):
+        db = self._db()
+        polls = 0
+        while True:
+            try:
+                rows = db.execute('SELECT id, topics, data FROM sse_events WHERE id > ? ORDER BY id', (last,)).fetchall()
+                for event_id, topics, data in rows:
+                    deliver({'id': event_id, 'data': data, 'topics': frozenset(json.loads(topics))})
+                    last = event_id
+                polls += 1
+                if polls % 200 == 0:
+                    db.execute('DELETE FROM sse_events WHERE id <= ?', (last - self.keep,))
+                    db.commit()
+            except sqlite3.Error as e:
+                print('SSE poll failed:', e)
+            time.sleep(self.poll_interval)
+
+
+class RedisBackend:
+    """Cross-host fan-out over Redis pub/sub; ids come from INCR so every process agrees on order."""
+
+    def __init__(self, url, channel='skill-matcher:events'):
+        if redis is None:
+            raise RuntimeError('The redis package is required for SSE_BACKEND=redis://...')
+        self.client = redis.Redis.from_url(url)
+        self.channel = channel
+
+    def start(self, deliver):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+
+        def listen():
+            for message in pubsub.listen():
+                try:
+                    event = json.loads(message['data'])
+                    deliver({'id': event['id'], 'data': event['data'], 'topics': frozenset(event['topics'])})
+                except Exception as e:
+                    print('Bad SSE message from Redis:', e)
+        threading.Thread(target=listen, name='sse-redis', daemon=True).start()
+
+    def publish(self, data, topics):
+        event_id = self.client.incr(self.channel + ':id')
+        self.client.publish(self.channel, json.dumps({'id': event_id, 'data': data, 'topics': topics}))
+
+
+def event_topics(event, user_id=None):
+    """Topics an event dict is delivered to: its user, resume, job and job profile."""
+    topics = []
+    if user_id:
+        topics.append(f'user:{user_id}')
+    if event.get('resume_id'):
+        topics.append(f"resume:{event['resume_id']}")
+    if event.get('job_id'):
+        topics.append(f"job:{event['job_id']}")
+    if event.get('job_profile_id'):
+        topics.append(f"job_profile:{event['job_profile_id']}")
+    return topics
+
+
+def open_publisher(url, db_path):
+    """publish(event, user_id=None) for processes that only send events (CLI tools); None for 'memory'."""
+    backend = backend_from_url(url, db_path)
+    if isinstance(backend, LocalBackend):
+        return None  # nobody outside this process would see the events
+    if isinstance(backend, SQLiteBackend):
+        db = backend._db()
+        backend.init_table(db)
+        db.commit()
+
+    def publish(event, user_id=None):
+        backend.publish(json.dumps(event), sorted(set(event_topics(event, user_id))))
+    return publish
+
+
+def backend_from_url(url, db_path):
+    """Build a backend from SSE_BACKEND: 'memory' (default), 'sqlite' or a redis:// URL."""
+    if not url or url == 'memory':
+        return LocalBackend()
+    if url == 'sqlite':
+        return SQLiteBackend(db_path)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url)
+    raise ValueError(f'Unknown SSE_BACKEND: {url}')
@@ -0,0 +1,189 @@
+"""
+Text and skill extraction for stored resume files.
+
+Kept free of Flask so the functions can run inside worker processes.
+"""
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from contextlib import contextmanager
+
+import PyPDF2
+
+sys.path.insert(0, os.path.dirname(__file__))
+# Optional NLP module (improved skill extraction); loaded lazily by inference
+from inference import nlp_available, nlp_call
+from metrics import NLP_FALLBACKS, span
+import skills as skills_module
+from skills import extract_certifications, extract_skills, skill_matcher, skills_result
+
+
+# Cache key for extraction results; changes with the taxonomy and with NLP availability
+HAS_NLP = nlp_available()
+EXTRACTOR_VERSION = skills_module.EXTRACTOR_VERSION + ('+nlp' if HAS_NLP else '')
+
+# Guards against pathological PDFs (0 disables a limit)
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 50))
+PDF_PAGE_TIMEOUT = float(os.environ.get('PDF_PAGE_TIMEOUT', 5))
+# Page-parallel extraction for large PDFs parsed in the request thread
+PDF_PAGE_WORKERS = int(os.environ.get('PDF_PAGE_WORKERS', min(4, os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 16))
+# extra seconds a pooled page range may take on top of its page budgets (worker start-up)
+PDF_POOL_GRACE = float(os.environ.get('PDF_POOL_GRACE', 10))
+_page_executor = None
+
+
+class PageTimeout(Exception):
+    """Raised when a single PDF page exceeds its extraction time budget."""
+
+
+@contextmanager
+def _time_limit(seconds):
+    """Interrupt the block after seconds using SIGALRM (main thread on Unix only).
+
+    Worker processes and the CLI run extraction on their main thread, so the
+    budget is enforced there. Elsewhere this is a no-op, which is why
+    iter_pdf_pages sends the pages of a web request thread to the page pool.
+    """
+    usable = (seconds and hasattr(signal, 'setitimer')
+              and threading.current_thread() is threading.main_thread())
+    if not usable:
+        yield
+        return
+
+    def _raise(_signum, _frame):
+        raise PageTimeout(f'page extraction exceeded {seconds}s')
+    previous = signal.signal(signal.SIGALRM, _raise)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _page_text(page, page_timeout):
+    try:
+        with _time_limit(page_timeout):
+            return page.extract_text() or ""
+    except PageTimeout as e:
+        print(f"Skipping PDF page: {e}")
+        return ""
+
+
+def _extract_page_range(file_path, start, stop, page_timeout):
+    """Worker task: extract pages [start, stop) of a PDF."""
+    with open(file_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        return [_page_text(reader.pages[i], page_timeout) for i in range(start, stop)]
+
+
+def _page_pool():
+    global _page_executor
+    if _page_executor is None:
+        _page_executor = ProcessPoolExecutor(max_workers=PDF_PAGE_WORKERS,
+                                             mp_context=multiprocessing.get_context('spawn'))
+    return _page_executor
+
+
+def iter_pdf_pages(file_path, max_pages=None, page_timeout=None, parallel=False):
+    """Yield the text of each PDF page in order.
+
+    At most max_pages pages are read and each page gets page_timeout seconds.
+    With parallel=True, documents of PDF_PARALLEL_MIN_PAGES or more are split
+    into page ranges extracted on a shared process pool; pages are still
+    yielded in order as soon as their range is done. Off the main thread
+    (web requests), where SIGALRM cannot enforce page_timeout, the pages are
+    always extracted on the pool, whose workers enforce it; a range that
+    still overruns its budget by PDF_POOL_GRACE seconds is skipped.
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    page_timeout = PDF_PAGE_TIMEOUT if page_timeout is None else page_timeout
+    with open(file_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        total = len(reader.pages)
+        count = min(total, max_pages) if max_pages else total
+        if total > count:
+            print(f"PDF {os.path.basename(file_path)} has {total} pages; extracting the first {count}")
+        split = parallel and PDF_PAGE_WORKERS > 1 and count >= PDF_PARALLEL_MIN_PAGES
+        unguarded = page_timeout and threading.current_thread() is not threading.main_thread()
+        if not count or not (split or unguarded):
+            for i in range(count):
+                yield _page_text(reader.pages[i], page_timeout)
+            return
+    step = -(-count // PDF_PAGE_WORKERS) if split else count
+    ranges = [(start, min(start + step, count)) for start in range(0, count, step)]
+    futures = [_page_pool().submit(_extract_page_range, file_path, start, stop, page_timeout)
+               for start, stop in ranges]
+    for (start, stop), future in zip(ranges, futures):
+        budget = page_timeout * (stop - start) + PDF_POOL_GRACE if page_timeout else None
+        try:
+            yield from future.result(timeout=budget)
+        except FuturesTimeout:
+            print(f"Skipping PDF pages {start}-{stop - 1}: extraction exceeded {budget:.0f}s")
+            yield from [""] * (stop - start)
+
+
+def extract_text(file_path, parallel=False):
+    """Extract text from a PDF or TXT file."""
+    if file_path.lower().endswith('.pdf'):
+        try:
+            return "\n".join(iter_pdf_pages(file_path, parallel=parallel))
+        except Exception as e:
+            print(f"Error extracting PDF text: {e}")
+            return ""
+    elif file_path.lower().endswith('.txt'):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except Exception as e:
+            print(f"Error reading TXT file: {e}")
+            return ""
+    return ""
+
+
+def extract_resume_skills(text):
+    """Extract skills from text, preferring the NLP module when available."""
+    if HAS_NLP:
+        try:
+            return nlp_call('extract_skills', text)
+        except Exception as e:
+            NLP_FALLBACKS.inc(operation='extract_skills')
+            print('NLP extraction failed, falling back to simple extractor:', e)
+    return extract_skills(text)
+
+
+def extract_resume(file_path, parallel=False):
+    """Extract text and skills from a stored file.
+
+    For PDFs without the NLP module, skill matching runs page by page while
+    the remaining pages are still being parsed.
+    """
+    if HAS_NLP or not file_path.lower().endswith('.pdf'):
+        with span('extract_text'):
+            text = extract_text(file_path, parallel=parallel)
+        with span('extract_skills'):
+            return text, extract_resume_skills(text)
+    pages = []
+    found = set()
+    try:
+        # pipelined: the skill matching of parsed pages overlaps with parsing the rest
+        with span('extract_text_and_match'):
+            for _ in skill_matcher.find_pages(_collect(iter_pdf_pages(file_path, parallel=parallel), pages), found):
+                pass
+    except Exception as e:
+        print(f"Error extracting PDF text: {e}")
+        return "", extract_skills("")
+    text = "\n".join(pages)
+    with span('extract_skills'):
+        return text, skills_result(skill_matcher.group(found), extract_certifications(text))
+
+
+def _collect(iterable, sink):
+    """Pass items through while appending them to sink."""
+    for item in iterable:
+        sink.append(item)
+        yield item
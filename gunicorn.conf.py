@@ -0,0 +1,65 @@
+"""
+gunicorn settings for production (``gunicorn -c gunicorn.conf.py``).
+
+By default this serves ``asgi:app`` on uvicorn workers: ``/stream`` runs as
+a coroutine, so open SSE connections do not pin threads, and Flask requests
+run on ASGI_THREADS threads per worker. GUNICORN_WORKER_CLASS=gthread serves
+the plain WSGI app (``wsgi:app``) instead; put SSE behind a separate ASGI
+service then, since every stream holds one of the THREADS threads.
+
+preload_app imports the app in the master (create_app: schema, skill index,
+PRELOAD_MODELS=1 models) and forks the workers afterwards, so they share that
+memory copy-on-write and start serving at once. Static files are served by
+nginx (config/nginx.conf), not by these workers.
+
+create_app also requeues extraction jobs orphaned by a dead process; each
+worker then dispatches queued jobs and repeats that check every
+JOB_RECOVERY_INTERVAL seconds (post_fork).
+
+With more than one worker, SSE events must cross processes: SSE_BACKEND
+defaults to 'sqlite' then, and 'memory' is refused.
+
+Environment: PORT, WEB_CONCURRENCY (workers, default 2 x CPUs + 1, capped at
+8 because every worker holds its own caches and models), THREADS, TIMEOUT,
+GRACEFUL_TIMEOUT, MAX_REQUESTS, SSE_BACKEND, JOB_RECOVERY_INTERVAL.
+"""
+import multiprocessing
+import os
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn.workers.UvicornWorker')
+wsgi_app = 'wsgi:app' if worker_class in ('sync', 'gthread') else 'asgi:app'
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', min(8, multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.environ.get('THREADS', 8))
+# uvicorn workers run Flask requests on asgi.py's thread slots
+os.environ.setdefault('ASGI_THREADS', str(threads))
+if workers > 1:
+    # an event published in one worker must reach /stream clients connected to the others
+    os.environ.setdefault('SSE_BACKEND', 'sqlite')
+    if os.environ['SSE_BACKEND'] == 'memory':
+        raise RuntimeError(f'SSE_BACKEND=memory only reaches clients of one worker; with {workers} workers '
+                           'use sqlite or a redis:// URL (or WEB_CONCURRENCY=1)')
+
+preload_app = True
+timeout = int(os.environ.get('TIMEOUT', 60))  # uploads extract synchronously unless ASYNC_EXTRACTION=1
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+# recycle workers now and then so a slow leak cannot grow without bound; jitter avoids restarting all at once
+max_requests = int(os.environ.get('MAX_REQUESTS', 5000))
+max_requests_jitter = max_requests // 10
+forwarded_allow_ips = os.environ.get('FORWARDED_ALLOW_IPS', '127.0.0.1')
+accesslog = '-'
+
+
+def when_ready(server):
+    from app import startup_timings
+    total = startup_timings.get('total')
+    server.log.info('Ready to fork %d %s workers (startup %s)', workers, worker_class,
+                    f'{total * 1000:.0f} ms' if total is not None else 'not run')
+
+
+def post_fork(server, worker):
+    # the master only requeued orphaned jobs; each worker runs its own pool and recovery timer
+    from app import extraction_jobs
+    extraction_jobs.start_recovery()
@@ -0,0 +1,330 @@
+"""
+Shared, lazily loaded NLP models.
+
+The optional ``nlp`` module (spaCy) and the local SentenceTransformer are
+loaded on first use rather than at import, so processes that never extract
+skills never pay for them. Two ways to avoid one copy per web worker:
+
+* ``preload()`` / ``warm_up()`` before the server forks (``PRELOAD_MODELS=1``
+  with ``gunicorn --preload``) so workers share the weights copy-on-write;
+* a single inference sidecar (``scripts/inference_server.py``) that owns the
+  models and serves workers over a Unix socket (``INFERENCE_SOCKET``),
+  batching concurrent ``encode`` calls into one forward pass.
+"""
+import base64
+import importlib.util
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+MODEL_DIR = os.environ.get('MODEL_DIR', os.path.join(os.path.dirname(__file__), 'models'))
+SENTENCE_MODEL_PATH = os.path.join(MODEL_DIR, 'sentence_transformers', 'all-MiniLM-L6-v2')
+INFERENCE_SOCKET = os.environ.get('INFERENCE_SOCKET')
+INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 30))
+# Sidecar batching: wait at most this long for more encode requests before running a batch
+INFERENCE_BATCH_WAIT = float(os.environ.get('INFERENCE_BATCH_WAIT', 0.005))
+INFERENCE_MAX_BATCH = int(os.environ.get('INFERENCE_MAX_BATCH', 128))
+# Functions of the nlp module that may be called through nlp_call()
+NLP_FUNCTIONS = ('extract_skills', 'compute_match_score')
+
+
+class LazyModel:
+    """Loads a model once, on first get(), from any thread; get() returns None if loading failed."""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def get(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    try:
+                        self._model = self.loader()
+                        print(f'Loaded {self.name} model in {time.perf_counter() - start:.1f}s')
+                    except Exception as e:
+                        print(f'{self.name} model unavailable:', e)
+                        self._model = False
+        return self._model or None
+
+
+def _load_nlp():
+    import nlp
+    return nlp
+
+
+def _load_sentence_transformer():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(SENTENCE_MODEL_PATH if os.path.isdir(SENTENCE_MODEL_PATH) else 'all-MiniLM-L6-v2',
+                               device='cpu')
+
+
+MODELS = {
+    'nlp': LazyModel('nlp', _load_nlp),
+    'sentence_transformer': LazyModel('sentence_transformer', _load_sentence_transformer),
+}
+
+
+def get_model(name):
+    """Return a loaded model (or the nlp module) by name, loading it on first use."""
+    return MODELS[name].get()
+
+
+def nlp_available():
+    """True when the optional nlp module is installed, checked without importing it."""
+    return importlib.util.find_spec('nlp') is not None
+
+
+def nlp_call(function, *args):
+    """Call a function of the nlp module locally or on the sidecar."""
+    if function not in NLP_FUNCTIONS:
+        raise ValueError(f'unsupported nlp function: {function}')
+    if INFERENCE_SOCKET:
+        return client().request({'op': 'nlp', 'function': function, 'args': list(args)})['result']
+    module = get_model('nlp')
+    if module is None:
+        raise RuntimeError('nlp module is not available')
+    return getattr(module, function)(*args)
+
+
+def encoder_available():
+    """True when sentence embeddings can be computed (locally or on the sidecar)."""
+    if np is None:
+        return False
+    if INFERENCE_SOCKET:
+        return bool(client().info().get('sentence_transformer'))
+    return get_model('sentence_transformer') is not None
+
+
+def encode_local(texts, batch_size):
+    """Encode texts with the in-process model into L2-normalized float32 vectors."""
+    encoder = get_model('sentence_transformer')
+    if encoder is None or np is None:
+        raise RuntimeError('Embedding model is not available')
+    if not texts:
+        return np.zeros((0, encoder.get_sentence_embedding_dimension()), dtype=np.float32)
+    return encoder.encode(list(texts), batch_size=batch_size, convert_to_numpy=True,
+                          normalize_embeddings=True, show_progress_bar=False).astype(np.float32)
+
+
+def preload(names=None):
+    """Load models now (e.g. in the master process before workers fork); returns the names loaded."""
+    return [name for name in (names or MODELS) if get_model(name) is not None]
+
+
+def warm_up(names=None):
+    """Load models and run one tiny inference each so the first request does not pay for lazy init."""
+    loaded = preload(names)
+    if 'sentence_transformer' in loaded:
+        encode_local(['warm-up'], 1)
+    if 'nlp' in loaded:
+        try:
+            get_model('nlp').extract_skills('Python developer')
+        except Exception as e:
+            print('nlp warm-up failed:', e)
+    return loaded
+
+
+# --- Unix-socket sidecar -------------------------------------------------
+
+def _send(sock, message):
+    data = json.dumps(message).encode('utf-8')
+    sock.sendall(struct.pack('>I', len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError('inference socket closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv(sock):
+    (size,) = struct.unpack('>I', _recv_exact(sock, 4))
+    return json.loads(_recv_exact(sock, size))
+
+
+class EncodeBatcher:
+    """Collects concurrent encode requests and runs them as one model batch."""
+
+    def __init__(self, max_batch=INFERENCE_MAX_BATCH, wait=INFERENCE_BATCH_WAIT):
+        self.max_batch = max_batch
+        self.wait = wait
+        self._queue = queue.Queue()
+        self.batches = 0
+        threading.Thread(target=self._run, name='encode-batcher', daemon=True).start()
+
+    def submit(self, texts):
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            count = len(pending[0][0])
+            deadline = time.monotonic() + self.wait
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                count += len(item[0])
+            texts = [t for item_texts, _ in pending for t in item_texts]
+            try:
+                vectors = encode_local(texts, self.max_batch)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            offset = 0
+            for item_texts, future in pending:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                message = _recv(self.request)
+            except (ConnectionError, struct.error, ValueError):
+                return
+            try:
+                _send(self.request, server.dispatch(message))
+            except (BrokenPipeError, ConnectionError):
+                return
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Owns the models for every web worker on the host; one thread per client connection."""
+
+    daemon_threads = True
+    request_queue_size = 512
+
+    def __init__(self, path, batcher=None):
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o660)
+        self.batcher = batcher or EncodeBatcher()
+        self._nlp_lock = threading.Lock()
+
+    def dispatch(self, message):
+        op = message.get('op')
+        try:
+            if op == 'encode':
+                vectors = self.batcher.submit(message['texts']).result()
+                return {'shape': list(vectors.shape),
+                        'data': base64.b64encode(np.ascontiguousarray(vectors, dtype=np.float32).tobytes()).decode()}
+            if op == 'nlp':
+                if message.get('function') not in NLP_FUNCTIONS:
+                    return {'error': 'unsupported nlp function'}
+                module = get_model('nlp')
+                if module is None:
+                    return {'error': 'nlp module is not available'}
+                with self._nlp_lock:
+                    return {'result': getattr(module, message['function'])(*message.get('args', []))}
+            if op == 'info':
+                return {'nlp': get_model('nlp') is not None,
+                        'sentence_transformer': get_model('sentence_transformer') is not None,
+                        'batches': self.batcher.batches}
+            return {'error': f'unknown op: {op}'}
+        except Exception as e:
+            return {'error': str(e)}
+
+
+class InferenceClient:
+    """Client for InferenceServer; keeps one connection per thread and reconnects once on failure."""
+
+    def __init__(self, path, timeout=INFERENCE_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._info = None
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self._local.sock = sock
+        return sock
+
+    def request(self, message):
+        for attempt in (0, 1):
+            sock = getattr(self._local, 'sock', None)
+            try:
+                sock = sock or self._connect()
+                _send(sock, message)
+                reply = _recv(sock)
+                break
+            except OSError:
+                if sock:
+                    sock.close()
+                self._local.sock = None
+                if attempt:
+                    raise
+        if 'error' in reply:
+            raise RuntimeError(reply['error'])
+        return reply
+
+    def info(self):
+        """Which models the sidecar can serve (cached after the first successful call)."""
+        if self._info is None:
+            try:
+                self._info = self.request({'op': 'info'})
+            except Exception as e:
+                print('Inference sidecar unavailable:', e)
+                return {}
+        return self._info
+
+    def encode(self, texts):
+        reply = self.request({'op': 'encode', 'texts': list(texts)})
+        return np.frombuffer(base64.b64decode(reply['data']), dtype=np.float32).reshape(reply['shape'])
+
+
+_client = None
+
+
+def client():
+    """Shared InferenceClient for INFERENCE_SOCKET."""
+    global _client
+    if _client is None:
+        _client = InferenceClient(INFERENCE_SOCKET)
+    return _client
+
+
+def encode(texts, batch_size):
+    """Encode texts on the sidecar when INFERENCE_SOCKET is set, otherwise in-process."""
+    if INFERENCE_SOCKET:
+        return client().encode(texts)
+    return encode_local(texts, batch_size)
@@ -0,0 +1,164 @@
+"""
+Bulk resume ingestion from a ZIP archive or a directory.
+
+Files are copied into the content-addressed upload store, cache misses are
+extracted in parallel on a process pool, and rows are written in batches
+(``executemany`` transactions on SQLite, ``COPY`` on PostgreSQL). ``ingest``
+is a generator of per-file status dicts so callers (HTTP endpoint, CLI) can
+stream progress as it happens.
+"""
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from werkzeug.utils import secure_filename
+
+import storage
+from analysis import analysis_record
+from connections import connect
+from db import migrate, resume_row
+from extraction import EXTRACTOR_VERSION, extract_resume
+from repository import SQLiteRepository
+
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt')
+MAX_MEMBER_SIZE = 16 * 1024 * 1024  # same limit as a single upload
+
+
+def iter_sources(source):
+    """Yield (name, open_fn, size) for every supported file in a ZIP or directory."""
+    if os.path.isdir(source):
+        for root, _dirs, files in os.walk(source):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                yield name, (lambda p=path: open(p, 'rb')), os.path.getsize(path)
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                yield os.path.basename(info.filename), (lambda i=info: archive.open(i)), info.file_size
+    else:
+        raise ValueError(f'{source} is neither a directory nor a ZIP archive')
+
+
+def _store_sources(source, upload_folder):
+    """Copy supported files into the store; yields (status, payload)."""
+    for name, open_fn, size in iter_sources(source):
+        filename = secure_filename(name)
+        if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            yield 'skipped', {'file': name, 'status': 'skipped', 'reason': 'unsupported file type'}
+            continue
+        if size > MAX_MEMBER_SIZE:
+            yield 'skipped', {'file': name, 'status': 'skipped', 'reason': 'file too large'}
+            continue
+        try:
+            with open_fn() as stream:
+                content_hash, file_path, _saved = storage.save_upload(stream, upload_folder, filename)
+        except Exception as e:
+            yield 'error', {'file': name, 'status': 'error', 'error': f'Failed to save file: {e}'}
+            continue
+        yield 'stored', (filename, file_path, content_hash)
+
+
+def ingest(source, db_path, upload_folder, workers=None, batch_size=200, repo=None, on_stored=None):
+    """Ingest every resume under source and yield a status dict per file.
+
+    Resume rows and their precomputed analyses go to repo (default: the
+    SQLite database at db_path); the extraction cache always lives in db_path. The final item has status
+    'summary' with totals and elapsed time. on_stored(resume_id, filename, skills) is called for
+    every resume once its batch is stored.
+    """
+    started = time.perf_counter()
+    totals = {'ingested': 0, 'cached': 0, 'skipped': 0, 'error': 0}
+    if repo is None:
+        repo = SQLiteRepository(db_path)
+    db = connect(db_path)
+    try:
+        migrate(db)
+        # pending rows: (payload dict, resume_row tuple); flushed in batches
+        pending = []
+        cache_rows = []
+
+        def flush():
+            if cache_rows:
+                for args in cache_rows:
+                    storage.put_cached_extraction(db, *args)
+                db.commit()
+                del cache_rows[:]
+            rows = [row for _payload, row in pending]
+            ids = repo.insert_resumes(rows)
+            skills = [json.loads(row[3]) for row in rows]
+            repo.put_analyses([(resume_id, analysis_record(resume_id, row[0], found))
+                               for resume_id, row, found in zip(ids, rows, skills)])
+            for (payload, row), resume_id, found in zip(pending, ids, skills):
+                if on_stored is not None:
+                    on_stored(resume_id, row[0], found)
+                payload['resume_id'] = resume_id
+                yield payload
+            del pending[:]
+
+        def extracted(future, content_hash):
+            files = to_extract.pop(content_hash)
+            try:
+                text, skills = future.result()
+            except Exception as e:
+                for filename, _path in files:
+                    totals['error'] += 1
+                    yield {'file': filename, 'status': 'error', 'error': str(e)}
+                return
+            cache_rows.append((content_hash, EXTRACTOR_VERSION, text, skills))
+            skills_found = sum(len(v) for v in skills.values() if isinstance(v, list))
+            for filename, file_path in files:
+                totals['ingested'] += 1
+                pending.append(({'file': filename, 'status': 'ingested', 'content_hash': content_hash,
+                                 'skills_found': skills_found},
+                                resume_row(filename, file_path, content_hash, text, skills,
+                                           extractor_version=EXTRACTOR_VERSION)))
+            if len(pending) >= batch_size:
+                yield from flush()
+
+        to_extract = {}  # content_hash -> [(filename, file_path)] sharing one extraction
+        futures = {}
+        # workers are spawned lazily on first submit, so an all-cached batch never starts any
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            for status, payload in _store_sources(source, upload_folder):
+                # report extractions that finished while we were still copying files
+                for future in [f for f in futures if f.done()]:
+                    yield from extracted(future, futures.pop(future))
+                if status != 'stored':
+                    totals[status] += 1
+                    yield payload
+                    continue
+                filename, file_path, content_hash = payload
+                if content_hash in to_extract:
+                    to_extract[content_hash].append((filename, file_path))
+                    continue
+                cached = storage.get_cached_extraction(db, content_hash, EXTRACTOR_VERSION)
+                if cached is None:
+                    to_extract[content_hash] = [(filename, file_path)]
+                    futures[pool.submit(extract_resume, file_path)] = content_hash
+                    continue
+                text, skills = cached
+                totals['cached'] += 1
+                pending.append(({'file': filename, 'status': 'cached', 'content_hash': content_hash},
+                                resume_row(filename, file_path, content_hash, text, skills,
+                                           extractor_version=EXTRACTOR_VERSION)))
+                if len(pending) >= batch_size:
+                    yield from flush()
+            for future in as_completed(list(futures)):
+                yield from extracted(future, futures.pop(future))
+        yield from flush()
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    processed = totals['ingested'] + totals['cached']
+    yield {
+        'status': 'summary',
+        **totals,
+        'elapsed_seconds': round(elapsed, 3),
+        'files_per_second': round(processed / elapsed, 2) if elapsed else None
+    }
@@ -0,0 +1,201 @@
+"""
+Population-level aggregates over the stored resumes, for dashboards.
+
+Three count tables describe every resume that has a stored analysis:
+``skill_counts`` (resumes per normalized skill), ``skill_pairs`` (resumes
+listing both skills, one row per pair with skill_a < skill_b) and
+``score_counts`` (resumes per match score). They are kept current
+incrementally: each repository's ``put_analyses`` subtracts the
+contribution of the analysis it replaces and adds the new one in the same
+transaction, so the counts always equal a full scan of resume_analysis
+without ever running one.
+
+``Insights`` keeps this process's snapshot of the skill and score counts
+(reloaded at most every INSIGHTS_REFRESH seconds) with the ranking and the
+cumulative score distribution precomputed, so top-N lists and percentiles
+are answered without touching the database; co-occurrence lists are one
+indexed read per skill and cached with the snapshot.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from analysis import salary_table
+from search import normalized_skills
+
+
+INSIGHTS_REFRESH = float(os.environ.get('INSIGHTS_REFRESH', 5))
+MAX_SCORE = 100
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BUCKET = 10
+# co-occurring skills fetched (and cached) per skill
+CO_OCCURRING_MAX = 50
+
+
+def init_aggregates(db):
+    """Create the aggregate count tables if they do not exist."""
+    db.execute('''CREATE TABLE IF NOT EXISTS skill_counts (
+        skill TEXT PRIMARY KEY,
+        resumes INTEGER NOT NULL
+    ) WITHOUT ROWID''')
+    db.execute('''CREATE TABLE IF NOT EXISTS skill_pairs (
+        skill_a TEXT NOT NULL,
+        skill_b TEXT NOT NULL,
+        resumes INTEGER NOT NULL,
+        PRIMARY KEY (skill_a, skill_b)
+    ) WITHOUT ROWID''')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_skill_pairs_b ON skill_pairs (skill_b)')
+    db.execute('''CREATE TABLE IF NOT EXISTS score_counts (
+        score INTEGER PRIMARY KEY,
+        resumes INTEGER NOT NULL
+    )''')
+
+
+def contribution(body):
+    """(normalized skills, score) that one serialized analysis adds to the aggregates."""
+    data = json.loads(body)
+    score = min(MAX_SCORE, max(0, int(data.get('score') or 0)))
+    return normalized_skills(data.get('skills') or {}), score
+
+
+def aggregate_deltas(added, removed=()):
+    """Count changes (skills, pairs, scores) for analysis bodies added and removed; zero entries are dropped."""
+    skills, pairs, scores = Counter(), Counter(), Counter()
+    for bodies, sign in ((added, 1), (removed, -1)):
+        for body in bodies:
+            names, score = contribution(body)
+            ordered = sorted(names)
+            for i, a in enumerate(ordered):
+                skills[a] += sign
+                for b in ordered[i + 1:]:
+                    pairs[(a, b)] += sign
+            scores[score] += sign
+    return tuple({key: n for key, n in counts.items() if n} for counts in (skills, pairs, scores))
+
+
+def apply_aggregates(db, deltas):
+    """Add count deltas from aggregate_deltas() to the SQLite tables (caller commits)."""
+    skills, pairs, scores = deltas
+    db.executemany('INSERT INTO skill_counts (skill, resumes) VALUES (?, ?) ON CONFLICT (skill) '
+                   'DO UPDATE SET resumes = skill_counts.resumes + excluded.resumes', skills.items())
+    db.executemany('INSERT INTO skill_pairs (skill_a, skill_b, resumes) VALUES (?, ?, ?) ON CONFLICT (skill_a, skill_b) '
+                   'DO UPDATE SET resumes = skill_pairs.resumes + excluded.resumes',
+                   [(a, b, n) for (a, b), n in pairs.items()])
+    db.executemany('INSERT INTO score_counts (score, resumes) VALUES (?, ?) ON CONFLICT (score) '
+                   'DO UPDATE SET resumes = score_counts.resumes + excluded.resumes', scores.items())
+
+
+def rebuild_aggregates(db, batch_size=1000):
+    """Recompute the SQLite count tables from every stored analysis (caller commits)."""
+    for table in ('skill_counts', 'skill_pairs', 'score_counts'):
+        db.execute(f'DELETE FROM {table}')
+    last_id = 0
+    while True:
+        rows = db.execute('SELECT resume_id, body FROM resume_analysis WHERE resume_id > ? ORDER BY resume_id LIMIT ?',
+                          (last_id, batch_size)).fetchall()
+        if not rows:
+            break
+        apply_aggregates(db, aggregate_deltas([body for _id, body in rows]))
+        last_id = rows[-1][0]
+
+
+class Insights:
+    """This process's snapshot of the aggregates, with rankings and percentiles precomputed."""
+
+    def __init__(self, repo, refresh_interval=INSIGHTS_REFRESH):
+        self.repo = repo
+        self.refresh_interval = refresh_interval
+        self._loaded_at = None
+        self._total = 0
+        self._skills = {}
+        self._ranked = []
+        self._cumulative = [0] * (MAX_SCORE + 1)
+        self._percentiles = {}
+        self._pairs = {}
+        self._lock = threading.Lock()
+
+    @property
+    def total(self):
+        """Resumes counted in the current snapshot."""
+        return self._total
+
+    def refresh(self, force=False):
+        """Reload the skill and score counts if forced or older than refresh_interval."""
+        with self._lock:
+            if not force and self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+            skills, scores = self.repo.aggregate_counts()
+            cumulative = []
+            running = 0
+            for score in range(MAX_SCORE + 1):
+                running += scores.get(score, 0)
+                cumulative.append(running)
+            self._skills = {skill: n for skill, n in skills.items() if n > 0}
+            self._ranked = sorted(self._skills.items(), key=lambda item: (-item[1], item[0]))
+            self._cumulative = cumulative
+            self._total = running
+            self._percentiles = {p: self._score_at(p) for p in PERCENTILES}
+            self._pairs = {}
+            self._loaded_at = time.monotonic()
+
+    def _score_at(self, percentile):
+        """The score at a percentile (nearest rank over the score counts)."""
+        if not self._total:
+            return None
+        wanted = percentile / 100 * self._total
+        for score, running in enumerate(self._cumulative):
+            if running >= wanted:
+                return score
+        return MAX_SCORE
+
+    def _share(self, n):
+        return round(n / self._total, 4) if self._total else 0.0
+
+    def _skill_entry(self, skill, n):
+        entry = {'skill': skill, 'resumes': n, 'share': self._share(n)}
+        band = salary_table.get(skill)
+        if band:
+            entry['salary'] = band
+        return entry
+
+    def score_percentile(self, score):
+        """Share of resumes (0-100) scoring at or below score."""
+        if not self._total:
+            return None
+        score = min(MAX_SCORE, max(0, int(score)))
+        return round(100 * self._cumulative[score] / self._total, 1)
+
+    def score_distribution(self):
+        """Percentiles plus a chart-ready histogram in HISTOGRAM_BUCKET-point buckets."""
+        labels = []
+        values = []
+        for low in range(0, MAX_SCORE, HISTOGRAM_BUCKET):
+            # the last bucket also takes MAX_SCORE itself
+            high = MAX_SCORE if low + HISTOGRAM_BUCKET >= MAX_SCORE else low + HISTOGRAM_BUCKET - 1
+            below = self._cumulative[low - 1] if low else 0
+            labels.append(f'{low}-{high}')
+            values.append(self._cumulative[high] - below)
+        return {'percentiles': {f'p{p}': score for p, score in self._percentiles.items()},
+                'histogram': {'labels': labels, 'values': values}}
+
+    def top_skills(self, limit=20):
+        """The most common skills, most common first."""
+        return [self._skill_entry(skill, n) for skill, n in self._ranked[:limit]]
+
+    def skill(self, name, limit=10):
+        """How many resumes list a skill and which skills they most often list with it."""
+        skill = name.strip().lower()
+        n = self._skills.get(skill, 0)
+        pairs = self._pairs.get(skill)
+        if pairs is None:
+            pairs = self.repo.co_occurring_skills(skill, CO_OCCURRING_MAX) if n else []
+            if n:
+                # only known skills are cached, so the cache is bounded by skill_counts
+                with self._lock:
+                    self._pairs[skill] = pairs
+        entry = self._skill_entry(skill, n)
+        entry['co_occurring'] = [{'skill': other, 'resumes': both, 'share_of_skill': round(both / n, 4)}
+                                 for other, both in pairs[:limit]]
+        return entry
@@ -0,0 +1,218 @@
+"""
+Background extraction jobs backed by a process pool.
+
+Jobs are persisted in the ``extraction_jobs`` table of data.db, so queued or
+interrupted work is picked up again after a restart. Dispatch always pulls the
+oldest queued rows from the table, which keeps the number of in-flight jobs
+bounded no matter how many uploads arrive.
+
+Jobs left 'running' by a dead process are requeued at startup and then every
+JOB_RECOVERY_INTERVAL seconds by each serving process (start_recovery), so a
+crashed worker's jobs do not wait for the next restart.
+"""
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from connections import connect
+from extraction import extract_resume
+
+
+JOB_RECOVERY_INTERVAL = float(os.environ.get('JOB_RECOVERY_INTERVAL', 60))
+
+
+def init_jobs(db):
+    """Create the extraction_jobs table if it does not exist."""
+    db.execute('''CREATE TABLE IF NOT EXISTS extraction_jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        content_hash TEXT,
+        resume_id INTEGER,
+        worker_pid INTEGER,
+        error TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )''')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_extraction_jobs_status ON extraction_jobs (status, created_at)')
+    columns = [r[1] for r in db.execute('PRAGMA table_info(extraction_jobs)')]
+    if 'user_id' not in columns:
+        db.execute('ALTER TABLE extraction_jobs ADD COLUMN user_id INTEGER')
+
+
+def _pid_alive(pid):
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ExtractionJobs:
+    """Queue of extraction jobs executed on a bounded process pool.
+
+    on_done(job, text, skills) is called in a background thread once the
+    worker returns and must return the stored resume id; on_failed(job, error)
+    is called when extraction or storage raises.
+    """
+
+    def __init__(self, db_path, on_done, on_failed=None, max_workers=None, max_inflight=None):
+        self.db_path = db_path
+        self.on_done = on_done
+        self.on_failed = on_failed
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.max_inflight = max_inflight or self.max_workers * 2
+        self._executor = None
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._recovery_pid = None
+
+    def _connect(self):
+        return connect(self.db_path, sqlite3.Row)
+
+    def _pool(self):
+        if self._executor is None:
+            # spawn avoids forking a multi-threaded web server process
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def _set_status(self, job_id, status, resume_id=None, error=None):
+        db = self._connect()
+        try:
+            db.execute('UPDATE extraction_jobs SET status = ?, resume_id = ?, error = ?, updated_at = ? WHERE id = ?',
+                       (status, resume_id, error, datetime.utcnow().isoformat(), job_id))
+            db.commit()
+        finally:
+            db.close()
+
+    def create(self, filename, file_path, content_hash=None, user_id=None):
+        """Persist a queued job, schedule it, and return its id."""
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow().isoformat()
+        db = self._connect()
+        try:
+            db.execute('INSERT INTO extraction_jobs (id, status, filename, file_path, content_hash, user_id, created_at, '
+                       'updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                       (job_id, 'queued', filename, file_path, content_hash, user_id, now, now))
+            db.commit()
+        finally:
+            db.close()
+        self.dispatch()
+        return job_id
+
+    def get(self, job_id):
+        """Return the job row as a dict, or None."""
+        db = self._connect()
+        try:
+            row = db.execute('SELECT * FROM extraction_jobs WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            db.close()
+        return dict(row) if row else None
+
+    def requeue_orphans(self):
+        """Requeue 'running' jobs whose owning process has died; return how many."""
+        # under the lock, so a job this process claims meanwhile is already in _inflight
+        with self._lock:
+            db = self._connect()
+            try:
+                init_jobs(db)
+                running = db.execute("SELECT id, worker_pid FROM extraction_jobs WHERE status = 'running'").fetchall()
+                orphans = [(r['id'],) for r in running
+                           if r['id'] not in self._inflight and not _pid_alive(r['worker_pid'])]
+                db.executemany("UPDATE extraction_jobs SET status = 'queued', worker_pid = NULL "
+                               "WHERE id = ? AND status = 'running'", orphans)
+                db.commit()
+            finally:
+                db.close()
+        if orphans:
+            print(f"Requeued {len(orphans)} orphaned extraction job(s)")
+        return len(orphans)
+
+    def recover(self):
+        """Requeue jobs whose owning process has died and resume dispatch."""
+        self.requeue_orphans()
+        self.dispatch()
+
+    def start_recovery(self, interval=JOB_RECOVERY_INTERVAL):
+        """Run recover() now and then every interval seconds in a daemon thread (once per process)."""
+        with self._lock:
+            # a forked worker inherits the flag but not the thread, so key it by pid
+            if self._recovery_pid == os.getpid():
+                return
+            self._recovery_pid = os.getpid()
+
+        def loop():
+            while True:
+                try:
+                    self.recover()
+                except Exception as e:
+                    print(f"Extraction job recovery failed: {e}")
+                time.sleep(interval)
+
+        threading.Thread(target=loop, name='job-recovery', daemon=True).start()
+
+    def dispatch(self):
+        """Submit the oldest queued jobs until the in-flight limit is reached."""
+        with self._lock:
+            free = self.max_inflight - len(self._inflight)
+            if free <= 0:
+                return
+            claimed = []
+            db = self._connect()
+            try:
+                rows = db.execute("SELECT * FROM extraction_jobs WHERE status = 'queued' ORDER BY created_at LIMIT ?",
+                                  (free,)).fetchall()
+                for row in rows:
+                    # conditional update so two web workers never claim the same job
+                    cur = db.execute("UPDATE extraction_jobs SET status = 'running', worker_pid = ?, updated_at = ? "
+                                     "WHERE id = ? AND status = 'queued'",
+                                     (os.getpid(), datetime.utcnow().isoformat(), row['id']))
+                    if cur.rowcount:
+                        claimed.append(dict(row))
+                db.commit()
+            finally:
+                db.close()
+            for job in claimed:
+                self._inflight.add(job['id'])
+                future = self._pool().submit(extract_resume, job['file_path'])
+                future.add_done_callback(lambda f, job=job: self._finished(job, f))
+
+    def _finished(self, job, future):
+        if future.cancelled():
+            # pool shut down; the row stays 'running' and recover() requeues it
+            with self._lock:
+                self._inflight.discard(job['id'])
+            return
+        try:
+            text, skills = future.result()
+            resume_id = self.on_done(job, text, skills)
+            self._set_status(job['id'], 'done', resume_id=resume_id)
+        except Exception as e:
+            print(f"Extraction job {job['id']} failed: {e}")
+            self._set_status(job['id'], 'failed', error=str(e))
+            if self.on_failed:
+                try:
+                    self.on_failed(job, e)
+                except Exception:
+                    pass
+        finally:
+            with self._lock:
+                self._inflight.discard(job['id'])
+        self.dispatch()
+
+    def shutdown(self, wait=True):
+        """Stop the worker pool; unfinished jobs stay queued in the table."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
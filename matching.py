@@ -0,0 +1,236 @@
+"""
+Skill matching between candidates and job requirements.
+
+analyze_match compares one candidate with one job. The batched engine below
+encodes skills as integer ids packed into uint64 bitsets so a whole
+population (all resumes for a job, or all jobs for a resume) is scored with
+a handful of vectorized NumPy operations.
+"""
+import os
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+HAS_NUMPY = np is not None
+# longest job skill list accepted from clients (match requests and job profiles)
+MAX_JOB_SKILLS = int(os.environ.get('MAX_JOB_SKILLS', 500))
+if HAS_NUMPY:
+    _POPCOUNT_LUT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int32)
+
+
+def candidate_skill_list(skills):
+    """Flatten an extracted_skills dict into the candidate skill list used for matching."""
+    if not skills:
+        return []
+    return (list(skills.get('technical_skills', [])) + list(skills.get('soft_skills', []))
+            + list(skills.get('certifications', [])))
+
+
+def analyze_match(candidate_skills, job_skills):
+    """Analyze skill match between candidate and job requirements."""
+    candidate_set = set(s.lower() for s in candidate_skills)
+    job_set = set(s.lower() for s in job_skills)
+    matching = candidate_set & job_set
+    missing = job_set - candidate_set
+    additional = candidate_set - job_set
+    percent = round(len(matching) / len(job_set) * 100, 2) if job_set else 0
+    return {
+        "match_percentage": percent,
+        "matching_skills": list(matching),
+        "missing_skills": list(missing),
+        "additional_skills": list(additional)
+    }
+
+
+class SkillVocabulary:
+    """Maps lowercased skill names to dense integer ids."""
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+
+    def __len__(self):
+        return len(self._names)
+
+    def id(self, skill):
+        """Return the id of skill, assigning a new one if needed."""
+        skill = skill.lower()
+        skill_id = self._ids.get(skill)
+        if skill_id is None:
+            skill_id = self._ids[skill] = len(self._names)
+            self._names.append(skill)
+        return skill_id
+
+    def lookup(self, skill):
+        """Return the id of skill or None without assigning."""
+        return self._ids.get(skill.lower())
+
+    def name(self, skill_id):
+        return self._names[skill_id]
+
+
+class BitsetMatrix:
+    """A population of skill sets (resumes or jobs) packed as uint64 bitset rows.
+
+    Requires NumPy. Rows are appended incrementally; capacity doubles so an
+    append is amortized O(width).
+    """
+
+    def __init__(self, vocabulary=None):
+        if np is None:
+            raise RuntimeError('NumPy is required for batched matching')
+        self.vocabulary = vocabulary or SkillVocabulary()
+        self.keys = []
+        self._row_of = {}
+        self._bits = np.zeros((16, 1), dtype=np.uint64)
+        self._sizes = np.zeros(16, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _ensure(self, rows, width):
+        cap, cur_width = self._bits.shape
+        if rows <= cap and width <= cur_width:
+            return
+        new_cap = max(cap, 16)
+        while new_cap < rows:
+            new_cap *= 2
+        bits = np.zeros((new_cap, max(width, cur_width)), dtype=np.uint64)
+        bits[:cap, :cur_width] = self._bits
+        sizes = np.zeros(new_cap, dtype=np.int32)
+        sizes[:cap] = self._sizes
+        self._bits, self._sizes = bits, sizes
+
+    def encode(self, skills, assign=True):
+        """Return the uint64 word vector for a skill list (unknown skills ignored unless assign)."""
+        ids = {self.vocabulary.id(s) if assign else self.vocabulary.lookup(s) for s in skills}
+        ids.discard(None)
+        width = max(self._bits.shape[1], (len(self.vocabulary) + 63) // 64)
+        mask = 0
+        for skill_id in ids:
+            mask |= 1 << skill_id
+        words = np.frombuffer(mask.to_bytes(width * 8, 'little'), dtype='<u8').astype(np.uint64)
+        return words, len(ids)
+
+    def add(self, key, skills):
+        """Add (or replace) the row for key."""
+        words, size = self.encode(skills)
+        row = self._row_of.get(key)
+        if row is None:
+            row = len(self.keys)
+            self._row_of[key] = row
+            self.keys.append(key)
+        self._ensure(row + 1, len(words))
+        self._bits[row, :] = 0
+        self._bits[row, :len(words)] = words
+        self._sizes[row] = size
+
+    def remove(self, key):
+        """Remove the row for key by moving the last row into its slot."""
+        row = self._row_of.pop(key, None)
+        if row is None:
+            return
+        last = len(self.keys) - 1
+        if row != last:
+            moved = self.keys[last]
+            self.keys[row] = moved
+            self._row_of[moved] = row
+            self._bits[row] = self._bits[last]
+            self._sizes[row] = self._sizes[last]
+        self.keys.pop()
+        self._bits[last] = 0
+        self._sizes[last] = 0
+
+    def __contains__(self, key):
+        return key in self._row_of
+
+    def skills_of(self, key):
+        """Decode the skill names stored for key."""
+        row = self._bits[self._row_of[key]]
+        return {self.vocabulary.name(i) for i in range(len(self.vocabulary))
+                if int(row[i >> 6]) >> (i & 63) & 1}
+
+    def intersect_counts(self, words):
+        """Popcount of (row AND words) for every row."""
+        n = len(self.keys)
+        width = self._bits.shape[1]
+        query = np.zeros(width, dtype=np.uint64)
+        query[:min(width, len(words))] = words[:width]
+        return _popcount_rows(self._bits[:n] & query)
+
+    def sizes(self):
+        return self._sizes[:len(self.keys)]
+
+
+def _popcount_rows(words):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT_LUT[words.view(np.uint8)].sum(axis=1, dtype=np.int32)
+
+
+def _percentages(totals, matching):
+    """round(m / n * 100, 2) per (n, m) pair, computed in Python for exact parity with analyze_match.
+
+    Only the distinct pairs are rounded in Python; the results are gathered back per row.
+    """
+    pairs = (np.broadcast_to(totals, matching.shape).astype(np.int64) << 32) | matching.astype(np.int64)
+    distinct, inverse = np.unique(pairs, return_inverse=True)
+    values = np.array([round((key & 0xFFFFFFFF) / (key >> 32) * 100, 2) if key >> 32 else 0.0
+                       for key in distinct.tolist()], dtype=np.float64)
+    return values[inverse.reshape(-1)]
+
+
+def _top_k(percent, matching, limit):
+    """Row indices of the top `limit` rows by (percent, matching count, row) descending."""
+    n = len(percent)
+    candidates = np.arange(n)
+    if 0 < limit < n:
+        # keep everything tied with the cut-off so the ordering below stays deterministic
+        cutoff = np.partition(percent, n - limit)[n - limit]
+        candidates = np.flatnonzero(percent >= cutoff)
+    order = np.lexsort((candidates, matching[candidates], percent[candidates]))[::-1]
+    return candidates[order[:limit]]
+
+
+def score_population(population, skills, limit=None, min_matching=0):
+    """Score a job's skills against every row (e.g. all resumes) with analyze_match semantics.
+
+    Returns dicts with key, match_percentage, matching_count, missing_count
+    and additional_count, best first; match_percentage is relative to the
+    job's skill count.
+    """
+    job_size = len({s.lower() for s in skills})
+    if not job_size or not len(population):
+        return []
+    words, _known = population.encode(skills, assign=False)
+    matching = population.intersect_counts(words)
+    percent = _percentages(job_size, matching)
+    return _rows(population, percent, matching, job_size - matching, population.sizes() - matching,
+                 limit, min_matching)
+
+
+def score_jobs_for_candidate(jobs, candidate_skills, limit=None, min_matching=0):
+    """Score one candidate's skills against every job row; match_percentage is relative to each job."""
+    if not len(jobs):
+        return []
+    candidate_size = len({s.lower() for s in candidate_skills})
+    words, _known = jobs.encode(candidate_skills, assign=False)
+    matching = jobs.intersect_counts(words)
+    job_sizes = jobs.sizes()
+    percent = _percentages(job_sizes, matching)
+    return _rows(jobs, percent, matching, job_sizes - matching, candidate_size - matching, limit, min_matching)
+
+
+def _rows(population, percent, matching, missing, additional, limit, min_matching):
+    keep = np.flatnonzero(matching >= min_matching) if min_matching else np.arange(len(population))
+    limit = len(keep) if limit is None else max(0, min(limit, len(keep)))
+    top = keep[_top_k(percent[keep], matching[keep], limit)]
+    return [{
+        'key': population.keys[i],
+        'match_percentage': float(percent[i]),
+        'matching_count': int(matching[i]),
+        'missing_count': int(missing[i]),
+        'additional_count': int(additional[i])
+    } for i in top.tolist()]
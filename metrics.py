@@ -0,0 +1,239 @@
+"""
+In-process metrics, stage timings and an opt-in sampling profiler.
+
+* ``Counter`` / ``Histogram`` / ``Gauge`` keep their values in this process
+  and ``render()`` writes them in the Prometheus text format for ``/metrics``.
+  Under a multi-worker server each worker reports its own series (scrape
+  the workers individually or aggregate by instance).
+* ``span(stage)`` times one stage of a request (save, extract, commit, ...)
+  into ``skill_matcher_stage_seconds`` and into the current request's
+  timings, which the app returns as a ``Server-Timing`` header.
+* ``SamplingProfiler`` samples the stacks of request threads every few
+  milliseconds and, for requests slower than a threshold, writes the
+  samples as collapsed stacks (``frame;frame;frame count``) that
+  flamegraph.pl, speedscope and similar tools read directly.
+
+Stages that run in worker processes (background and bulk extraction) are
+recorded in those processes and do not show up here.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+from contextlib import contextmanager
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_metrics = []
+_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        _metrics.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, '') for n in self.labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(n, '') for n in self.labels), 0)
+
+    def samples(self):
+        with _lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name + '_total' + _labels(self.labels, key), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}  # label values -> [bucket counts..., sum, count]
+        _metrics.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, '') for n in self.labels)
+        with _lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with _lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                yield self.name + '_bucket' + _labels(self.labels, key, [('le', repr(float(bound)))]), count
+            yield self.name + '_bucket' + _labels(self.labels, key, [('le', '+Inf')]), series[-1]
+            yield self.name + '_sum' + _labels(self.labels, key), series[-2]
+            yield self.name + '_count' + _labels(self.labels, key), series[-1]
+
+
+class Gauge:
+    """Value read from a callback at scrape time."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, fn):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        _metrics.append(self)
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return
+        yield self.name, value
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines.append(f'# HELP {metric.name} {metric.help}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, value in metric.samples():
+            lines.append(f'{name} {value!r}' if isinstance(value, float) else f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+REQUEST_SECONDS = Histogram('skill_matcher_request_seconds', 'HTTP request latency.', ('method', 'endpoint', 'status'))
+STAGE_SECONDS = Histogram('skill_matcher_stage_seconds', 'Time spent in one stage of a request.', ('stage',))
+EXTRACTION_CACHE = Counter('skill_matcher_extraction_cache', 'Extraction cache lookups on upload.', ('result',))
+ANALYSIS_CACHE = Counter('skill_matcher_analysis_cache', 'Analysis lookups by where they were served from.',
+                         ('result',))
+NLP_FALLBACKS = Counter('skill_matcher_nlp_fallbacks', 'NLP calls that failed and used the simple fallback.',
+                        ('operation',))
+PASSWORD_HASH_SECONDS = Histogram('skill_matcher_password_hash_seconds', 'Password hashing time on the hash executor.',
+                                  ('operation',))
+PASSWORD_HASH_WAIT_SECONDS = Histogram('skill_matcher_password_hash_wait_seconds',
+                                       'Time password hashing jobs waited for a free hash worker.', ('operation',))
+PASSWORD_HASH_REJECTED = Counter('skill_matcher_password_hash_rejected',
+                                 'Password hashing jobs refused because the queue was full.', ('operation',))
+LOGIN_CACHE = Counter('skill_matcher_login_cache', 'Logins by whether a recent verification was reused.', ('result',))
+DOWNLOADS = Counter('skill_matcher_downloads', 'Resume downloads by who sent the file (accel: nginx, direct: the app).',
+                    ('mode',))
+
+_request = threading.local()
+
+
+def begin_request():
+    """Start collecting stage timings for the request on this thread."""
+    _request.timings = []
+
+
+def end_request():
+    """Stop collecting and return the [(stage, seconds)] recorded for this request."""
+    timings = getattr(_request, 'timings', None) or []
+    _request.timings = None
+    return timings
+
+
+@contextmanager
+def span(stage):
+    """Time a block as one stage of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = getattr(_request, 'timings', None)
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+def server_timing(timings):
+    """Format stage timings as a Server-Timing header value."""
+    return ', '.join(f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in timings)
+
+
+class SamplingProfiler:
+    """Samples the stacks of registered threads and dumps slow requests as collapsed stacks."""
+
+    def __init__(self, out_dir, threshold, interval=0.005):
+        self.out_dir = out_dir
+        self.threshold = threshold
+        self.interval = interval
+        self._active = {}  # thread id -> Counter of collapsed stacks
+        self._lock = threading.Lock()
+        self._thread = None
+        self.dumped = 0
+
+    def begin(self):
+        """Start sampling the calling thread."""
+        with self._lock:
+            self._active[threading.get_ident()] = _Tally()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+                self._thread.start()
+
+    def end(self, elapsed, label):
+        """Stop sampling the calling thread; write its profile if elapsed exceeded the threshold."""
+        with self._lock:
+            stacks = self._active.pop(threading.get_ident(), None)
+        if not stacks or elapsed < self.threshold:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        safe = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in label)
+        path = os.path.join(self.out_dir, f'{time.strftime("%Y%m%d-%H%M%S")}-{int(elapsed * 1000)}ms-{safe}.folded')
+        with open(path, 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        self.dumped += 1
+        return path
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, stacks in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stacks[_collapse(frame)] += 1
+
+
+def _collapse(frame):
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(parts))
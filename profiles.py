@@ -0,0 +1,159 @@
+"""
+Standing job profiles, matched against every new resume as it is stored.
+
+A job profile is a saved posting: a title, its required skills and whether
+it is still open. The skills are normalized once when the profile is saved
+(a free-text description goes through the skill matcher), so nothing is
+parsed again at match time. ``ProfileMatcher`` keeps this process's copy of
+the open profiles as a ``BitsetMatrix`` and scores each new resume against
+all of them in one batched pass (an ``analyze_match`` loop without NumPy).
+The best JOB_MATCH_TOP profiles per resume at JOB_MATCH_MIN_PERCENT or more
+are persisted in ``job_profile_matches``, so a profile's ranked candidates
+are one indexed read instead of N x M comparisons per request.
+"""
+import os
+import threading
+import time
+
+from matching import HAS_NUMPY, BitsetMatrix, analyze_match, candidate_skill_list, score_jobs_for_candidate
+from metrics import span
+from skills import extract_skills
+
+
+JOB_MATCH_TOP = int(os.environ.get('JOB_MATCH_TOP', 20))
+JOB_MATCH_MIN_PERCENT = float(os.environ.get('JOB_MATCH_MIN_PERCENT', 50))
+# Seconds between reloads of the open profiles (other workers may have added or closed some)
+JOB_PROFILE_REFRESH = float(os.environ.get('JOB_PROFILE_REFRESH', 5))
+# Existing resumes considered when a new profile is created
+JOB_PROFILE_BACKFILL = int(os.environ.get('JOB_PROFILE_BACKFILL', 1000))
+PROFILE_STATUSES = ('open', 'closed')
+# matches a re-scored resume replaces; matches with closed profiles are kept
+OPEN_PROFILE_MATCH = "job_profile_id IN (SELECT id FROM job_profiles WHERE status = 'open')"
+
+
+def init_profiles(db):
+    """Create the job_profiles and job_profile_matches tables if they do not exist."""
+    db.execute('''CREATE TABLE IF NOT EXISTS job_profiles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        skills TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'open',
+        owner_id INTEGER,
+        created_at TEXT NOT NULL
+    )''')
+    db.execute('''CREATE TABLE IF NOT EXISTS job_profile_matches (
+        job_profile_id INTEGER NOT NULL,
+        resume_id INTEGER NOT NULL,
+        match_percentage REAL NOT NULL,
+        matching_count INTEGER NOT NULL,
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (job_profile_id, resume_id)
+    ) WITHOUT ROWID''')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_job_profile_matches_rank ON job_profile_matches '
+               '(job_profile_id, match_percentage DESC, matching_count DESC, resume_id DESC)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_job_profile_matches_resume ON job_profile_matches (resume_id)')
+
+
+def profile_skills(skills=(), description=''):
+    """The required skills of a profile: the given list plus skills found in the description, deduplicated."""
+    names = [s.strip() for s in skills if isinstance(s, str) and s.strip()]
+    if description:
+        found = extract_skills(description)
+        names += candidate_skill_list(found)
+    seen = set()
+    result = []
+    for name in names:
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            result.append(name)
+    return result
+
+
+class ProfileMatcher:
+    """The open job profiles of this process, scored against new resumes in one pass."""
+
+    def __init__(self, repo, refresh_interval=JOB_PROFILE_REFRESH, top=JOB_MATCH_TOP,
+                 min_percent=JOB_MATCH_MIN_PERCENT):
+        self.repo = repo
+        self.refresh_interval = refresh_interval
+        self.top = top
+        self.min_percent = min_percent
+        self._profiles = {}
+        self._population = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def refresh(self, force=False):
+        """Reload the open profiles if forced or older than refresh_interval."""
+        with self._lock:
+            if not force and self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+            profiles = {p['id']: p for p in self.repo.list_job_profiles(status='open')}
+            population = None
+            if HAS_NUMPY and profiles:
+                population = BitsetMatrix()
+                for profile_id, profile in profiles.items():
+                    population.add(profile_id, profile['skills'])
+            self._profiles, self._population = profiles, population
+            self._loaded_at = time.monotonic()
+
+    def _score(self, candidate_skills):
+        profiles, population = self._profiles, self._population
+        if population is not None:
+            return [(r['key'], r['match_percentage'], r['matching_count'], r['missing_count'])
+                    for r in score_jobs_for_candidate(population, candidate_skills, limit=self.top, min_matching=1)]
+        scored = []
+        for profile_id, profile in profiles.items():
+            result = analyze_match(candidate_skills, profile['skills'])
+            if result['matching_skills']:
+                scored.append((profile_id, result['match_percentage'], len(result['matching_skills']),
+                               len(result['missing_skills'])))
+        scored.sort(key=lambda r: (r[1], r[2], r[0]), reverse=True)
+        return scored[:self.top]
+
+    def _score_resume(self, skills):
+        # (profile_id, percent, matching, missing) for the open profiles the skills match well enough
+        candidate_skills = candidate_skill_list(skills)
+        if not candidate_skills:
+            return []
+        with span('job_match'):
+            return [r for r in self._score(candidate_skills) if r[1] >= self.min_percent]
+
+    def match_rows(self, resume_id, skills):
+        """The rows match_resume would persist for a stored resume (as for replace_job_matches), unwritten."""
+        self.refresh()
+        if not self._profiles:
+            return []
+        return [(profile_id, resume_id, percent, count) for profile_id, percent, count, _ in self._score_resume(skills)]
+
+    def match_resume(self, resume_id, skills):
+        """Score a stored resume against every open profile, persist the top matches and return them.
+
+        The resume's earlier matches with open profiles are replaced, so a
+        re-extracted resume keeps no match its new skills no longer earn.
+        """
+        self.refresh()
+        if not self._profiles:
+            return []
+        scored = self._score_resume(skills)
+        self.repo.replace_job_matches(resume_id, [(profile_id, resume_id, percent, count)
+                                                  for profile_id, percent, count, _ in scored])
+        matches = []
+        for profile_id, percent, count, missing in scored:
+            profile = self._profiles.get(profile_id)
+            if profile is not None:
+                matches.append({'job_profile_id': profile_id, 'title': profile['title'], 'owner_id': profile['owner_id'],
+                                'match_percentage': percent, 'matching_count': count, 'missing_count': missing})
+        return matches
+
+    def backfill(self, profile, skill_index):
+        """Match a newly created profile against the resumes already stored; returns the number persisted."""
+        _total, ranked = skill_index.search(profile['skills'], JOB_PROFILE_BACKFILL)
+        rows = [(profile['id'], resume_id, match['match_percentage'], len(match['matching_skills']))
+                for resume_id, match in ranked if match['match_percentage'] >= self.min_percent]
+        self.repo.put_job_matches(rows)
+        return len(rows)
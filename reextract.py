@@ -0,0 +1,190 @@
+"""
+Versioned re-extraction of stored resumes.
+
+Every resume row records the EXTRACTOR_VERSION that produced its
+extracted_skills (NULL for rows stored before the column existed). After the
+skill lists or the extraction code change, or the NLP module becomes
+available, ``reextract`` walks the rows of any other version in id order,
+re-runs skill extraction on their stored text (or on the file, when there is
+no text or ``from_files`` is set; relative file paths name files in the
+upload folder) on a process pool, and writes the new skills, skill index
+rows, analyses and job profile matches back one batch per transaction, so
+a crash never leaves a row marked current whose analysis or matches are
+stale. Rewritten rows get a new skills_seq, so the in-memory skill
+indexes of running workers pick up the new skills on their next refresh.
+
+Progress is checkpointed per target version in the ``reextract_checkpoints``
+table of the local data.db after every batch, so an interrupted run resumes
+after the last committed id. The workers run at a lower priority
+(REEXTRACT_NICE) and the loop sleeps after each batch, at least
+REEXTRACT_PAUSE seconds and long enough to stay under REEXTRACT_MAX_RATE
+rows/s, so live uploads keep their CPU and the database write lock.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import storage
+from analysis import analysis_record
+from connections import connect
+from extraction import EXTRACTOR_VERSION, extract_resume, extract_resume_skills
+from profiles import ProfileMatcher
+
+
+REEXTRACT_WORKERS = int(os.environ.get('REEXTRACT_WORKERS', 0)) or max(1, (os.cpu_count() or 2) // 2)
+REEXTRACT_BATCH_SIZE = int(os.environ.get('REEXTRACT_BATCH_SIZE', 100))
+REEXTRACT_NICE = int(os.environ.get('REEXTRACT_NICE', 10))
+REEXTRACT_PAUSE = float(os.environ.get('REEXTRACT_PAUSE', 0.1))
+# 0 means no rate limit besides REEXTRACT_PAUSE
+REEXTRACT_MAX_RATE = float(os.environ.get('REEXTRACT_MAX_RATE', 0))
+
+
+def init_reextract(db):
+    """Create the reextract_checkpoints table if it does not exist."""
+    db.execute('''CREATE TABLE IF NOT EXISTS reextract_checkpoints (
+        extractor_version TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL,
+        processed INTEGER NOT NULL,
+        changed INTEGER NOT NULL,
+        errors INTEGER NOT NULL,
+        started_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )''')
+
+
+def load_checkpoint(db, version):
+    """The saved progress towards version as a dict, or None if no run has started."""
+    row = db.execute('SELECT last_id, processed, changed, errors, started_at FROM reextract_checkpoints '
+                     'WHERE extractor_version = ?', (version,)).fetchone()
+    if row is None:
+        return None
+    return dict(zip(('last_id', 'processed', 'changed', 'errors', 'started_at'), row))
+
+
+def save_checkpoint(db, version, checkpoint):
+    """Persist progress towards version (caller commits)."""
+    db.execute('INSERT OR REPLACE INTO reextract_checkpoints (extractor_version, last_id, processed, changed, errors, '
+               'started_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+               (version, checkpoint['last_id'], checkpoint['processed'], checkpoint['changed'], checkpoint['errors'],
+                checkpoint['started_at'], datetime.utcnow().isoformat()))
+
+
+def _lower_priority(increment):
+    try:
+        os.nice(increment)
+    except (AttributeError, OSError):
+        pass  # no nice() on Windows
+
+
+def upload_path(file_path, upload_folder):
+    """Where a stored file_path is on disk: relative paths name a file in the (flat) upload folder."""
+    if not file_path or os.path.isabs(file_path) or upload_folder is None:
+        return file_path
+    return os.path.join(upload_folder, os.path.basename(file_path))
+
+
+def reextract_one(resume, from_files=False):
+    """Extract the skills of a stored resume again (in a worker process).
+
+    Returns (text, skills); text is None when the stored text was reused.
+    """
+    text = resume.get('extracted_text')
+    path = resume.get('file_path')
+    if (from_files or not text) and path and os.path.exists(path):
+        return extract_resume(path)
+    if text is None:
+        raise FileNotFoundError(f'no stored text and no file at {path}')
+    return None, extract_resume_skills(text)
+
+
+def reextract(repo, db_path, workers=REEXTRACT_WORKERS, batch_size=REEXTRACT_BATCH_SIZE, pause=REEXTRACT_PAUSE,
+              max_rate=REEXTRACT_MAX_RATE, from_files=False, restart=False, limit=None, upload_folder=None):
+    """Bring every resume in repo to the current EXTRACTOR_VERSION; yields a status dict per batch.
+
+    The checkpoint lives in the SQLite database at db_path; restart=True
+    discards it (rows that failed before are tried again). limit caps the
+    rows processed by this call; relative file paths are looked up in
+    upload_folder. The final item has status 'summary'.
+    """
+    from db import migrate  # db imports this module for init_reextract
+
+    version = EXTRACTOR_VERSION
+    db = connect(db_path)
+    try:
+        migrate(db)
+        checkpoint = None if restart else load_checkpoint(db, version)
+        if checkpoint is None:
+            checkpoint = {'last_id': 0, 'processed': 0, 'changed': 0, 'errors': 0,
+                          'started_at': datetime.utcnow().isoformat()}
+        remaining = repo.count_stale_resumes(version, after_id=checkpoint['last_id'])
+        matcher = ProfileMatcher(repo)
+        totals = {'processed': 0, 'changed': 0, 'errors': 0}
+        started = time.perf_counter()
+        # spawned workers are started lazily and inherit nothing from this process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_lower_priority, initargs=(REEXTRACT_NICE,)) as pool:
+            while limit is None or totals['processed'] < limit:
+                size = batch_size if limit is None else min(batch_size, limit - totals['processed'])
+                rows = repo.stale_resumes(version, after_id=checkpoint['last_id'], limit=size)
+                if not rows:
+                    break
+                batch_started = time.perf_counter()
+                futures = [pool.submit(reextract_one, dict(row, file_path=upload_path(row['file_path'], upload_folder)),
+                                       from_files) for row in rows]
+                updates = []
+                failures = []
+                for row, future in zip(rows, futures):
+                    try:
+                        text, skills = future.result()
+                    except Exception as e:
+                        failures.append({'resume_id': row['id'], 'error': str(e)})
+                        continue
+                    updates.append((row, text, skills))
+
+                # skills, analyses and matches in one transaction: the new extractor_version marks all three done
+                # (every row is matched again: scoring may have changed even where the skills did not)
+                repo.update_extractions([(row['id'], text, skills, version) for row, text, skills in updates],
+                                        [(row['id'], analysis_record(row['id'], row['filename'], skills))
+                                         for row, _text, skills in updates],
+                                        [(row['id'], matcher.match_rows(row['id'], skills))
+                                         for row, _text, skills in updates])
+                changed = [row for row, _text, skills in updates if skills != row['extracted_skills']]
+                for row, text, skills in updates:
+                    if row['content_hash']:
+                        storage.put_cached_extraction(db, row['content_hash'], version,
+                                                      row['extracted_text'] if text is None else text, skills)
+
+                for key, count in (('processed', len(rows)), ('changed', len(changed)), ('errors', len(failures))):
+                    totals[key] += count
+                    checkpoint[key] += count
+                checkpoint['last_id'] = rows[-1]['id']
+                save_checkpoint(db, version, checkpoint)
+                db.commit()
+
+                remaining = max(0, remaining - len(rows))
+                elapsed = time.perf_counter() - started
+                rate = totals['processed'] / elapsed if elapsed else None
+                status = {'status': 'batch', 'last_id': checkpoint['last_id'], **totals, 'remaining': remaining,
+                          'rows_per_second': round(rate, 2) if rate else None,
+                          'eta_seconds': round(remaining / rate, 1) if rate else None}
+                if failures:
+                    status['failures'] = failures
+                yield status
+
+                # throttle: leave the CPUs and the write lock to live traffic for a while
+                spent = time.perf_counter() - batch_started
+                time.sleep(max(pause, len(rows) / max_rate - spent if max_rate else 0))
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    yield {
+        'status': 'summary',
+        'extractor_version': version,
+        **totals,
+        'remaining': remaining,
+        'last_id': checkpoint['last_id'],
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(totals['processed'] / elapsed, 2) if elapsed else None
+    }
@@ -0,0 +1,1068 @@
+"""
+Repositories for resume and user records.
+
+``open_repository(DATABASE_URL)`` picks the backend:
+
+* unset or ``sqlite:///path`` - ``SQLiteRepository`` over data.db (default);
+* ``postgresql://...``        - ``PostgresRepository`` (psycopg2 connection
+  pool, COPY for bulk ingestion, JSONB + GIN index on extracted_skills);
+* ``memory://``               - ``MemoryRepository``, an in-process stand-in
+  for tests and benchmarks.
+
+Every backend returns plain dicts with ``extracted_skills`` already decoded.
+Single-resume reads take ``columns`` (a subset of ``RESUME_FIELDS``) and
+return only those plus ``id``; ``extracted_text`` is left out unless asked
+for, so the common reads never touch the large text blobs.
+Node-local state (extraction cache, jobs, embeddings, SSE events) stays in
+the local SQLite file whichever backend holds the resumes.
+"""
+import copy
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import storage
+from analysis import analysis_record
+from connections import ConnectionPool
+from db import insert_resume, insert_resumes, migrate, put_analyses, update_extractions
+from insights import aggregate_deltas, rebuild_aggregates
+from profiles import OPEN_PROFILE_MATCH
+from search import backfill_index, normalized_skills
+
+try:
+    import psycopg2
+    import psycopg2.extras
+    import psycopg2.pool
+except Exception:
+    psycopg2 = None
+
+
+RESUME_FIELDS = ('id', 'filename', 'file_path', 'extracted_text', 'extracted_skills', 'created_at', 'content_hash',
+                 'extractor_version')
+# what get_resume()/latest_resume() return by default: everything except the text
+RESUME_COLUMNS = tuple(c for c in RESUME_FIELDS if c != 'extracted_text')
+
+
+def _projection(columns):
+    """Split requested columns into (row columns including id, whether the text is wanted)."""
+    unknown = set(columns) - set(RESUME_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown resume field(s): {', '.join(sorted(unknown))}")
+    selected = ['id'] + [c for c in RESUME_FIELDS if c in columns and c not in ('id', 'extracted_text')]
+    return selected, 'extracted_text' in columns
+
+
+LIST_PAGE_SIZE = 1000
+
+
+def _list_query(mark, after_id, limit, since, until, skills, with_skills):
+    """SELECT for list_resumes() with the given placeholder mark ('?' or '%s')."""
+    columns = 'id, filename, created_at' + (', extracted_skills' if with_skills else '')
+    where = []
+    params = []
+    if after_id is not None:
+        where.append(f'id < {mark}')
+        params.append(after_id)
+    if since is not None:
+        where.append(f'created_at >= {mark}')
+        params.append(since)
+    if until is not None:
+        where.append(f'created_at < {mark}')
+        params.append(until)
+    for skill in skills:
+        where.append(f'id IN (SELECT resume_id FROM resume_skills WHERE skill = {mark})')
+        params.append(skill.lower())
+    sql = f"SELECT {columns} FROM resumes {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY id DESC"
+    if limit is not None:
+        sql += f' LIMIT {int(limit):d}'
+    return sql, params
+
+
+def iter_resumes(repo, page_size=LIST_PAGE_SIZE, **filters):
+    """Yield every resume list_resumes() would return, newest first, one keyset page at a time."""
+    after_id = filters.pop('after_id', None)
+    while True:
+        page = repo.list_resumes(after_id=after_id, limit=page_size, **filters)
+        yield from page
+        if len(page) < page_size:
+            return
+        after_id = page[-1]['id']
+
+
+def _decode(row):
+    if row is None:
+        return None
+    row = dict(row)
+    skills = row.get('extracted_skills')
+    if isinstance(skills, str):
+        row['extracted_skills'] = json.loads(skills) if skills else {}
+    elif 'extracted_skills' in row and skills is None:
+        row['extracted_skills'] = {}
+    if isinstance(row.get('created_at'), datetime):
+        row['created_at'] = row['created_at'].isoformat()
+    return row
+
+
+class SQLiteRepository:
+    """Resumes and users in the local SQLite database."""
+
+    def __init__(self, db_path, pool=None):
+        self.db_path = db_path
+        self.pool = pool or ConnectionPool(db_path, row_factory=sqlite3.Row)
+
+    @contextmanager
+    def _db(self):
+        db = self.pool.acquire()
+        try:
+            yield db
+        finally:
+            self.pool.release(db)
+
+    def close(self):
+        """Close idle connections (e.g. in the master process before workers fork)."""
+        self.pool.close_all()
+
+    def create_all(self):
+        with self._db() as db:
+            migrate(db)
+
+    def insert_resume(self, row):
+        """Insert one resume_row() tuple and return its id."""
+        with self._db() as db:
+            return insert_resume(db, row)
+
+    def insert_resumes(self, rows):
+        """Insert many resume_row() tuples in one transaction and return their ids."""
+        with self._db() as db:
+            return insert_resumes(db, rows)
+
+    def _select_one(self, where, params, columns):
+        selected, with_text = _projection(columns)
+        with self._db() as db:
+            row = _decode(db.execute(f"SELECT {', '.join(selected)} FROM resumes {where} LIMIT 1", params).fetchone())
+            if row is not None and with_text:
+                row['extracted_text'] = storage.get_resume_text(db, row['id'])
+        return row
+
+    def get_resume(self, resume_id, columns=RESUME_COLUMNS):
+        return self._select_one('WHERE id = ?', (resume_id,), columns)
+
+    def latest_resume(self, columns=RESUME_COLUMNS):
+        return self._select_one('ORDER BY id DESC', (), columns)
+
+    def resume_text(self, resume_id):
+        """The extracted text of a resume (None if missing)."""
+        with self._db() as db:
+            return storage.get_resume_text(db, resume_id)
+
+    def resume_exists(self, resume_id):
+        with self._db() as db:
+            return db.execute('SELECT 1 FROM resumes WHERE id = ?', (resume_id,)).fetchone() is not None
+
+    def list_resumes(self, after_id=None, limit=None, since=None, until=None, skills=(), with_skills=False):
+        """Resumes newest first: id, filename, created_at (and extracted_skills if with_skills).
+
+        Keyset pagination: pass the last id of a page as after_id to get the
+        next one. since/until bound created_at (ISO strings, until exclusive);
+        skills keeps resumes listing all of them.
+        """
+        sql, params = _list_query('?', after_id, limit, since, until, skills, with_skills)
+        with self._db() as db:
+            return [_decode(r) for r in db.execute(sql, params)]
+
+    def resume_filenames(self, ids):
+        """Map resume ids to filenames (missing ids are left out)."""
+        if not ids:
+            return {}
+        placeholders = ','.join('?' * len(ids))
+        with self._db() as db:
+            return dict(db.execute(f'SELECT id, filename FROM resumes WHERE id IN ({placeholders})', list(ids)).fetchall())
+
+    def resume_ids_with_skill(self, skill):
+        with self._db() as db:
+            return [r[0] for r in db.execute('SELECT resume_id FROM resume_skills WHERE skill = ? ORDER BY resume_id',
+                                             (skill.lower(),))]
+
+    def skill_changes_after(self, after_seq):
+        """(skills_seq, resume_id, skill) of resumes whose skills were written after after_seq, by skills_seq.
+
+        A resume without skills appears once with skill None.
+        """
+        with self._db() as db:
+            return [tuple(r) for r in db.execute(
+                'SELECT r.skills_seq, r.id, s.skill FROM resumes r LEFT JOIN resume_skills s ON s.resume_id = r.id '
+                'WHERE r.skills_seq > ? ORDER BY r.skills_seq', (after_seq,))]
+
+    def backfill_skill_index(self):
+        with self._db() as db:
+            return backfill_index(db)
+
+    def stale_resumes(self, version, after_id=0, limit=100):
+        """Resumes with id > after_id extracted by another version than version, by id, with their text."""
+        with self._db() as db:
+            rows = [_decode(r) for r in db.execute(
+                f'SELECT {STALE_COLUMNS} FROM resumes WHERE id > ? AND extractor_version IS NOT ? ORDER BY id LIMIT ?',
+                (after_id, version, limit))]
+            for row in rows:
+                row['extracted_text'] = storage.get_resume_text(db, row['id'])
+        return rows
+
+    def count_stale_resumes(self, version, after_id=0):
+        with self._db() as db:
+            return db.execute('SELECT COUNT(*) FROM resumes WHERE id > ? AND extractor_version IS NOT ?',
+                              (after_id, version)).fetchone()[0]
+
+    def update_extractions(self, items, analyses=(), matches=()):
+        """Store re-extracted (resume_id, text or None, skills, extractor_version) in one transaction.
+
+        The same transaction writes analyses ((resume_id, record) pairs) and
+        replaces job matches ((resume_id, rows) pairs, as for replace_job_matches).
+        """
+        with self._db() as db:
+            update_extractions(db, items, analyses, matches)
+
+    def get_analysis(self, resume_id):
+        """The persisted analysis record {'version', 'etag', 'body'} of a resume, or None."""
+        with self._db() as db:
+            row = db.execute('SELECT version, etag, body FROM resume_analysis WHERE resume_id = ?', (resume_id,)).fetchone()
+            return dict(row) if row else None
+
+    def put_analysis(self, resume_id, record):
+        self.put_analyses([(resume_id, record)])
+
+    def put_analyses(self, items):
+        """Persist (resume_id, analysis record) pairs; the aggregate counts follow in the same transaction."""
+        with self._db() as db:
+            put_analyses(db, items)
+
+    def aggregate_counts(self):
+        """({skill: resumes}, {score: resumes}) over every stored analysis."""
+        with self._db() as db:
+            skills = dict(db.execute('SELECT skill, resumes FROM skill_counts WHERE resumes > 0').fetchall())
+            scores = dict(db.execute('SELECT score, resumes FROM score_counts WHERE resumes > 0').fetchall())
+        return skills, scores
+
+    def co_occurring_skills(self, skill, limit=10):
+        """(other skill, resumes listing both) pairs for a normalized skill, most frequent first."""
+        with self._db() as db:
+            return [tuple(r) for r in db.execute(
+                '''SELECT skill_b AS skill, resumes FROM skill_pairs WHERE skill_a = ? AND resumes > 0
+                UNION ALL SELECT skill_a, resumes FROM skill_pairs WHERE skill_b = ? AND resumes > 0
+                ORDER BY resumes DESC, skill LIMIT ?''', (skill, skill, limit))]
+
+    def rebuild_aggregates(self):
+        """Recompute the aggregate counts from every stored analysis."""
+        with self._db() as db:
+            rebuild_aggregates(db)
+            db.commit()
+
+    def find_user(self, email):
+        with self._db() as db:
+            row = db.execute('SELECT id, email, name, password_hash FROM users WHERE email = ?', (email,)).fetchone()
+            return dict(row) if row else None
+
+    def create_user(self, email, name, password_hash):
+        """Insert a user and return the id, or None if the email is taken."""
+        with self._db() as db:
+            try:
+                cur = db.execute('INSERT INTO users (email, name, password_hash, created_at) VALUES (?, ?, ?, ?)',
+                                 (email, name, password_hash, datetime.utcnow().isoformat()))
+                db.commit()
+            except sqlite3.IntegrityError:
+                return None
+            return cur.lastrowid
+
+    def update_password_hash(self, user_id, password_hash):
+        with self._db() as db:
+            db.execute('UPDATE users SET password_hash = ? WHERE id = ?', (password_hash, user_id))
+            db.commit()
+
+    def create_job_profile(self, title, description, skills, owner_id):
+        with self._db() as db:
+            cur = db.execute('INSERT INTO job_profiles (title, description, skills, status, owner_id, created_at) '
+                             'VALUES (?, ?, ?, ?, ?, ?)', (title, description, json.dumps(skills), 'open', owner_id,
+                                                           datetime.utcnow().isoformat()))
+            db.commit()
+            return cur.lastrowid
+
+    def get_job_profile(self, profile_id):
+        with self._db() as db:
+            row = db.execute(f'SELECT {JOB_PROFILE_COLUMNS} FROM job_profiles WHERE id = ?', (profile_id,)).fetchone()
+            return _decode_profile(row) if row else None
+
+    def list_job_profiles(self, status=None):
+        """Job profiles (optionally only those with status), oldest first."""
+        with self._db() as db:
+            if status is None:
+                rows = db.execute(f'SELECT {JOB_PROFILE_COLUMNS} FROM job_profiles ORDER BY id').fetchall()
+            else:
+                rows = db.execute(f'SELECT {JOB_PROFILE_COLUMNS} FROM job_profiles WHERE status = ? ORDER BY id',
+                                  (status,)).fetchall()
+            return [_decode_profile(r) for r in rows]
+
+    def set_job_profile_status(self, profile_id, status):
+        """Open or close a profile; returns False if it does not exist."""
+        with self._db() as db:
+            cur = db.execute('UPDATE job_profiles SET status = ? WHERE id = ?', (status, profile_id))
+            db.commit()
+            return cur.rowcount > 0
+
+    def put_job_matches(self, rows):
+        """Persist (job_profile_id, resume_id, match_percentage, matching_count) rows."""
+        if not rows:
+            return
+        now = datetime.utcnow().isoformat()
+        with self._db() as db:
+            db.executemany('INSERT OR REPLACE INTO job_profile_matches (job_profile_id, resume_id, match_percentage, '
+                           'matching_count, created_at) VALUES (?, ?, ?, ?, ?)', [tuple(r) + (now,) for r in rows])
+            db.commit()
+
+    def replace_job_matches(self, resume_id, rows):
+        """Replace a resume's matches with open profiles by rows (as for put_job_matches) in one transaction."""
+        now = datetime.utcnow().isoformat()
+        with self._db() as db:
+            try:
+                db.execute(f'DELETE FROM job_profile_matches WHERE resume_id = ? AND {OPEN_PROFILE_MATCH}',
+                           (resume_id,))
+                db.executemany('INSERT OR REPLACE INTO job_profile_matches (job_profile_id, resume_id, '
+                               'match_percentage, matching_count, created_at) VALUES (?, ?, ?, ?, ?)',
+                               [tuple(r) + (now,) for r in rows])
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+    def job_matches(self, profile_id, limit=50):
+        """A profile's persisted matches, best first, with each resume's filename."""
+        with self._db() as db:
+            rows = db.execute('''SELECT m.resume_id, r.filename, m.match_percentage, m.matching_count, m.created_at
+                FROM job_profile_matches m JOIN resumes r ON r.id = m.resume_id
+                WHERE m.job_profile_id = ?
+                ORDER BY m.match_percentage DESC, m.matching_count DESC, m.resume_id DESC LIMIT ?''',
+                              (profile_id, limit)).fetchall()
+            return [dict(r) for r in rows]
+
+
+# what stale_resumes() returns besides extracted_text
+STALE_COLUMNS = 'id, filename, file_path, content_hash, extracted_skills'
+JOB_PROFILE_COLUMNS = 'id, title, description, skills, status, owner_id, created_at'
+
+
+def _decode_profile(row):
+    profile = dict(row)
+    if isinstance(profile['skills'], str):
+        profile['skills'] = json.loads(profile['skills'])
+    if isinstance(profile['created_at'], datetime):
+        profile['created_at'] = profile['created_at'].isoformat()
+    return profile
+
+
+POSTGRES_SCHEMA = (
+    # next value on every write of a resume's skills, see search.SkillIndex.refresh
+    'CREATE SEQUENCE IF NOT EXISTS resume_skills_seq',
+    '''CREATE TABLE IF NOT EXISTS resumes (
+        id BIGSERIAL PRIMARY KEY,
+        filename TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        extracted_text TEXT,
+        extracted_skills JSONB,
+        created_at TIMESTAMP NOT NULL,
+        content_hash TEXT,
+        extractor_version TEXT,
+        skills_seq BIGINT DEFAULT nextval('resume_skills_seq')
+    )''',
+    'ALTER TABLE resumes ADD COLUMN IF NOT EXISTS extractor_version TEXT',
+    # the volatile default numbers the existing rows as the column is added
+    "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS skills_seq BIGINT DEFAULT nextval('resume_skills_seq')",
+    'CREATE INDEX IF NOT EXISTS idx_resumes_skills_seq ON resumes (skills_seq)',
+    'CREATE INDEX IF NOT EXISTS idx_resumes_created_at ON resumes (created_at)',
+    # containment queries (extracted_skills @> '{"technical_skills": ["Python"]}') use this index
+    'CREATE INDEX IF NOT EXISTS idx_resumes_skills ON resumes USING GIN (extracted_skills jsonb_path_ops)',
+    '''CREATE TABLE IF NOT EXISTS resume_skills (
+        resume_id BIGINT NOT NULL REFERENCES resumes (id) ON DELETE CASCADE,
+        skill TEXT NOT NULL,
+        PRIMARY KEY (resume_id, skill)
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_resume_skills_skill ON resume_skills (skill)',
+    '''CREATE TABLE IF NOT EXISTS resume_analysis (
+        resume_id BIGINT PRIMARY KEY REFERENCES resumes (id) ON DELETE CASCADE,
+        version TEXT NOT NULL,
+        etag TEXT NOT NULL,
+        body TEXT NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS users (
+        id BIGSERIAL PRIMARY KEY,
+        email TEXT NOT NULL UNIQUE,
+        name TEXT,
+        password_hash TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS job_profiles (
+        id BIGSERIAL PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        skills JSONB NOT NULL,
+        status TEXT NOT NULL DEFAULT 'open',
+        owner_id BIGINT,
+        created_at TIMESTAMP NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS job_profile_matches (
+        job_profile_id BIGINT NOT NULL REFERENCES job_profiles (id) ON DELETE CASCADE,
+        resume_id BIGINT NOT NULL REFERENCES resumes (id) ON DELETE CASCADE,
+        match_percentage DOUBLE PRECISION NOT NULL,
+        matching_count INTEGER NOT NULL,
+        created_at TIMESTAMP NOT NULL,
+        PRIMARY KEY (job_profile_id, resume_id)
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_job_profile_matches_rank ON job_profile_matches '
+    '(job_profile_id, match_percentage DESC, matching_count DESC, resume_id DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_job_profile_matches_resume ON job_profile_matches (resume_id)',
+    'CREATE TABLE IF NOT EXISTS skill_counts (skill TEXT PRIMARY KEY, resumes INTEGER NOT NULL)',
+    '''CREATE TABLE IF NOT EXISTS skill_pairs (
+        skill_a TEXT NOT NULL,
+        skill_b TEXT NOT NULL,
+        resumes INTEGER NOT NULL,
+        PRIMARY KEY (skill_a, skill_b)
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_skill_pairs_b ON skill_pairs (skill_b)',
+    'CREATE TABLE IF NOT EXISTS score_counts (score INTEGER PRIMARY KEY, resumes INTEGER NOT NULL)',
+)
+PG_POOL_MIN = int(os.environ.get('PG_POOL_MIN', 1))
+PG_POOL_MAX = int(os.environ.get('PG_POOL_MAX', 10))
+
+
+def _pg_text(value):
+    # PostgreSQL text cannot hold NUL bytes, which PDF extraction occasionally produces
+    return value.replace('\x00', '') if isinstance(value, str) else value
+
+
+class PostgresRepository:
+    """Resumes and users in PostgreSQL through a thread-safe connection pool."""
+
+    def __init__(self, url, minconn=PG_POOL_MIN, maxconn=PG_POOL_MAX):
+        if psycopg2 is None:
+            raise RuntimeError('psycopg2 is required for DATABASE_URL=postgresql://...')
+        self.url = url
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        """The connection pool of this process, opened on first use (and again after a fork)."""
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = psycopg2.pool.ThreadedConnectionPool(self.minconn, self.maxconn, self.url)
+                self._pid = os.getpid()
+            return self._pool
+
+    def close(self):
+        """Close the pool's connections; the next query opens a new pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and self._pid == os.getpid():
+            pool.closeall()
+
+    @contextmanager
+    def _cursor(self):
+        pool = self.pool
+        conn = pool.getconn()
+        try:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                yield cur
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
+
+    def create_all(self):
+        with self._cursor() as cur:
+            for statement in POSTGRES_SCHEMA:
+                cur.execute(statement)
+            cur.execute('SELECT NOT EXISTS (SELECT 1 FROM score_counts) AND EXISTS (SELECT 1 FROM resume_analysis) AS empty')
+            unbuilt = cur.fetchone()['empty']
+        if unbuilt:
+            # analyses stored before the aggregate tables existed
+            self.rebuild_aggregates()
+        self._analyze_stored_resumes()
+
+    def _analyze_stored_resumes(self, batch_size=500):
+        # resumes stored before resume_analysis existed; put_analyses adds them to the counts
+        last_id = 0
+        while True:
+            with self._cursor() as cur:
+                cur.execute('''SELECT r.id, r.filename, r.extracted_skills FROM resumes r WHERE r.id > %s
+                    AND NOT EXISTS (SELECT 1 FROM resume_analysis a WHERE a.resume_id = r.id)
+                    ORDER BY r.id LIMIT %s''', (last_id, batch_size))
+                rows = cur.fetchall()
+            if not rows:
+                break
+            self.put_analyses([(r['id'], analysis_record(r['id'], r['filename'], r['extracted_skills'] or {}))
+                               for r in rows])
+            last_id = rows[-1]['id']
+
+    def insert_resume(self, row):
+        filename, file_path, text, skills_json, created_at, content_hash, extractor_version = row
+        with self._cursor() as cur:
+            cur.execute('INSERT INTO resumes (filename, file_path, extracted_text, extracted_skills, created_at, '
+                        'content_hash, extractor_version) VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id',
+                        (filename, file_path, _pg_text(text), skills_json, created_at, content_hash, extractor_version))
+            resume_id = cur.fetchone()['id']
+            skills = normalized_skills(json.loads(skills_json))
+            if skills:
+                psycopg2.extras.execute_values(cur, 'INSERT INTO resume_skills (resume_id, skill) VALUES %s '
+                                               'ON CONFLICT DO NOTHING', [(resume_id, s) for s in skills])
+        return resume_id
+
+    def insert_resumes(self, rows):
+        """Bulk insert with COPY; ids are reserved from the sequence first so they can be returned."""
+        if not rows:
+            return []
+        with self._cursor() as cur:
+            cur.execute("SELECT nextval(pg_get_serial_sequence('resumes', 'id')) AS id FROM generate_series(1, %s)",
+                        (len(rows),))
+            ids = [r['id'] for r in cur.fetchall()]
+            resumes = io.StringIO()
+            skills = io.StringIO()
+            # QUOTE_NONNUMERIC quotes every string, so '' stays '' and only None becomes NULL
+            resume_writer = csv.writer(resumes, quoting=csv.QUOTE_NONNUMERIC)
+            skill_writer = csv.writer(skills, quoting=csv.QUOTE_NONNUMERIC)
+            for resume_id, (filename, file_path, text, skills_json, created_at, content_hash,
+                            extractor_version) in zip(ids, rows):
+                resume_writer.writerow([resume_id, _pg_text(filename), _pg_text(file_path), _pg_text(text),
+                                        _pg_text(skills_json), created_at, content_hash, extractor_version])
+                for skill in normalized_skills(json.loads(skills_json)):
+                    skill_writer.writerow([resume_id, _pg_text(skill)])
+            resumes.seek(0)
+            skills.seek(0)
+            cur.copy_expert('COPY resumes (id, filename, file_path, extracted_text, extracted_skills, created_at, '
+                            'content_hash, extractor_version) FROM STDIN WITH (FORMAT csv)', resumes)
+            cur.copy_expert('COPY resume_skills (resume_id, skill) FROM STDIN WITH (FORMAT csv)', skills)
+        return ids
+
+    def _select_one(self, where, params, columns):
+        # large text values are TOASTed (compressed, out of line) by PostgreSQL itself,
+        # so leaving the column out of the select list is all it takes to skip them
+        selected, with_text = _projection(columns)
+        if with_text:
+            selected.append('extracted_text')
+        with self._cursor() as cur:
+            cur.execute(f"SELECT {', '.join(selected)} FROM resumes {where} LIMIT 1", params)
+            return _decode(cur.fetchone())
+
+    def get_resume(self, resume_id, columns=RESUME_COLUMNS):
+        return self._select_one('WHERE id = %s', (resume_id,), columns)
+
+    def latest_resume(self, columns=RESUME_COLUMNS):
+        return self._select_one('ORDER BY id DESC', (), columns)
+
+    def resume_text(self, resume_id):
+        with self._cursor() as cur:
+            cur.execute('SELECT extracted_text FROM resumes WHERE id = %s', (resume_id,))
+            row = cur.fetchone()
+            return row['extracted_text'] if row else None
+
+    def resume_exists(self, resume_id):
+        with self._cursor() as cur:
+            cur.execute('SELECT 1 FROM resumes WHERE id = %s', (resume_id,))
+            return cur.fetchone() is not None
+
+    def list_resumes(self, after_id=None, limit=None, since=None, until=None, skills=(), with_skills=False):
+        sql, params = _list_query('%s', after_id, limit, since, until, skills, with_skills)
+        with self._cursor() as cur:
+            cur.execute(sql, params)
+            return [_decode(r) for r in cur.fetchall()]
+
+    def resume_filenames(self, ids):
+        if not ids:
+            return {}
+        with self._cursor() as cur:
+            cur.execute('SELECT id, filename FROM resumes WHERE id = ANY(%s)', (list(ids),))
+            return {r['id']: r['filename'] for r in cur.fetchall()}
+
+    def resume_ids_with_skill(self, skill):
+        """Resume ids listing skill in any category (case-insensitive), via the resume_skills table."""
+        with self._cursor() as cur:
+            cur.execute('SELECT resume_id FROM resume_skills WHERE skill = %s ORDER BY resume_id', (skill.lower(),))
+            return [r['resume_id'] for r in cur.fetchall()]
+
+    def resume_ids_containing(self, skills_fragment):
+        """Resume ids whose extracted_skills contain a JSON fragment, e.g. {'technical_skills': ['Python']} (GIN)."""
+        with self._cursor() as cur:
+            cur.execute('SELECT id FROM resumes WHERE extracted_skills @> %s::jsonb ORDER BY id',
+                        (json.dumps(skills_fragment),))
+            return [r['id'] for r in cur.fetchall()]
+
+    def skill_changes_after(self, after_seq):
+        with self._cursor() as cur:
+            cur.execute('SELECT r.skills_seq, r.id, s.skill FROM resumes r '
+                        'LEFT JOIN resume_skills s ON s.resume_id = r.id '
+                        'WHERE r.skills_seq > %s ORDER BY r.skills_seq', (after_seq,))
+            return [(r['skills_seq'], r['id'], r['skill']) for r in cur.fetchall()]
+
+    def backfill_skill_index(self):
+        # resume_skills is written together with every resume, so nothing is ever missing
+        return 0
+
+    def stale_resumes(self, version, after_id=0, limit=100):
+        with self._cursor() as cur:
+            cur.execute(f'SELECT {STALE_COLUMNS}, extracted_text FROM resumes WHERE id > %s '
+                        'AND extractor_version IS DISTINCT FROM %s ORDER BY id LIMIT %s', (after_id, version, limit))
+            return [_decode(r) for r in cur.fetchall()]
+
+    def count_stale_resumes(self, version, after_id=0):
+        with self._cursor() as cur:
+            cur.execute('SELECT COUNT(*) AS n FROM resumes WHERE id > %s AND extractor_version IS DISTINCT FROM %s',
+                        (after_id, version))
+            return cur.fetchone()['n']
+
+    def update_extractions(self, items, analyses=(), matches=()):
+        if not items:
+            return
+        with self._cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur, 'UPDATE resumes r SET extracted_skills = v.skills::jsonb, extractor_version = v.version, '
+                "skills_seq = nextval('resume_skills_seq'), extracted_text = COALESCE(v.text, r.extracted_text) "
+                'FROM (VALUES %s) AS v (id, text, skills, version) WHERE r.id = v.id',
+                [(resume_id, _pg_text(text), json.dumps(skills), version) for resume_id, text, skills, version in items])
+            cur.execute('DELETE FROM resume_skills WHERE resume_id = ANY(%s)', ([item[0] for item in items],))
+            psycopg2.extras.execute_values(cur, 'INSERT INTO resume_skills (resume_id, skill) VALUES %s '
+                                           'ON CONFLICT DO NOTHING',
+                                           [(resume_id, _pg_text(s)) for resume_id, _text, skills, _version in items
+                                            for s in normalized_skills(skills)])
+            self._put_analyses(cur, analyses)
+            now = datetime.utcnow()
+            for resume_id, rows in matches:
+                self._replace_job_matches(cur, resume_id, rows, now)
+
+    def get_analysis(self, resume_id):
+        with self._cursor() as cur:
+            cur.execute('SELECT version, etag, body FROM resume_analysis WHERE resume_id = %s', (resume_id,))
+            row = cur.fetchone()
+            return dict(row) if row else None
+
+    def put_analysis(self, resume_id, record):
+        self.put_analyses([(resume_id, record)])
+
+    def put_analyses(self, items):
+        with self._cursor() as cur:
+            self._put_analyses(cur, items)
+
+    def _put_analyses(self, cur, items):
+        items = list(dict(items).items())
+        if not items:
+            return
+        cur.execute('SELECT body FROM resume_analysis WHERE resume_id = ANY(%s) FOR UPDATE', ([i for i, _r in items],))
+        old = [r['body'] for r in cur.fetchall()]
+        psycopg2.extras.execute_values(
+            cur, 'INSERT INTO resume_analysis (resume_id, version, etag, body) VALUES %s '
+            'ON CONFLICT (resume_id) DO UPDATE SET version = EXCLUDED.version, etag = EXCLUDED.etag, '
+            'body = EXCLUDED.body', [(i, r['version'], r['etag'], r['body']) for i, r in items])
+        self._apply_aggregates(cur, aggregate_deltas([r['body'] for _i, r in items], old))
+
+    def _apply_aggregates(self, cur, deltas):
+        # sorted keys: concurrent writers lock the shared count rows in the same order
+        skills, pairs, scores = deltas
+        if skills:
+            psycopg2.extras.execute_values(
+                cur, 'INSERT INTO skill_counts (skill, resumes) VALUES %s ON CONFLICT (skill) '
+                'DO UPDATE SET resumes = skill_counts.resumes + EXCLUDED.resumes', sorted(skills.items()))
+        if pairs:
+            psycopg2.extras.execute_values(
+                cur, 'INSERT INTO skill_pairs (skill_a, skill_b, resumes) VALUES %s ON CONFLICT (skill_a, skill_b) '
+                'DO UPDATE SET resumes = skill_pairs.resumes + EXCLUDED.resumes',
+                [(a, b, n) for (a, b), n in sorted(pairs.items())])
+        if scores:
+            psycopg2.extras.execute_values(
+                cur, 'INSERT INTO score_counts (score, resumes) VALUES %s ON CONFLICT (score) '
+                'DO UPDATE SET resumes = score_counts.resumes + EXCLUDED.resumes', sorted(scores.items()))
+
+    def aggregate_counts(self):
+        with self._cursor() as cur:
+            cur.execute('SELECT skill, resumes FROM skill_counts WHERE resumes > 0')
+            skills = {r['skill']: r['resumes'] for r in cur.fetchall()}
+            cur.execute('SELECT score, resumes FROM score_counts WHERE resumes > 0')
+            scores = {r['score']: r['resumes'] for r in cur.fetchall()}
+        return skills, scores
+
+    def co_occurring_skills(self, skill, limit=10):
+        with self._cursor() as cur:
+            cur.execute('''SELECT skill_b AS skill, resumes FROM skill_pairs WHERE skill_a = %s AND resumes > 0
+                UNION ALL SELECT skill_a, resumes FROM skill_pairs WHERE skill_b = %s AND resumes > 0
+                ORDER BY resumes DESC, skill LIMIT %s''', (skill, skill, limit))
+            return [(r['skill'], r['resumes']) for r in cur.fetchall()]
+
+    def rebuild_aggregates(self):
+        with self._cursor() as cur:
+            cur.execute('TRUNCATE skill_counts, skill_pairs, score_counts')
+            last_id = 0
+            while True:
+                cur.execute('SELECT resume_id, body FROM resume_analysis WHERE resume_id > %s ORDER BY resume_id '
+                            'LIMIT 1000', (last_id,))
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                self._apply_aggregates(cur, aggregate_deltas([r['body'] for r in rows]))
+                last_id = rows[-1]['resume_id']
+
+    def find_user(self, email):
+        with self._cursor() as cur:
+            cur.execute('SELECT id, email, name, password_hash FROM users WHERE email = %s', (email,))
+            row = cur.fetchone()
+            return dict(row) if row else None
+
+    def create_user(self, email, name, password_hash):
+        with self._cursor() as cur:
+            cur.execute('INSERT INTO users (email, name, password_hash, created_at) VALUES (%s, %s, %s, %s) '
+                        'ON CONFLICT (email) DO NOTHING RETURNING id', (email, name, password_hash, datetime.utcnow()))
+            row = cur.fetchone()
+            return row['id'] if row else None
+
+    def update_password_hash(self, user_id, password_hash):
+        with self._cursor() as cur:
+            cur.execute('UPDATE users SET password_hash = %s WHERE id = %s', (password_hash, user_id))
+
+    def create_job_profile(self, title, description, skills, owner_id):
+        with self._cursor() as cur:
+            cur.execute('INSERT INTO job_profiles (title, description, skills, status, owner_id, created_at) '
+                        'VALUES (%s, %s, %s, %s, %s, %s) RETURNING id',
+                        (_pg_text(title), _pg_text(description), json.dumps(skills), 'open', owner_id,
+                         datetime.utcnow()))
+            return cur.fetchone()['id']
+
+    def get_job_profile(self, profile_id):
+        with self._cursor() as cur:
+            cur.execute(f'SELECT {JOB_PROFILE_COLUMNS} FROM job_profiles WHERE id = %s', (profile_id,))
+            row = cur.fetchone()
+            return _decode_profile(row) if row else None
+
+    def list_job_profiles(self, status=None):
+        with self._cursor() as cur:
+            if status is None:
+                cur.execute(f'SELECT {JOB_PROFILE_COLUMNS} FROM job_profiles ORDER BY id')
+            else:
+                cur.execute(f'SELECT {JOB_PROFILE_COLUMNS} FROM job_profiles WHERE status = %s ORDER BY id', (status,))
+            return [_decode_profile(r) for r in cur.fetchall()]
+
+    def set_job_profile_status(self, profile_id, status):
+        with self._cursor() as cur:
+            cur.execute('UPDATE job_profiles SET status = %s WHERE id = %s', (status, profile_id))
+            return cur.rowcount > 0
+
+    def put_job_matches(self, rows):
+        if not rows:
+            return
+        now = datetime.utcnow()
+        with self._cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur, 'INSERT INTO job_profile_matches (job_profile_id, resume_id, match_percentage, matching_count, '
+                'created_at) VALUES %s ON CONFLICT (job_profile_id, resume_id) DO UPDATE SET '
+                'match_percentage = EXCLUDED.match_percentage, matching_count = EXCLUDED.matching_count, '
+                'created_at = EXCLUDED.created_at', [tuple(r) + (now,) for r in rows])
+
+    def replace_job_matches(self, resume_id, rows):
+        with self._cursor() as cur:
+            self._replace_job_matches(cur, resume_id, rows, datetime.utcnow())
+
+    def _replace_job_matches(self, cur, resume_id, rows, now):
+        cur.execute(f'DELETE FROM job_profile_matches WHERE resume_id = %s AND {OPEN_PROFILE_MATCH}', (resume_id,))
+        if rows:
+            psycopg2.extras.execute_values(
+                cur, 'INSERT INTO job_profile_matches (job_profile_id, resume_id, match_percentage, matching_count, '
+                'created_at) VALUES %s', [tuple(r) + (now,) for r in rows])
+
+    def job_matches(self, profile_id, limit=50):
+        with self._cursor() as cur:
+            cur.execute('''SELECT m.resume_id, r.filename, m.match_percentage, m.matching_count, m.created_at
+                FROM job_profile_matches m JOIN resumes r ON r.id = m.resume_id
+                WHERE m.job_profile_id = %s
+                ORDER BY m.match_percentage DESC, m.matching_count DESC, m.resume_id DESC LIMIT %s''',
+                        (profile_id, limit))
+            return [dict(r, created_at=r['created_at'].isoformat()) for r in cur.fetchall()]
+
+
+def _int_id(value):
+    # the SQL backends coerce '5' (a query-string id) to 5; match that here
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MemoryRepository:
+    """In-process repository with the same behaviour as the SQL backends, for tests and benchmarks."""
+
+    def __init__(self):
+        self._resumes = {}
+        self._texts = {}
+        self._analyses = {}
+        self._users = {}
+        self._profiles = {}
+        self._job_matches = {}
+        self._skill_counts = Counter()
+        self._pair_counts = Counter()
+        self._score_counts = Counter()
+        self._skill_seqs = {}
+        self._next_skill_seq = 1
+        self._next_resume = 1
+        self._next_user = 1
+        self._next_profile = 1
+        self._lock = threading.Lock()
+
+    def close(self):
+        pass
+
+    def create_all(self):
+        pass
+
+    def insert_resume(self, row):
+        return self.insert_resumes([row])[0]
+
+    def insert_resumes(self, rows):
+        ids = []
+        with self._lock:
+            for filename, file_path, text, skills_json, created_at, content_hash, extractor_version in rows:
+                resume_id = self._next_resume
+                self._next_resume += 1
+                self._texts[resume_id] = text
+                self._resumes[resume_id] = {
+                    'id': resume_id, 'filename': filename, 'file_path': file_path,
+                    'extracted_skills': json.loads(skills_json) if skills_json else {},
+                    'created_at': created_at, 'content_hash': content_hash, 'extractor_version': extractor_version,
+                }
+                self._bump_skill_seq(resume_id)
+                ids.append(resume_id)
+        return ids
+
+    def _project(self, resume_id, columns):
+        # caller holds self._lock
+        selected, with_text = _projection(columns)
+        resume = self._resumes.get(resume_id)
+        if resume is None:
+            return None
+        row = {c: copy.deepcopy(resume[c]) for c in selected}
+        if with_text:
+            row['extracted_text'] = self._texts.get(resume_id)
+        return row
+
+    def get_resume(self, resume_id, columns=RESUME_COLUMNS):
+        with self._lock:
+            return self._project(_int_id(resume_id), columns)
+
+    def latest_resume(self, columns=RESUME_COLUMNS):
+        with self._lock:
+            return self._project(max(self._resumes, default=None), columns)
+
+    def resume_text(self, resume_id):
+        with self._lock:
+            return self._texts.get(_int_id(resume_id))
+
+    def resume_exists(self, resume_id):
+        with self._lock:
+            return _int_id(resume_id) in self._resumes
+
+    def list_resumes(self, after_id=None, limit=None, since=None, until=None, skills=(), with_skills=False):
+        wanted = {s.lower() for s in skills}
+        columns = ('id', 'filename', 'created_at') + (('extracted_skills',) if with_skills else ())
+        rows = []
+        with self._lock:
+            for resume_id in sorted(self._resumes, reverse=True):
+                r = self._resumes[resume_id]
+                if after_id is not None and resume_id >= after_id:
+                    continue
+                if (since is not None and r['created_at'] < since) or (until is not None and r['created_at'] >= until):
+                    continue
+                if wanted and not wanted <= normalized_skills(r['extracted_skills']):
+                    continue
+                rows.append({c: copy.deepcopy(r[c]) for c in columns})
+                if limit is not None and len(rows) >= limit:
+                    break
+        return rows
+
+    def resume_filenames(self, ids):
+        with self._lock:
+            return {i: self._resumes[i]['filename'] for i in ids if i in self._resumes}
+
+    def resume_ids_with_skill(self, skill):
+        skill = skill.lower()
+        with self._lock:
+            return sorted(i for i, r in self._resumes.items() if skill in normalized_skills(r['extracted_skills']))
+
+    def _bump_skill_seq(self, resume_id):
+        self._skill_seqs[resume_id] = self._next_skill_seq
+        self._next_skill_seq += 1
+
+    def skill_changes_after(self, after_seq):
+        with self._lock:
+            changed = sorted((seq, i) for i, seq in self._skill_seqs.items() if seq > after_seq)
+            return [(seq, i, s) for seq, i in changed
+                    for s in sorted(normalized_skills(self._resumes[i]['extracted_skills'])) or [None]]
+
+    def backfill_skill_index(self):
+        return 0
+
+    def stale_resumes(self, version, after_id=0, limit=100):
+        columns = STALE_COLUMNS.split(', ')
+        with self._lock:
+            ids = [i for i in sorted(self._resumes) if i > after_id and self._resumes[i]['extractor_version'] != version]
+            return [dict({c: copy.deepcopy(self._resumes[i][c]) for c in columns}, extracted_text=self._texts.get(i))
+                    for i in ids[:limit]]
+
+    def count_stale_resumes(self, version, after_id=0):
+        with self._lock:
+            return sum(1 for i, r in self._resumes.items() if i > after_id and r['extractor_version'] != version)
+
+    def update_extractions(self, items, analyses=(), matches=()):
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            for resume_id, text, skills, version in items:
+                resume = self._resumes.get(resume_id)
+                if resume is None:
+                    continue
+                resume['extracted_skills'] = copy.deepcopy(skills)
+                resume['extractor_version'] = version
+                self._bump_skill_seq(resume_id)
+                if text is not None:
+                    self._texts[resume_id] = text
+            self._put_analyses(analyses)
+            for resume_id, rows in matches:
+                self._replace_job_matches(resume_id, rows, now)
+
+    def get_analysis(self, resume_id):
+        with self._lock:
+            record = self._analyses.get(_int_id(resume_id))
+            return dict(record) if record else None
+
+    def put_analysis(self, resume_id, record):
+        self.put_analyses([(resume_id, record)])
+
+    def put_analyses(self, items):
+        with self._lock:
+            self._put_analyses(items)
+
+    def _put_analyses(self, items):
+        items = list(dict(items).items())
+        old = [self._analyses[i]['body'] for i, _r in items if i in self._analyses]
+        for resume_id, record in items:
+            self._analyses[resume_id] = dict(record)
+        self._apply_aggregates(aggregate_deltas([r['body'] for _i, r in items], old))
+
+    def _apply_aggregates(self, deltas):
+        for counts, delta in zip((self._skill_counts, self._pair_counts, self._score_counts), deltas):
+            counts.update(delta)
+
+    def aggregate_counts(self):
+        with self._lock:
+            return ({s: n for s, n in self._skill_counts.items() if n > 0},
+                    {s: n for s, n in self._score_counts.items() if n > 0})
+
+    def co_occurring_skills(self, skill, limit=10):
+        with self._lock:
+            pairs = [(b if a == skill else a, n) for (a, b), n in self._pair_counts.items()
+                     if n > 0 and skill in (a, b)]
+        pairs.sort(key=lambda p: (-p[1], p[0]))
+        return pairs[:limit]
+
+    def rebuild_aggregates(self):
+        with self._lock:
+            for counts in (self._skill_counts, self._pair_counts, self._score_counts):
+                counts.clear()
+            self._apply_aggregates(aggregate_deltas([r['body'] for r in self._analyses.values()]))
+
+    def find_user(self, email):
+        with self._lock:
+            user = self._users.get(email)
+            return dict(user) if user else None
+
+    def create_user(self, email, name, password_hash):
+        with self._lock:
+            if email in self._users:
+                return None
+            user_id = self._next_user
+            self._next_user += 1
+            self._users[email] = {'id': user_id, 'email': email, 'name': name, 'password_hash': password_hash}
+            return user_id
+
+    def update_password_hash(self, user_id, password_hash):
+        with self._lock:
+            for user in self._users.values():
+                if user['id'] == user_id:
+                    user['password_hash'] = password_hash
+
+    def create_job_profile(self, title, description, skills, owner_id):
+        with self._lock:
+            profile_id = self._next_profile
+            self._next_profile += 1
+            self._profiles[profile_id] = {'id': profile_id, 'title': title, 'description': description,
+                                          'skills': list(skills), 'status': 'open', 'owner_id': owner_id,
+                                          'created_at': datetime.utcnow().isoformat()}
+            return profile_id
+
+    def get_job_profile(self, profile_id):
+        with self._lock:
+            profile = self._profiles.get(_int_id(profile_id))
+            return copy.deepcopy(profile) if profile else None
+
+    def list_job_profiles(self, status=None):
+        with self._lock:
+            return [copy.deepcopy(p) for _, p in sorted(self._profiles.items())
+                    if status is None or p['status'] == status]
+
+    def set_job_profile_status(self, profile_id, status):
+        with self._lock:
+            profile = self._profiles.get(_int_id(profile_id))
+            if profile is None:
+                return False
+            profile['status'] = status
+            return True
+
+    def put_job_matches(self, rows):
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            for profile_id, resume_id, percent, count in rows:
+                self._job_matches[(profile_id, resume_id)] = (percent, count, now)
+
+    def replace_job_matches(self, resume_id, rows):
+        with self._lock:
+            self._replace_job_matches(resume_id, rows, datetime.utcnow().isoformat())
+
+    def _replace_job_matches(self, resume_id, rows, now):
+        for key in [k for k in self._job_matches if k[1] == resume_id
+                    and self._profiles.get(k[0], {}).get('status') == 'open']:
+            del self._job_matches[key]
+        for profile_id, match_resume_id, percent, count in rows:
+            self._job_matches[(profile_id, match_resume_id)] = (percent, count, now)
+
+    def job_matches(self, profile_id, limit=50):
+        profile_id = _int_id(profile_id)
+        with self._lock:
+            rows = [(resume_id, percent, count, created_at)
+                    for (pid, resume_id), (percent, count, created_at) in self._job_matches.items()
+                    if pid == profile_id and resume_id in self._resumes]
+            rows.sort(key=lambda r: (r[1], r[2], r[0]), reverse=True)
+            return [{'resume_id': resume_id, 'filename': self._resumes[resume_id]['filename'],
+                     'match_percentage': percent, 'matching_count': count, 'created_at': created_at}
+                    for resume_id, percent, count, created_at in rows[:limit]]
+
+
+def open_repository(url, sqlite_path, pool=None):
+    """Build the repository for DATABASE_URL (None means the SQLite file at sqlite_path)."""
+    if not url:
+        return SQLiteRepository(sqlite_path, pool)
+    if url.startswith('sqlite:///'):
+        return SQLiteRepository(url[len('sqlite:///'):])
+    if url.startswith(('postgres://', 'postgresql://')):
+        return PostgresRepository(url)
+    if url == 'memory://':
+        return MemoryRepository()
+    raise ValueError(f'Unsupported DATABASE_URL: {url}')
@@ -0,0 +1,109 @@
+"""
+Recall and latency benchmark for the IVF resume similarity index.
+
+Builds the index over synthetic clustered unit vectors (or the vectors of an
+existing embedding store), then compares top-10 results against exact
+brute-force cosine search for several nprobe settings. Also times a
+save/load round trip.
+
+Usage:
+    python scripts/bench_ann.py [--vectors 200000] [--queries 200]
+    python scripts/bench_ann.py --store data.embeddings --db data.db
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ann import IVFIndex  # noqa: E402
+
+
+def synthetic(n, dim, clusters, seed):
+    """Unit vectors drawn around random cluster centres, like embeddings of similar resumes."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, n)] + 1.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def from_store(store_path, db_path):
+    from embeddings import EmbeddingStore
+    store = EmbeddingStore(store_path)
+    db = sqlite3.connect(db_path)
+    rows = db.execute("SELECT row, resume_id FROM embedding_rows WHERE kind = 'resume' ORDER BY row").fetchall()
+    return np.array([r[1] for r in rows], dtype=np.int64), store.vectors([r[0] for r in rows])
+
+
+def percentile(values, q):
+    return float(np.percentile(np.asarray(values), q))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recall@10 and latency of the ANN index versus exact search.')
+    parser.add_argument('--vectors', type=int, default=200000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--clusters', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--nprobe', default='1,4,8,16,32')
+    parser.add_argument('--seed', type=int, default=5)
+    parser.add_argument('--store', help='embedding store to benchmark instead of synthetic data')
+    parser.add_argument('--db', help='data.db that maps the store rows (with --store)')
+    args = parser.parse_args()
+
+    if args.store:
+        ids, vectors = from_store(args.store, args.db)
+    else:
+        vectors = synthetic(args.vectors, args.dim, args.clusters, args.seed)
+        ids = np.arange(len(vectors), dtype=np.int64)
+    print(f'{len(ids)} vectors, dim {vectors.shape[1]}')
+
+    start = time.perf_counter()
+    index = IVFIndex(vectors.shape[1], min_train=1)
+    index.add_many(ids.tolist(), vectors)
+    print(f'build: {time.perf_counter() - start:.1f}s, {len(index.centroids)} lists')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'index.npz')
+        start = time.perf_counter()
+        index.save(path)
+        save_s = time.perf_counter() - start
+        start = time.perf_counter()
+        index = IVFIndex.load(path)
+        print(f'save: {save_s:.2f}s, load: {time.perf_counter() - start:.2f}s, '
+              f'{os.path.getsize(path) / 1e6:.0f} MB')
+
+    rng = np.random.default_rng(args.seed + 1)
+    queries = vectors[rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)]
+
+    exact = []
+    exact_ms = []
+    for q in queries:
+        start = time.perf_counter()
+        sims = vectors @ q
+        top = np.argpartition(-sims, args.k - 1)[:args.k]
+        exact_ms.append((time.perf_counter() - start) * 1000)
+        exact.append(set(ids[top].tolist()))
+    print(f'exact      p50 {percentile(exact_ms, 50):7.2f} ms  p95 {percentile(exact_ms, 95):7.2f} ms')
+
+    for nprobe in (int(x) for x in args.nprobe.split(',')):
+        hits = 0
+        latencies = []
+        for q, truth in zip(queries, exact):
+            start = time.perf_counter()
+            found = index.search(q, k=args.k, nprobe=nprobe)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(truth & {key for key, _ in found})
+        recall = hits / (len(queries) * args.k)
+        print(f'nprobe {nprobe:3d}  p50 {percentile(latencies, 50):7.2f} ms  p95 {percentile(latencies, 95):7.2f} ms'
+              f'  recall@{args.k} {recall:.3f}')
+
+
+if __name__ == '__main__':
+    main()
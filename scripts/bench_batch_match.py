@@ -0,0 +1,89 @@
+"""
+Parity check and benchmark for the batched (NumPy bitset) matcher.
+
+Generates a synthetic population, verifies that every batched score equals
+analyze_match exactly, then times batched scoring against a Python loop.
+
+Usage:
+    python scripts/bench_batch_match.py [--resumes 100000] [--jobs 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from matching import BitsetMatrix, analyze_match, score_jobs_for_candidate, score_population  # noqa: E402
+
+
+def check(result, reference):
+    assert result['match_percentage'] == reference['match_percentage'], (result, reference)
+    assert result['matching_count'] == len(reference['matching_skills']), (result, reference)
+    assert result['missing_count'] == len(reference['missing_skills']), (result, reference)
+    assert result['additional_count'] == len(reference['additional_skills']), (result, reference)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parity check and benchmark for batched matching.')
+    parser.add_argument('--resumes', type=int, default=100000)
+    parser.add_argument('--jobs', type=int, default=5000)
+    parser.add_argument('--vocab', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = [f'Skill {i}' for i in range(args.vocab)]
+    resumes = {i: rng.sample(vocab, rng.randint(0, 30)) for i in range(args.resumes)}
+    jobs = {i: rng.sample(vocab, rng.randint(1, 15)) for i in range(args.jobs)}
+
+    resume_matrix, build_ms = timed(lambda: _build(resumes))
+    job_matrix, job_build_ms = timed(lambda: _build(jobs))
+    print(f'built {args.resumes} resume rows in {build_ms:.0f} ms, {args.jobs} job rows in {job_build_ms:.0f} ms')
+
+    batch_ms = loop_ms = 0.0
+    for _ in range(args.queries):
+        job = rng.sample(vocab, rng.randint(1, 15)) + ['Not In Vocabulary']
+        results, ms = timed(lambda: score_population(resume_matrix, job, limit=10))
+        batch_ms += ms
+        references, ms = timed(lambda: {k: analyze_match(v, job) for k, v in resumes.items()})
+        loop_ms += ms
+        ranked = sorted(references.values(), key=lambda r: r['match_percentage'], reverse=True)
+        assert [r['match_percentage'] for r in results] == [r['match_percentage'] for r in ranked[:10]]
+        for r in results:
+            check(r, references[r['key']])
+    print(f'job -> {args.resumes} resumes: batched {batch_ms / args.queries:.1f} ms/query, '
+          f'analyze_match loop {loop_ms / args.queries:.1f} ms/query')
+
+    batch_ms = loop_ms = 0.0
+    for _ in range(args.queries):
+        candidate = rng.sample(vocab, rng.randint(0, 30))
+        results, ms = timed(lambda: score_jobs_for_candidate(job_matrix, candidate))
+        batch_ms += ms
+        references, ms = timed(lambda: {k: analyze_match(candidate, v) for k, v in jobs.items()})
+        loop_ms += ms
+        assert len(results) == len(jobs)
+        for r in results:
+            check(r, references[r['key']])
+    print(f'resume -> {args.jobs} jobs: batched {batch_ms / args.queries:.1f} ms/query, '
+          f'analyze_match loop {loop_ms / args.queries:.1f} ms/query')
+    print('parity: OK')
+
+
+def _build(population):
+    matrix = BitsetMatrix()
+    for key, skills in population.items():
+        matrix.add(key, skills)
+    return matrix
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Scaling of certification extraction on adversarial inputs: the old
+backtracking regex against the current catalog + bounded-phrase stage.
+
+Each input family is generated at doubling sizes and timed (best of
+--repeats). The growth exponent is log2(time(2n) / time(n)) averaged over
+the doublings: ~1 is linear, ~2 quadratic. The old regex only runs up to
+--old-max-chars because it is quadratic. Exits non-zero when the current
+extractor's exponent exceeds --max-exponent on any family. Results are
+stored in benchmarks/certifications/<time>-<commit>.json.
+
+Usage:
+    python scripts/bench_certifications.py [--min-chars 2000] [--max-chars 256000] [--old-max-chars 8000]
+"""
+import argparse
+import math
+import random
+import re
+import sys
+import time
+
+import benchlib
+
+from skills import extract_certifications  # noqa: E402
+
+OLD_PATTERN = re.compile(r"certified in ([\w\s]+)|([\w\s]+) certification|([\w\s]+) certified", re.IGNORECASE)
+
+
+def old_extract(text):
+    return [c.strip() for tup in OLD_PATTERN.findall(text) for c in tup if c]
+
+
+def filler(rng, size, words_per_line=None, keyword_every=None):
+    out = []
+    length = 0
+    i = 0
+    while length < size:
+        i += 1
+        if keyword_every and i % keyword_every == 0:
+            word = rng.choice(('certified', 'certification', 'certified in'))
+        else:
+            word = rng.choice(benchlib.FILLER)
+        sep = '\n' if words_per_line and i % words_per_line == 0 else ' '
+        out.append(word + sep)
+        length += len(word) + 1
+    return ''.join(out)[:size]
+
+
+FAMILIES = {
+    # one paragraph-sized line without any keyword: the old regex retries [\w\s]+ from every offset
+    'one_line': lambda rng, n: filler(rng, n),
+    # the same wrapped like extracted PDF text; [\w\s]+ runs across the newlines
+    'wrapped': lambda rng, n: filler(rng, n, words_per_line=12),
+    # a keyword every 20 words
+    'keywords': lambda rng, n: filler(rng, n, words_per_line=12, keyword_every=20),
+    # a keyword followed by one long whitespace run
+    'whitespace': lambda rng, n: 'AWS certified' + ' ' * (n - 26) + ' certification',
+}
+
+
+def best_time(fn, text, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def exponent(times):
+    """Mean log2 growth per doubling of the input."""
+    ratios = [math.log2(b / a) for a, b in zip(times, times[1:]) if a > 0 and b > 0]
+    return sum(ratios) / len(ratios) if ratios else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Certification extraction scaling on adversarial inputs.')
+    parser.add_argument('--min-chars', type=int, default=2000)
+    parser.add_argument('--max-chars', type=int, default=256000)
+    parser.add_argument('--old-max-chars', type=int, default=8000, help="largest input for the old regex")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--max-exponent', type=float, default=1.3, help='fail above this growth exponent')
+    parser.add_argument('--output', help='result file (default: benchmarks/certifications/<time>-<commit>.json)')
+    args = parser.parse_args()
+
+    sizes = []
+    n = args.min_chars
+    while n <= args.max_chars:
+        sizes.append(n)
+        n *= 2
+    rng = random.Random(0)
+    results = {}
+    failed = []
+    print(f"{'family':12s} {'impl':8s} " + ' '.join(f'{s:>9d}' for s in sizes) + '   exponent')
+    for family, make in FAMILIES.items():
+        texts = {size: make(rng, size) for size in sizes}
+        for impl, fn, limit in (('old', old_extract, args.old_max_chars), ('current', extract_certifications, None)):
+            times = []
+            for size in sizes:
+                if limit is not None and size > limit:
+                    break
+                elapsed = best_time(fn, texts[size], args.repeats)
+                times.append(elapsed)
+                results[f'{impl}:{family}:{size}'] = benchlib.summarize([elapsed], elapsed)
+            growth = exponent(times)
+            cells = ' '.join(f'{t * 1000:8.2f}m' for t in times) + ' ' * (10 * (len(sizes) - len(times)))
+            print(f'{family:12s} {impl:8s} {cells}   {growth:.2f}' if growth is not None else f'{family:12s} {impl:8s} {cells}')
+            results[f'{impl}:{family}:exponent'] = {'exponent': round(growth, 3) if growth is not None else None}
+            if impl == 'current' and growth is not None and growth > args.max_exponent:
+                failed.append(family)
+
+    path = benchlib.write_results('certifications', vars(args), results, args.output)
+    print(f'results written to {path}')
+    if failed:
+        print(f"non-linear growth on: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Concurrent upload + read throughput of the SQLite access layer.
+
+"before" opens a plain sqlite3 connection per operation against a schema
+without the migration indexes (the old get_db behaviour); "after" uses the
+pooled, WAL-mode connections and migrated schema the app now uses. Writer
+threads insert resumes like /api/upload-resume; reader threads fetch a resume
+by id and the newest uploads like /api/resume/<id> and /api/resumes.
+
+Usage:
+    python scripts/bench_db.py [--seconds 10] [--writers 4] [--readers 16] [--seed-rows 20000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from connections import ConnectionPool  # noqa: E402
+from db import create_schema, insert_resume, insert_resumes, migrate, resume_row  # noqa: E402
+
+SKILLS = {'technical_skills': ['Python', 'SQL', 'Docker'], 'soft_skills': ['Leadership'], 'certifications': []}
+
+
+def text_of(n):
+    return ('experience with python and distributed systems ' * 400)[:n]
+
+
+def seed(path, rows, tuned):
+    db = sqlite3.connect(path)
+    if tuned:
+        migrate(db)
+    else:
+        create_schema(db)
+        db.commit()
+    batch = [resume_row(f'seed{i}.pdf', f'uploads/seed{i}.pdf', None, text_of(8000), SKILLS) for i in range(rows)]
+    for i in range(0, rows, 1000):
+        insert_resumes(db, batch[i:i + 1000])
+    db.close()
+
+
+def run(path, tuned, seconds, writers, readers, max_id):
+    pool = ConnectionPool(path, sqlite3.Row) if tuned else None
+    stop = time.perf_counter() + seconds
+    stats = {'write': [], 'read': [], 'errors': 0}
+    lock = threading.Lock()
+
+    def borrow():
+        if tuned:
+            return pool.acquire()
+        db = sqlite3.connect(path)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def give_back(db):
+        if tuned:
+            pool.release(db)
+        else:
+            db.close()
+
+    def worker(kind):
+        rng = random.Random()
+        latencies = []
+        errors = 0
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            db = borrow()
+            try:
+                if kind == 'write':
+                    insert_resume(db, resume_row('bench.pdf', 'uploads/bench.pdf', None, text_of(8000), SKILLS))
+                else:
+                    db.execute('SELECT * FROM resumes WHERE id = ?', (rng.randint(1, max_id),)).fetchone()
+                    db.execute('SELECT id, filename, created_at FROM resumes ORDER BY created_at DESC LIMIT 20').fetchall()
+                latencies.append(time.perf_counter() - start)
+            except sqlite3.OperationalError:
+                errors += 1
+            finally:
+                give_back(db)
+        with lock:
+            stats[kind].extend(latencies)
+            stats['errors'] += errors
+
+    threads = [threading.Thread(target=worker, args=('write',)) for _ in range(writers)]
+    threads += [threading.Thread(target=worker, args=('read',)) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if pool:
+        pool.close_all()
+    return stats
+
+
+def p95(values):
+    values = sorted(values)
+    return values[int(len(values) * 0.95)] * 1000 if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent upload + read throughput, before/after pooling and WAL.')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=16)
+    parser.add_argument('--seed-rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, tuned in (('before', False), ('after', True)):
+            path = os.path.join(tmp, f'{label}.db')
+            seed(path, args.seed_rows, tuned)
+            stats = run(path, tuned, args.seconds, args.writers, args.readers, args.seed_rows)
+            print(f"{label:6s}  writes {len(stats['write']) / args.seconds:8.0f}/s (p95 {p95(stats['write']):6.1f} ms)"
+                  f"  reads {len(stats['read']) / args.seconds:8.0f}/s (p95 {p95(stats['read']):6.1f} ms)"
+                  f"  lock errors {stats['errors']}")
+
+
+if __name__ == '__main__':
+    main()
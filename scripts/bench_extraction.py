@@ -0,0 +1,85 @@
+"""
+Micro-benchmarks of the per-resume hot paths: extract_text, extract_skills
+and analyze_match.
+
+Each operation runs over the same synthetic corpus (scripts/benchlib.py) for
+a few warm-up passes and then --iterations timed calls; per-call latency
+percentiles are stored like the load test's, in
+benchmarks/extraction/<time>-<commit>.json, and --compare flags operations
+whose p95 grew by more than --tolerance.
+
+Usage:
+    python scripts/bench_extraction.py [--resumes 20] [--iterations 200] [--words 600]
+                                       [--skill-density 0.05] [--compare previous]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import benchlib
+
+from extraction import extract_text  # noqa: E402
+from matching import analyze_match, candidate_skill_list  # noqa: E402
+from skills import TECH_SKILLS, extract_skills  # noqa: E402
+
+
+def bench(fn, inputs, iterations, warmup=3):
+    """Time `iterations` calls of fn, cycling through inputs; returns a summary."""
+    for arg in inputs[:warmup]:
+        fn(arg)
+    watch = benchlib.Stopwatch()
+    start = time.perf_counter()
+    for i in range(iterations):
+        watch.time(fn, inputs[i % len(inputs)])
+    return benchlib.summarize(watch.latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks of text extraction, skill extraction and matching.')
+    parser.add_argument('--resumes', type=int, default=20, help='distinct synthetic resumes per operation')
+    parser.add_argument('--iterations', type=int, default=200, help='timed calls per operation')
+    parser.add_argument('--words', type=int, default=600, help='words per synthetic resume')
+    parser.add_argument('--skill-density', type=float, default=0.05, help='share of words that are skills')
+    parser.add_argument('--job-skills', type=int, default=12, help='skills per job for analyze_match')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='result file (default: benchmarks/extraction/<time>-<commit>.json)')
+    parser.add_argument('--compare', help='baseline result file, or "previous"')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed p95 slowdown for --compare')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [benchlib.resume_text(rng, args.words, args.skill_density) for _ in range(args.resumes)]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in ('txt', 'pdf'):
+            paths = []
+            for i, text in enumerate(texts):
+                path = os.path.join(tmp, f'resume-{i}.{kind}')
+                with open(path, 'wb') as f:
+                    f.write(benchlib.text_pdf(text) if kind == 'pdf' else text.encode('utf-8'))
+                paths.append(path)
+            results[f'extract_text[{kind}]'] = bench(extract_text, paths, args.iterations)
+    results['extract_skills'] = bench(extract_skills, texts, args.iterations)
+
+    skills = list(TECH_SKILLS)
+    pairs = [(candidate_skill_list(extract_skills(text)), rng.sample(skills, min(args.job_skills, len(skills))))
+             for text in texts]
+    results['analyze_match'] = bench(lambda pair: analyze_match(*pair), pairs, args.iterations)
+
+    config = {k: v for k, v in vars(args).items() if k not in ('output', 'compare', 'tolerance')}
+    path = benchlib.write_results('extraction', config, results, args.output)
+    benchlib.print_table(results)
+    print(f'results written to {path}')
+    if args.compare:
+        baseline = benchlib.previous_result('extraction', path) if args.compare == 'previous' else args.compare
+        if baseline is None:
+            print('no earlier result to compare with')
+        elif benchlib.compare(baseline, path, tolerance=args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Scan cost of the resumes table with extracted_text inline vs. in resume_texts.
+
+Builds two databases with the same rows: "inline" keeps the raw text in
+resumes.extracted_text (the old layout); "side table" is the current layout
+where db.insert_resumes writes the text compressed to resume_texts. Then
+times the skills-only reads the endpoints do (full scan of extracted_skills
+and random lookups by id) with a cold page cache per run.
+
+Usage:
+    python scripts/bench_resume_scan.py [--rows 100000] [--text-bytes 20000] [--lookups 20000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db import create_schema, insert_resumes, migrate, resume_row  # noqa: E402
+
+SKILLS = {'technical_skills': ['Python', 'SQL', 'Docker'], 'soft_skills': ['Leadership'], 'certifications': ['AWS']}
+WORDS = ('python', 'distributed', 'systems', 'kubernetes', 'led', 'team', 'of', 'engineers', 'built', 'pipelines',
+         'reduced', 'latency', 'by', '40%', 'sql', 'aws', 'docker', 'mentored', 'designed', 'apis')
+
+
+def text_of(rng, n):
+    out = []
+    size = 0
+    while size < n:
+        word = rng.choice(WORDS)
+        out.append(word)
+        size += len(word) + 1
+    return ' '.join(out)
+
+
+def build(path, rows, text_bytes, inline):
+    rng = random.Random(0)
+    db = sqlite3.connect(path)
+    if inline:
+        create_schema(db)
+        db.commit()
+    else:
+        migrate(db)
+    for start in range(0, rows, 1000):
+        batch = [resume_row(f'r{i}.pdf', f'uploads/r{i}.pdf', None, text_of(rng, text_bytes), SKILLS)
+                 for i in range(start, min(rows, start + 1000))]
+        if inline:
+            db.executemany('INSERT INTO resumes (filename, file_path, extracted_text, extracted_skills, created_at, '
+                           'content_hash) VALUES (?, ?, ?, ?, ?, ?)', batch)
+            db.commit()
+        else:
+            insert_resumes(db, batch)
+    db.close()
+
+
+def measure(path, rows, lookups):
+    db = sqlite3.connect(path)
+    db.execute('PRAGMA cache_size=-16000')
+    pages = db.execute("SELECT count(*) FROM dbstat WHERE name = 'resumes'").fetchone()[0] \
+        if _has_dbstat(db) else None
+    start = time.perf_counter()
+    n = sum(1 for _ in db.execute('SELECT id, extracted_skills FROM resumes'))
+    scan = time.perf_counter() - start
+    assert n == rows
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(lookups):
+        db.execute('SELECT id, filename, extracted_skills FROM resumes WHERE id = ?', (rng.randint(1, rows),)).fetchone()
+    lookup = time.perf_counter() - start
+    db.close()
+    return pages, scan, lookup
+
+
+def _has_dbstat(db):
+    try:
+        db.execute('SELECT 1 FROM dbstat LIMIT 1')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resumes table scan cost, inline text vs compressed side table.')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--text-bytes', type=int, default=20000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, inline in (('inline', True), ('side table', False)):
+            path = os.path.join(tmp, f'{inline}.db')
+            build(path, args.rows, args.text_bytes, inline)
+            pages, scan, lookup = measure(path, args.rows, args.lookups)
+            print(f"{label:10s}  file {os.path.getsize(path) / 1e6:8.1f} MB"
+                  f"  resumes pages {pages if pages is not None else 'n/a':>8}"
+                  f"  skills scan {scan * 1000:8.1f} ms"
+                  f"  {args.lookups} lookups {lookup * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
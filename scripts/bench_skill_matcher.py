@@ -0,0 +1,84 @@
+"""
+Micro-benchmark for the compiled skill matcher.
+
+Builds synthetic taxonomies of growing size, then reports documents/sec for
+the Aho-Corasick matcher and for the legacy per-skill substring scan.
+
+Usage:
+    python scripts/bench_skill_matcher.py [--docs 200] [--doc-words 1500]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skills import SkillMatcher, TECH_SKILLS, SOFT_SKILLS  # noqa: E402
+
+
+def random_word(rng, lo=3, hi=10):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(lo, hi)))
+
+
+def make_taxonomy(rng, size):
+    names = list(TECH_SKILLS) + list(SOFT_SKILLS)
+    while len(names) < size:
+        words = rng.randint(1, 3)
+        names.append(' '.join(random_word(rng) for _ in range(words)).title())
+    return names[:size]
+
+
+def make_docs(rng, taxonomy, count, words):
+    docs = []
+    for _ in range(count):
+        tokens = [random_word(rng) for _ in range(words)]
+        for _ in range(words // 50):
+            tokens[rng.randrange(words)] = rng.choice(taxonomy)
+        docs.append(' '.join(tokens))
+    return docs
+
+
+def legacy_scan(taxonomy, text):
+    text_lower = text.lower()
+    return [skill for skill in taxonomy if skill.lower() in text_lower]
+
+
+def bench(fn, docs):
+    start = time.perf_counter()
+    for doc in docs:
+        fn(doc)
+    elapsed = time.perf_counter() - start
+    return len(docs) / elapsed if elapsed else float('inf')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--doc-words', type=int, default=1500)
+    parser.add_argument('--sizes', default='25,1000,10000,50000')
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='skip the legacy scan above this taxonomy size')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'taxonomy':>10} {'build ms':>10} {'matcher docs/s':>16} {'legacy docs/s':>15}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        taxonomy = make_taxonomy(rng, size)
+        docs = make_docs(rng, taxonomy, args.docs, args.doc_words)
+        start = time.perf_counter()
+        matcher = SkillMatcher({'technical_skills': taxonomy})
+        build_ms = (time.perf_counter() - start) * 1000
+        matcher_rate = bench(matcher.find, docs)
+        if size <= args.legacy_max:
+            legacy_rate = f"{bench(lambda d: legacy_scan(taxonomy, d), docs):15.1f}"
+        else:
+            legacy_rate = f"{'skipped':>15}"
+        print(f"{size:>10} {build_ms:>10.1f} {matcher_rate:>16.1f} {legacy_rate}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Cold-start time of a server process: interpreter start, imports and create_app.
+
+Starts --runs fresh interpreters that import wsgi.py (which runs create_app)
+against a throwaway DATA_DIR holding a copy of --db (default: an empty
+database, i.e. schema creation) and records the wall time of each process
+plus the per-phase timings create_app reports. Results are stored like the
+other suites, in benchmarks/startup/<time>-<commit>.json.
+
+Usage:
+    python scripts/bench_startup.py [--runs 5] [--db data.db] [--preload-models] [--compare previous]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import benchlib
+
+PROBE = ('import json, time; t = time.perf_counter(); import wsgi, app; '
+         'print(json.dumps(dict(app.startup_timings, import_wsgi=time.perf_counter() - t)))')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start time of the app (imports + create_app).')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--db', help='database to start from (copied; default: empty)')
+    parser.add_argument('--preload-models', action='store_true', help='set PRELOAD_MODELS=1')
+    parser.add_argument('--output', help='result file (default: benchmarks/startup/<time>-<commit>.json)')
+    parser.add_argument('--compare', help='baseline result file, or "previous"')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed p95 slowdown for --compare')
+    args = parser.parse_args()
+
+    wall = []
+    phases = {}
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            if args.db:
+                shutil.copy(args.db, os.path.join(tmp, 'data.db'))
+            env = dict(os.environ, DATA_DIR=tmp, UPLOAD_FOLDER=os.path.join(tmp, 'uploads'),
+                       PRELOAD_MODELS='1' if args.preload_models else '0')
+            start = time.perf_counter()
+            out = subprocess.run([sys.executable, '-c', PROBE], cwd=benchlib.ROOT, env=env, capture_output=True,
+                                 text=True, check=True).stdout
+            wall.append(time.perf_counter() - start)
+            for name, seconds in json.loads(out.strip().splitlines()[-1]).items():
+                phases.setdefault(name, []).append(seconds)
+
+    elapsed = sum(wall)
+    results = {'process': benchlib.summarize(wall, elapsed)}
+    for name, values in phases.items():
+        results[f'phase:{name}'] = benchlib.summarize(values, elapsed)
+    config = {k: v for k, v in vars(args).items() if k not in ('output', 'compare', 'tolerance')}
+    path = benchlib.write_results('startup', config, results, args.output)
+    benchlib.print_table(results)
+    print(f'results written to {path}')
+    if args.compare:
+        baseline = benchlib.previous_result('startup', path) if args.compare == 'previous' else args.compare
+        if baseline is None:
+            print('no earlier result to compare with')
+        elif benchlib.compare(baseline, path, tolerance=args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Shared pieces of the benchmark scripts: synthetic resumes, latency stats and
+JSON result files that can be compared across commits.
+
+Results are written to benchmarks/<suite>/<UTC time>-<commit>.json with the
+commit, machine and configuration alongside the numbers; ``compare`` diffs
+two such files (or a file against the newest earlier run).
+"""
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from skills import SOFT_SKILLS, TECH_SKILLS  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks')
+FILLER = ('delivered', 'projects', 'for', 'clients', 'across', 'the', 'company', 'and', 'worked', 'with',
+          'stakeholders', 'to', 'improve', 'processes', 'while', 'owning', 'roadmap', 'planning', 'in', 'a',
+          'fast', 'paced', 'environment', 'including', 'reporting', 'on', 'quarterly', 'results')
+SECTIONS = ('Summary', 'Experience', 'Projects', 'Education', 'Skills')
+
+
+# --- synthetic resumes -----------------------------------------------------
+
+def resume_text(rng, words=600, skill_density=0.05, certifications=1):
+    """A plain-text resume of about `words` words where `skill_density` of the tokens are known skills."""
+    skills = list(TECH_SKILLS) + list(SOFT_SKILLS)
+    lines = [f'Candidate {rng.randint(1, 10 ** 6)}', f'candidate{rng.randint(1, 10 ** 6)}@example.com']
+    per_section = max(1, words // len(SECTIONS))
+    for section in SECTIONS:
+        lines.append('')
+        lines.append(section)
+        tokens = []
+        for _ in range(per_section):
+            tokens.append(rng.choice(skills) if rng.random() < skill_density else rng.choice(FILLER))
+        # wrap at ~12 words per line like extracted PDF text
+        lines.extend(' '.join(tokens[i:i + 12]) for i in range(0, len(tokens), 12))
+    for _ in range(certifications):
+        lines.append(f'{rng.choice(["AWS", "Azure", "Kubernetes", "Scrum"])} certification')
+    return '\n'.join(lines) + '\n'
+
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def text_pdf(text, lines_per_page=48):
+    """A minimal multi-page PDF (Helvetica, one text line per line of input) as bytes."""
+    lines = text.split('\n')
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = []  # object bodies; object n is objects[n - 1]
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+    pages_id = add(None)  # filled in once the kids are known
+    kids = []
+    for page_lines in pages:
+        ops = ['BT', '/F1 10 Tf', '12 TL', '50 800 Td']
+        for line in page_lines:
+            ops.append(f'({_pdf_escape(line)}) Tj T*')
+        ops.append('ET')
+        stream = zlib.compress('\n'.join(ops).encode('latin-1', 'replace'))
+        content = add(b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        kids.append(add(f'<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 842] '
+                        f'/Resources << /Font << /F1 {font} 0 R >> >> /Contents {content} 0 R >>'.encode()))
+    objects[pages_id - 1] = (f'<< /Type /Pages /Kids [{" ".join(f"{k} 0 R" for k in kids)}] '
+                             f'/Count {len(kids)} >>').encode()
+    catalog = add(f'<< /Type /Catalog /Pages {pages_id} 0 R >>'.encode())
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+def resume_files(seed, count, words=600, skill_density=0.05, pdf_ratio=0.5):
+    """[(filename, bytes)] of synthetic resumes, a pdf_ratio share of them as PDF."""
+    rng = random.Random(seed)
+    files = []
+    for i in range(count):
+        text = resume_text(rng, words, skill_density)
+        if rng.random() < pdf_ratio:
+            files.append((f'resume-{seed}-{i}.pdf', text_pdf(text)))
+        else:
+            files.append((f'resume-{seed}-{i}.txt', text.encode('utf-8')))
+    return files
+
+
+# --- statistics ------------------------------------------------------------
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(1, rank)) - 1]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Latency percentiles (ms) and throughput for one measured operation."""
+    values = sorted(latencies)
+    ms = lambda v: round(v * 1000, 3) if v is not None else None  # noqa: E731
+    return {
+        'count': len(values),
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_per_second': round(len(values) / elapsed, 2) if elapsed else None,
+        'mean_ms': ms(sum(values) / len(values)) if values else None,
+        'p50_ms': ms(percentile(values, 50)),
+        'p95_ms': ms(percentile(values, 95)),
+        'p99_ms': ms(percentile(values, 99)),
+        'max_ms': ms(values[-1]) if values else None,
+    }
+
+
+# --- result files ----------------------------------------------------------
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except Exception:
+        return 'unknown'
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def write_results(suite, config, results, output=None):
+    """Write a result document and return its path."""
+    commit = git_commit()
+    now = datetime.now(timezone.utc)
+    doc = {
+        'suite': suite,
+        'commit': commit,
+        'timestamp': now.isoformat(timespec='seconds'),
+        'environment': environment(),
+        'config': config,
+        'results': results,
+    }
+    if output is None:
+        directory = os.path.join(RESULTS_DIR, suite)
+        os.makedirs(directory, exist_ok=True)
+        output = os.path.join(directory, f"{now.strftime('%Y%m%dT%H%M%SZ')}-{commit}.json")
+    with open(output, 'w') as f:
+        json.dump(doc, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return output
+
+
+def previous_result(suite, exclude):
+    """The newest stored result of a suite other than `exclude`, or None."""
+    directory = os.path.join(RESULTS_DIR, suite)
+    if not os.path.isdir(directory):
+        return None
+    paths = sorted(os.path.join(directory, n) for n in os.listdir(directory) if n.endswith('.json'))
+    paths = [p for p in paths if os.path.abspath(p) != os.path.abspath(exclude)]
+    return paths[-1] if paths else None
+
+
+def compare(baseline_path, current_path, metric='p95_ms', tolerance=0.10):
+    """Print per-operation changes of `metric`; returns the operations that regressed beyond tolerance."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+    print(f"{metric}: {baseline['commit']} ({baseline['timestamp']}) -> {current['commit']} ({current['timestamp']})")
+    regressions = []
+    for name, result in sorted(current['results'].items()):
+        before = baseline['results'].get(name, {}).get(metric)
+        after = result.get(metric)
+        if before is None or after is None:
+            print(f'  {name:28s} {"n/a":>10s} -> {after if after is not None else "n/a":>10}')
+            continue
+        change = (after - before) / before if before else 0.0
+        flag = ''
+        if change > tolerance:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f'  {name:28s} {before:10.3f} -> {after:10.3f}  {change:+7.1%}{flag}')
+    return regressions
+
+
+def print_table(results):
+    print(f"{'operation':28s} {'count':>7s} {'err':>5s} {'rps':>9s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for name, r in results.items():
+        print(f"{name:28s} {r['count']:7d} {r['errors']:5d} {r['throughput_per_second'] or 0:9.1f} "
+              f"{r['p50_ms'] or 0:9.2f} {r['p95_ms'] or 0:9.2f} {r['p99_ms'] or 0:9.2f}")
+
+
+class Stopwatch:
+    """Collect per-call latencies of a callable."""
+
+    def __init__(self):
+        self.latencies = []
+
+    def time(self, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.latencies.append(time.perf_counter() - start)
+        return result
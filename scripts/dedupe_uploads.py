@@ -0,0 +1,64 @@
+"""
+Move existing uploads into the content-addressed store.
+
+Hashes every file referenced by the resumes table, renames it to
+``<sha256><ext>`` (dropping byte-identical copies), and rewrites
+resumes.file_path / content_hash accordingly.
+
+Usage:
+    python scripts/dedupe_uploads.py [--dry-run]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import storage  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicate stored resume uploads by content hash.')
+    parser.add_argument('--db', default=os.path.join(ROOT, 'data.db'))
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    db = sqlite3.connect(args.db)
+    columns = [r[1] for r in db.execute('PRAGMA table_info(resumes)')]
+    if 'content_hash' not in columns and not args.dry_run:
+        db.execute('ALTER TABLE resumes ADD COLUMN content_hash TEXT')
+    rows = db.execute('SELECT id, filename, file_path FROM resumes').fetchall()
+    freed = 0
+    kept = set()
+    for resume_id, filename, file_path in rows:
+        # rows written on Windows hosts store backslash-separated paths
+        file_path = file_path.replace('\\', '/')
+        path = file_path if os.path.isabs(file_path) else os.path.join(ROOT, file_path)
+        if not os.path.exists(path):
+            print(f"resume {resume_id}: missing file {file_path}, skipped")
+            continue
+        content_hash = storage.hash_file(path)
+        saved_filename = storage.content_filename(content_hash, filename or path)
+        new_rel = os.path.join(os.path.dirname(file_path), saved_filename)
+        new_path = os.path.join(os.path.dirname(path), saved_filename)
+        if path != new_path:
+            if new_path in kept or os.path.exists(new_path):
+                freed += os.path.getsize(path)
+                if not args.dry_run:
+                    os.remove(path)
+            elif not args.dry_run:
+                os.replace(path, new_path)
+        kept.add(new_path)
+        print(f"resume {resume_id}: {file_path} -> {new_rel}")
+        if not args.dry_run:
+            db.execute('UPDATE resumes SET file_path = ?, content_hash = ? WHERE id = ?',
+                       (new_rel, content_hash, resume_id))
+    if not args.dry_run:
+        db.commit()
+    print(f"Done. {freed} bytes of duplicate uploads {'would be removed' if args.dry_run else 'removed'}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Compute embeddings for stored resumes that do not have any yet.
+
+Useful after bulk ingestion or when enabling semantic matching on an existing
+data.db. Encoding runs on CPU in batches of EMBED_BATCH_SIZE texts.
+
+Usage:
+    python scripts/embed_resumes.py [--db data.db] [--store data.embeddings] [--database-url URL]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import embeddings  # noqa: E402
+from connections import connect  # noqa: E402
+from db import migrate  # noqa: E402
+from repository import iter_resumes, open_repository  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Embed resumes missing from the embedding store.')
+    parser.add_argument('--db', default=os.path.join(ROOT, 'data.db'))
+    parser.add_argument('--store', default=os.path.join(ROOT, 'data.embeddings'))
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'),
+                        help='resume database (default: DATABASE_URL, else --db)')
+    args = parser.parse_args()
+
+    if not embeddings.available():
+        raise SystemExit('NumPy and sentence-transformers are required')
+    db = connect(args.db)
+    migrate(db)
+    repo = open_repository(args.database_url, args.db)
+    store = embeddings.EmbeddingStore(args.store)
+    embedded = {r[0] for r in db.execute('SELECT DISTINCT resume_id FROM embedding_rows')}
+    ids = sorted(r['id'] for r in iter_resumes(repo) if r['id'] not in embedded)
+    start = time.perf_counter()
+    done = embeddings.embed_resumes(store, db, repo, ids)
+    print(f'Embedded {done} resumes in {time.perf_counter() - start:.1f}s ({len(store)} rows in {args.store})')
+
+
+if __name__ == '__main__':
+    main()
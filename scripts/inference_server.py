@@ -0,0 +1,45 @@
+"""
+Inference sidecar: one process that owns the NLP models for all web workers.
+
+Workers set INFERENCE_SOCKET to the same path and send encode / nlp calls
+over the Unix socket; concurrent encode requests are batched.
+
+Usage:
+    python scripts/inference_server.py --socket /tmp/skill-matcher-inference.sock
+    INFERENCE_SOCKET=/tmp/skill-matcher-inference.sock gunicorn -w 4 app:app
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import inference  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the NLP models to web workers over a Unix socket.')
+    parser.add_argument('--socket', default=inference.INFERENCE_SOCKET or '/tmp/skill-matcher-inference.sock')
+    parser.add_argument('--max-batch', type=int, default=inference.INFERENCE_MAX_BATCH,
+                        help='texts per model batch')
+    parser.add_argument('--batch-wait', type=float, default=inference.INFERENCE_BATCH_WAIT,
+                        help='seconds to wait for more requests before running a batch')
+    parser.add_argument('--no-warmup', action='store_true', help='load models on first request instead')
+    args = parser.parse_args()
+
+    # this process serves the models itself, never a remote sidecar
+    inference.INFERENCE_SOCKET = None
+    if not args.no_warmup:
+        print('Models ready:', ', '.join(inference.warm_up()) or 'none')
+    server = inference.InferenceServer(args.socket, inference.EncodeBatcher(args.max_batch, args.batch_wait))
+    print('Inference sidecar listening on', args.socket)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Load test of the HTTP API: latency percentiles and throughput under concurrency.
+
+Drives the app either in-process (Flask test client against a throwaway
+DATA_DIR, nothing touches data.db) or over HTTP against a running server.
+Each worker thread signs up and logs in its own user, then the suite seeds
+synthetic resumes and measures, one endpoint at a time:
+
+    upload      POST /api/upload-resume (every file distinct, so no cache hits)
+    analysis    GET  /api/resume/<id>/analysis
+    roadmap     GET  /api/roadmap?resume_id=<id>
+    interview   GET  /api/interview-questions?resume_id=<id>
+    list        GET  /api/resumes
+    download    GET  /api/resume/<id>/download (try --concurrency 100 against nginx)
+
+Results go to benchmarks/api/<time>-<commit>.json; --compare checks them
+against an earlier file (or "previous" for the newest stored run) and exits
+non-zero when an endpoint's p95 regressed by more than --tolerance.
+
+Usage:
+    python scripts/loadtest.py [--requests 200] [--concurrency 8] [--seed-resumes 50]
+                               [--words 400] [--skill-density 0.05] [--pdf-ratio 0.5]
+    python scripts/loadtest.py --target http://127.0.0.1:5000 --compare previous
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import benchlib
+
+ENDPOINTS = ('upload', 'analysis', 'roadmap', 'interview', 'list', 'download')
+
+
+class InProcessClient:
+    """One logged-in user on a Flask test client."""
+
+    def __init__(self, flask_app):
+        self.client = flask_app.test_client()
+
+    def login(self, email, password):
+        self.client.post('/api/signup', json={'email': email, 'password': password, 'name': 'Load Test'})
+        return self.client.post('/api/login', json={'email': email, 'password': password}).status_code
+
+    def get(self, path):
+        return self.client.get(path).status_code
+
+    def upload(self, filename, data):
+        import io
+        r = self.client.post('/api/upload-resume', data={'file': (io.BytesIO(data), filename)},
+                             content_type='multipart/form-data')
+        return r.status_code, (r.get_json(silent=True) or {})
+
+
+class HTTPClient:
+    """One logged-in user on a requests session."""
+
+    def __init__(self, base):
+        import requests
+        self.base = base.rstrip('/')
+        self.session = requests.Session()
+
+    def login(self, email, password):
+        self.session.post(self.base + '/api/signup', json={'email': email, 'password': password, 'name': 'Load Test'})
+        return self.session.post(self.base + '/api/login', json={'email': email, 'password': password}).status_code
+
+    def get(self, path):
+        return self.session.get(self.base + path).status_code
+
+    def upload(self, filename, data):
+        r = self.session.post(self.base + '/api/upload-resume', files={'file': (filename, data)})
+        try:
+            return r.status_code, r.json()
+        except ValueError:
+            return r.status_code, {}
+
+
+def make_clients(args):
+    if args.target == 'inprocess':
+        data_dir = tempfile.mkdtemp(prefix='loadtest-')
+        os.environ['DATA_DIR'] = data_dir
+        os.environ['UPLOAD_FOLDER'] = os.path.join(data_dir, 'uploads')
+        os.environ.setdefault('ASYNC_EXTRACTION', '0')
+        from app import create_app
+        flask_app = create_app()
+        factory = lambda: InProcessClient(flask_app)  # noqa: E731
+    else:
+        factory = lambda: HTTPClient(args.target)  # noqa: E731
+    password = 'LoadTest-1234'
+    clients = []
+    for i in range(args.concurrency):
+        client = factory()
+        status = client.login(f'loadtest-{uuid.uuid4().hex[:12]}@example.com', password)
+        if status != 200:
+            raise SystemExit(f'login failed with HTTP {status}')
+        clients.append(client)
+    return clients
+
+
+def run_phase(clients, total, operation):
+    """Run `total` calls of operation(client, i) spread over the clients; returns a summary."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker(client):
+        local = []
+        failed = 0
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            start = time.perf_counter()
+            try:
+                ok = operation(client, i)
+            except Exception:
+                ok = False
+            local.append(time.perf_counter() - start)
+            if not ok:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(c,)) for c in clients]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return benchlib.summarize(latencies, time.perf_counter() - start, errors[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latency/throughput benchmark of the HTTP API.')
+    parser.add_argument('--target', default='inprocess', help='"inprocess" (default) or a base URL')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed-resumes', type=int, default=50, help='resumes uploaded before measuring reads')
+    parser.add_argument('--words', type=int, default=400, help='words per synthetic resume')
+    parser.add_argument('--skill-density', type=float, default=0.05, help='share of words that are skills')
+    parser.add_argument('--pdf-ratio', type=float, default=0.5, help='share of resumes generated as PDF')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--seed', type=int, default=1, help='random seed for generated resumes and ids')
+    parser.add_argument('--output', help='result file (default: benchmarks/api/<time>-<commit>.json)')
+    parser.add_argument('--compare', help='baseline result file, or "previous"')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed p95 slowdown for --compare')
+    args = parser.parse_args()
+    endpoints = [e for e in args.endpoints.split(',') if e]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoint(s): {', '.join(sorted(unknown))}")
+
+    clients = make_clients(args)
+    ids = []
+
+    def upload_files(seed, count):
+        return benchlib.resume_files(seed, count, args.words, args.skill_density, args.pdf_ratio)
+
+    def upload_op(files):
+        def op(client, i):
+            status, body = client.upload(*files[i])
+            if status == 200 and body.get('resume_id'):
+                with ids_lock:
+                    ids.append(body['resume_id'])
+                return True
+            return False
+        return op
+
+    ids_lock = threading.Lock()
+    print(f'seeding {args.seed_resumes} resumes ...', file=sys.stderr)
+    run_phase(clients, args.seed_resumes, upload_op(upload_files(args.seed * 1000 + 1, args.seed_resumes)))
+    if not ids:
+        raise SystemExit('seeding failed: no resume was stored')
+    rng = random.Random(args.seed)
+    picks = [rng.choice(ids) for _ in range(args.requests)]
+    reads = {
+        'analysis': lambda c, i: c.get(f'/api/resume/{picks[i]}/analysis') < 400,
+        'roadmap': lambda c, i: c.get(f'/api/roadmap?resume_id={picks[i]}') < 400,
+        'interview': lambda c, i: c.get(f'/api/interview-questions?resume_id={picks[i]}') < 400,
+        'list': lambda c, i: c.get('/api/resumes?limit=50') < 400,
+        'download': lambda c, i: c.get(f'/api/resume/{picks[i]}/download') < 400,
+    }
+
+    results = {}
+    for endpoint in endpoints:
+        print(f'measuring {endpoint} ...', file=sys.stderr)
+        if endpoint == 'upload':
+            operation = upload_op(upload_files(args.seed * 1000 + 2, args.requests))
+        else:
+            operation = reads[endpoint]
+        results[endpoint] = run_phase(clients, args.requests, operation)
+
+    config = {k: v for k, v in vars(args).items() if k not in ('output', 'compare', 'tolerance')}
+    path = benchlib.write_results('api', config, results, args.output)
+    benchlib.print_table(results)
+    print(f'results written to {path}')
+    if args.compare:
+        baseline = benchlib.previous_result('api', path) if args.compare == 'previous' else args.compare
+        if baseline is None:
+            print('no earlier result to compare with')
+        elif benchlib.compare(baseline, path, tolerance=args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
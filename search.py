@@ -0,0 +1,155 @@
+"""
+Inverted skill index for candidate search.
+
+``resume_skills`` is the normalized (resume_id, skill) table in data.db; the
+in-memory ``SkillIndex`` mirrors it as skill -> posting list of resume ids and
+is kept current incrementally, so ranking every resume against a job's skill
+list only touches the postings of the requested skills.
+
+Every write of a resume's skill rows (upload, backfill, re-extraction) gives
+the resume a new ``resumes.skills_seq``; ``SkillIndex.refresh`` reloads the
+resumes whose sequence number is above the highest one it has seen.
+"""
+import heapq
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from matching import analyze_match, candidate_skill_list
+
+
+# seconds a skipped skills_seq is looked for again: PostgreSQL assigns sequence
+# numbers before commit, so a gap may be a transaction still in flight
+SKILL_SEQ_GAP_TIMEOUT = float(os.environ.get('SKILL_SEQ_GAP_TIMEOUT', 60))
+MAX_SKILL_SEQ_GAPS = 10000
+# SQLite's next skills_seq; statements run under the write lock, so it is unique
+NEXT_SKILLS_SEQ = '(SELECT COALESCE(MAX(skills_seq), 0) + 1 FROM resumes)'
+
+
+def init_index(db):
+    """Create the resume_skills table if it does not exist."""
+    db.execute('''CREATE TABLE IF NOT EXISTS resume_skills (
+        resume_id INTEGER NOT NULL,
+        skill TEXT NOT NULL,
+        PRIMARY KEY (resume_id, skill)
+    ) WITHOUT ROWID''')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_resume_skills_skill ON resume_skills (skill)')
+
+
+def normalized_skills(skills):
+    """Return the distinct lowercased candidate skills of an extracted_skills dict."""
+    return {s.lower() for s in candidate_skill_list(skills)}
+
+
+def skill_rows(resume_id, skills):
+    """Rows for resume_skills describing one resume."""
+    return [(resume_id, skill) for skill in normalized_skills(skills)]
+
+
+def index_resume(db, resume_id, skills):
+    """Write a resume's skills to resume_skills (caller commits)."""
+    db.executemany('INSERT OR IGNORE INTO resume_skills (resume_id, skill) VALUES (?, ?)', skill_rows(resume_id, skills))
+
+
+def backfill_index(db):
+    """Index resumes stored before resume_skills existed; returns the number indexed."""
+    rows = db.execute('''SELECT r.id, r.extracted_skills FROM resumes r
+        WHERE NOT EXISTS (SELECT 1 FROM resume_skills s WHERE s.resume_id = r.id)''').fetchall()
+    for resume_id, extracted in rows:
+        index_resume(db, resume_id, json.loads(extracted) if extracted else {})
+        db.execute(f'UPDATE resumes SET skills_seq = {NEXT_SKILLS_SEQ} WHERE id = ?', (resume_id,))
+    db.commit()
+    return len(rows)
+
+
+class SkillIndex:
+    """In-memory inverted index: skill -> set of resume ids, plus the forward map."""
+
+    def __init__(self):
+        self._postings = {}
+        self._skills = {}
+        self._last_seq = 0
+        self._loaded = False
+        self._gaps = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._skills)
+
+    def add(self, resume_id, skills):
+        """Index one resume given its normalized skill set."""
+        skills = frozenset(skills)
+        with self._lock:
+            for skill in self._skills.get(resume_id, ()):
+                self._postings[skill].discard(resume_id)
+            self._skills[resume_id] = skills
+            for skill in skills:
+                self._postings.setdefault(skill, set()).add(resume_id)
+
+    def remove(self, resume_id):
+        """Drop a resume from the index."""
+        with self._lock:
+            for skill in self._skills.pop(resume_id, ()):
+                self._postings[skill].discard(resume_id)
+
+    def refresh(self, repo):
+        """Reload the resumes whose skills were written since the last refresh (here or by other workers).
+
+        Returns the number of resumes reloaded.
+        """
+        with self._refresh_lock:
+            now = time.monotonic()
+            self._gaps = {seq: seen for seq, seen in self._gaps.items() if now - seen < SKILL_SEQ_GAP_TIMEOUT}
+            grouped = {}
+            accepted = set()
+            for seq, resume_id, skill in repo.skill_changes_after(min(self._gaps, default=self._last_seq + 1) - 1):
+                if seq not in accepted:
+                    if seq > self._last_seq:
+                        # numbers missing below the first load are superseded writes, not
+                        # transactions in flight; only gaps above a seen watermark are tracked
+                        if self._loaded:
+                            first = max(self._last_seq + 1, seq - MAX_SKILL_SEQ_GAPS)
+                            self._gaps.update(dict.fromkeys(range(first, seq), now))
+                        self._last_seq = seq
+                    elif self._gaps.pop(seq, None) is None:
+                        continue  # loaded by an earlier refresh
+                    accepted.add(seq)
+                    grouped[resume_id] = set()
+                if skill is not None:
+                    grouped[resume_id].add(skill)
+            # only refresh() advances the watermark, so rows committed by other
+            # workers are never skipped because of a local add()
+            for resume_id, skills in grouped.items():
+                if skills:
+                    self.add(resume_id, skills)
+                else:
+                    self.remove(resume_id)
+            self._loaded = True
+            return len(grouped)
+
+    def skills_of(self, resume_id):
+        """Return the indexed skill set of a resume."""
+        return self._skills.get(resume_id, frozenset())
+
+    def search(self, job_skills, limit=20):
+        """Rank resumes against job_skills with analyze_match semantics.
+
+        Returns (total_matching_resumes, [(resume_id, match_result), ...]) for
+        the top `limit` resumes by match percentage (ties: newest first).
+        Resumes matching none of the job skills are not returned.
+        """
+        job_set = {s.lower() for s in job_skills}
+        if not job_set:
+            return 0, []
+        counts = Counter()
+        with self._lock:
+            for skill in job_set:
+                postings = self._postings.get(skill)
+                if postings:
+                    counts.update(postings)
+            top = heapq.nlargest(limit, counts.items(), key=lambda item: (item[1], item[0]))
+            results = [(resume_id, analyze_match(self._skills[resume_id], job_set)) for resume_id, _count in top]
+        return len(counts), results
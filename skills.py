@@ -0,0 +1,379 @@
+"""
+Skill taxonomy and single-pass skill matcher.
+
+The matcher is an Aho-Corasick automaton compiled once from the taxonomy
+(canonical names plus aliases). A resume is scanned in one linear pass and
+every hit is checked against word boundaries, so "Java" no longer matches
+inside "JavaScript" and "Git" no longer matches inside "digit".
+
+Certifications are a separate stage (``CertificationExtractor``): a catalog
+of known certifications on the same kind of automaton, plus short phrases
+next to "certified" / "certification" for ones the catalog does not know.
+Each such phrase is read from a bounded window, so the whole stage stays
+linear in the length of the resume.
+"""
+import hashlib
+import json
+import os
+import re
+from collections import deque
+
+
+# Built-in taxonomy, used when SKILL_TAXONOMY_PATH is not set
+TECH_SKILLS = ["Python", "JavaScript", "Java", "C++", "React", "Node.js", "SQL", "MongoDB", "AWS", "Docker", "Kubernetes", "Git", "DevOps", "Agile", "Scrum"]
+SOFT_SKILLS = ["Leadership", "Communication", "Teamwork", "Problem Solving", "Critical Thinking", "Adaptability", "Time Management", "Project Management", "Creativity", "Analytical Thinking"]
+SKILL_ALIASES = {
+    "Kubernetes": ["k8s"],
+    "Node.js": ["nodejs", "node js"],
+    "JavaScript": ["ecmascript"],
+    "MongoDB": ["mongo db"],
+    "Teamwork": ["team work"],
+    "Problem Solving": ["problem-solving"],
+    "Critical Thinking": ["critical-thinking"],
+}
+# Known certifications (canonical name -> aliases); a taxonomy file may replace them with a "certifications" list
+CERTIFICATIONS = {
+    "AWS Certified Cloud Practitioner": ["aws cloud practitioner"],
+    "AWS Certified Solutions Architect": ["aws solutions architect"],
+    "AWS Certified Developer": ["aws developer associate"],
+    "AWS Certified SysOps Administrator": ["aws sysops administrator"],
+    "AWS Certified DevOps Engineer": ["aws devops engineer"],
+    "Azure Fundamentals": ["az-900"],
+    "Azure Administrator Associate": ["az-104", "azure administrator"],
+    "Azure Solutions Architect Expert": ["az-305", "azure solutions architect"],
+    "Google Cloud Professional Cloud Architect": ["professional cloud architect"],
+    "Certified Kubernetes Administrator": ["cka"],
+    "Certified Kubernetes Application Developer": ["ckad"],
+    "Certified Kubernetes Security Specialist": ["cks"],
+    "HashiCorp Terraform Associate": ["terraform associate"],
+    "Project Management Professional": ["pmp"],
+    "Certified Associate in Project Management": ["capm"],
+    "PRINCE2": [],
+    "Certified ScrumMaster": ["csm", "certified scrum master"],
+    "Professional Scrum Master": ["psm"],
+    "SAFe Agilist": [],
+    "CISSP": ["certified information systems security professional"],
+    "CISM": ["certified information security manager"],
+    "CISA": ["certified information systems auditor"],
+    "CompTIA Security+": ["security+"],
+    "CompTIA Network+": ["network+"],
+    "CompTIA A+": [],
+    "CCNA": ["cisco certified network associate"],
+    "CCNP": ["cisco certified network professional"],
+    "ITIL": [],
+    "Oracle Certified Java Programmer": ["ocpjp", "ocajp"],
+    "Six Sigma Green Belt": [],
+    "Six Sigma Black Belt": [],
+    "Certified Public Accountant": ["cpa"],
+    "Chartered Financial Analyst": ["cfa"],
+}
+# Unknown certifications: at most CERT_PHRASE_WORDS words, read from CERT_WINDOW chars next to the keyword
+CERT_PHRASE_WORDS = 6
+CERT_WINDOW = 80
+_CERT_KEYWORD = re.compile(r'\bcertif(?:ied|ications?)\b(\s+in\b)?', re.IGNORECASE)
+_PHRASE_STOPWORDS = frozenset(('and', 'or', 'with', 'from', 'since', 'by', 'at', 'for', 'in', 'on', 'via', 'as',
+                               'the', 'a', 'an', 'my', 'our', 'of', 'to', 'is', 'am', 'are', 'was', 'be', 'been'))
+_PHRASE_END = ',;:.!?()[]{}|"\'\u2022'
+
+
+def _normalize(text):
+    """Lowercase text and collapse whitespace runs to single spaces."""
+    return ' '.join(text.lower().split())
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over normalized skill names and aliases."""
+
+    def __init__(self, categories, aliases=None):
+        """Compile the automaton.
+
+        categories maps a category key (e.g. 'technical_skills') to an ordered
+        list of canonical skill names; aliases maps a canonical name to a list
+        of alternative spellings.
+        """
+        aliases = aliases or {}
+        self.categories = list(categories)
+        # canonical skills in taxonomy order: (category, name)
+        self.skills = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._patterns = []
+        seen = {}
+        for category in self.categories:
+            for name in categories[category]:
+                if name in seen:
+                    continue
+                seen[name] = len(self.skills)
+                self.skills.append((category, name))
+        for name, skill_id in seen.items():
+            for pattern in [name] + list(aliases.get(name, [])):
+                self._add(_normalize(pattern), skill_id)
+        self.max_pattern_length = max((len(p) for p, _ in self._patterns), default=0)
+        self._build()
+        # lazily filled full transition table: state -> {char: state}
+        self._delta = [dict(g) for g in self._goto]
+
+    def __len__(self):
+        return len(self.skills)
+
+    def fingerprint(self):
+        """Short digest of the compiled taxonomy, used to version cached results."""
+        digest = hashlib.sha256(json.dumps([self.skills, self._patterns]).encode('utf-8'))
+        return digest.hexdigest()[:12]
+
+    def _add(self, pattern, skill_id):
+        if not pattern:
+            return
+        self._patterns.append((pattern, skill_id))
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        left = _is_word_char(pattern[0])
+        right = _is_word_char(pattern[-1])
+        self._out[state] = self._out[state] + ((len(pattern), skill_id, left, right),)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _step(self, state, ch):
+        nxt = self._delta[state].get(ch)
+        if nxt is not None:
+            return nxt
+        s = state
+        while s and ch not in self._goto[s]:
+            s = self._fail[s]
+        nxt = self._goto[s].get(ch, 0)
+        self._delta[state][ch] = nxt
+        return nxt
+
+    def find_ids(self, text, found=None, min_start=0):
+        """Return the set of skill ids found in text (one linear pass).
+
+        Hits starting before min_start (in normalized text) are ignored; used
+        when text is prefixed with context that was already scanned.
+        """
+        found = set() if found is None else found
+        s = _normalize(text)
+        n = len(s)
+        out = self._out
+        delta = self._delta
+        state = 0
+        for i, ch in enumerate(s):
+            nxt = delta[state].get(ch)
+            state = nxt if nxt is not None else self._step(state, ch)
+            hits = out[state]
+            if not hits:
+                continue
+            for length, skill_id, left, right in hits:
+                if skill_id in found:
+                    continue
+                start = i - length + 1
+                if start < min_start:
+                    continue
+                if left and start > 0 and _is_word_char(s[start - 1]):
+                    continue
+                if right and i + 1 < n and _is_word_char(s[i + 1]):
+                    continue
+                found.add(skill_id)
+        return found
+
+    def group(self, skill_ids):
+        """Group skill ids into {category: [names]} in taxonomy order."""
+        grouped = {category: [] for category in self.categories}
+        for skill_id in sorted(skill_ids):
+            category, name = self.skills[skill_id]
+            grouped[category].append(name)
+        return grouped
+
+    def find(self, text):
+        """Return {category: [canonical names]} for every skill found in text."""
+        return self.group(self.find_ids(text))
+
+    def find_pages(self, pages, found=None):
+        """Match an iterable of page texts incrementally, yielding the growing id set.
+
+        Equivalent to find_ids("\\n".join(pages)): each page is scanned with the
+        normalized tail of the previous page so skills split across a page
+        break are still found.
+        """
+        found = set() if found is None else found
+        keep = self.max_pattern_length + 1
+        tail = ''
+        truncated = False
+        for page in pages:
+            # index 0 of a truncated tail is only boundary context, never a match start
+            self.find_ids(tail + ' ' + page if tail else page, found, min_start=1 if truncated else 0)
+            joined = _normalize(tail + ' ' + page)
+            truncated = truncated or len(joined) > keep
+            tail = joined[-keep:]
+            yield found
+
+
+def load_taxonomy(path):
+    """Load a taxonomy JSON file.
+
+    Expected shape: {"technical_skills": [...], "soft_skills": [...]} where each
+    entry is either a name or {"name": ..., "aliases": [...]}.
+    Returns (categories, aliases).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    categories = {}
+    aliases = {}
+    for category, entries in data.items():
+        names = []
+        for entry in entries:
+            if isinstance(entry, str):
+                names.append(entry)
+                continue
+            names.append(entry['name'])
+            if entry.get('aliases'):
+                aliases.setdefault(entry['name'], []).extend(entry['aliases'])
+        categories[category] = names
+    return categories, aliases
+
+
+def build_matcher(path=None):
+    """Build the matcher from a taxonomy file, or from the built-in lists."""
+    if path:
+        try:
+            categories, aliases = load_taxonomy(path)
+            categories.pop('certifications', None)
+            categories.setdefault('technical_skills', [])
+            categories.setdefault('soft_skills', [])
+            return SkillMatcher(categories, aliases)
+        except Exception as e:
+            print(f"Failed to load skill taxonomy {path}, using built-in lists: {e}")
+    return SkillMatcher({'technical_skills': TECH_SKILLS, 'soft_skills': SOFT_SKILLS}, SKILL_ALIASES)
+
+
+def _phrase_token(token):
+    return token.strip(_PHRASE_END)
+
+
+def _is_name_token(token):
+    return token[:1].isupper() or token[:1].isdigit()
+
+
+class CertificationExtractor:
+    """Catalog matcher plus bounded keyword phrases; one linear pass over the text each."""
+
+    def __init__(self, catalog):
+        self.matcher = SkillMatcher({'certifications': list(catalog)}, catalog)
+        # per catalog id: normalized canonical name and aliases, to drop phrases that repeat a catalog hit
+        self._spellings = [[_normalize(name)] + [_normalize(a) for a in catalog.get(name, [])]
+                           for _category, name in self.matcher.skills]
+        self._canonical = {spelling: self.matcher.skills[i][1]
+                           for i, spellings in enumerate(self._spellings) for spelling in spellings}
+
+    def fingerprint(self):
+        return self.matcher.fingerprint()
+
+    def _before(self, text, start):
+        """'AWS Solutions Architect' in 'Holds an AWS Solutions Architect certification'."""
+        lo = max(0, start - CERT_WINDOW)
+        newline = text.rfind('\n', lo, start)
+        window = text[newline + 1 if newline >= 0 else lo:start]
+        tokens = window.split()
+        if newline < 0 and lo > 0 and tokens and not text[lo - 1].isspace():
+            tokens = tokens[1:]  # cut mid-word by the window
+        words = []
+        for raw in reversed(tokens[-CERT_PHRASE_WORDS:]):
+            token = _phrase_token(raw)
+            if not token or (words and raw[-1] in _PHRASE_END) or not _is_name_token(token):
+                break
+            words.append(token)
+            if raw[0] in _PHRASE_END:
+                break
+        return ' '.join(reversed(words))
+
+    def _after(self, text, end):
+        """'project management' in 'certified in project management and Agile'."""
+        newline = text.find('\n', end, end + CERT_WINDOW)
+        window = text[end:newline if newline >= 0 else end + CERT_WINDOW]
+        tokens = window.split()
+        if newline < 0 and end + CERT_WINDOW < len(text) and tokens and not window[-1].isspace():
+            tokens = tokens[:-1]
+        words = []
+        for raw in tokens[:CERT_PHRASE_WORDS]:
+            token = _phrase_token(raw)
+            if not token or token.lower() in _PHRASE_STOPWORDS or (len(token) == 4 and token.isdigit()):
+                break
+            words.append(token)
+            if raw[-1] in _PHRASE_END:
+                break
+        return ' '.join(words)
+
+    def extract(self, text):
+        """Known certifications (catalog order), then other certification phrases (text order), deduplicated."""
+        found = self.matcher.find_ids(text)
+        result = [self.matcher.skills[i][1] for i in sorted(found)]
+        known = [spelling for i in found for spelling in self._spellings[i]]
+        seen = {name.lower() for name in result}
+        for m in _CERT_KEYWORD.finditer(text):
+            phrase = self._after(text, m.end()) if m.group(1) else self._before(text, m.start())
+            key = ' '.join(phrase.lower().split())
+            if not key or key in seen:
+                continue
+            if key in self._canonical or any(key in k or k in key for k in known):
+                continue  # same certification as a catalog hit, e.g. "AWS" in "AWS Certified Solutions Architect"
+            seen.add(key)
+            result.append(phrase)
+        return result
+
+
+def build_certification_extractor(path=None):
+    """Build the certification stage from a taxonomy file's "certifications" list, or the built-in catalog."""
+    if path:
+        try:
+            categories, aliases = load_taxonomy(path)
+            if categories.get('certifications'):
+                names = categories['certifications']
+                return CertificationExtractor({name: aliases.get(name, []) for name in names})
+        except Exception as e:
+            print(f"Failed to load certifications from {path}, using the built-in catalog: {e}")
+    return CertificationExtractor(CERTIFICATIONS)
+
+
+# Compiled once at import; shared by all requests
+skill_matcher = build_matcher(os.environ.get('SKILL_TAXONOMY_PATH'))
+certification_extractor = build_certification_extractor(os.environ.get('SKILL_TAXONOMY_PATH'))
+# Bump the prefix whenever extract_skills changes behaviour; the suffixes track the taxonomy and catalog
+EXTRACTOR_VERSION = f"simple-2:{skill_matcher.fingerprint()}:{certification_extractor.fingerprint()}"
+
+
+def extract_certifications(text):
+    """Extract certifications from text: catalog matches, then phrases next to "certified"/"certification"."""
+    return certification_extractor.extract(text)
+
+
+def skills_result(found, certifications):
+    """Build the extract_skills payload from matcher output and certifications."""
+    return {"technical_skills": found['technical_skills'], "soft_skills": found['soft_skills'], "certifications": certifications}
+
+
+def extract_skills(text):
+    """Extract technical skills, soft skills, and certifications from text."""
+    return skills_result(skill_matcher.find(text), extract_certifications(text))
@@ -12,6 +12,7 @@ let currentRole = 'candidate';
 let uploadProgress = 0;
 let lastUploadedResumeId = null;
 let realtimeEventSource = null;
+let realtimeLastEventId = null;
 let realtimeReconnectAttempts = 0;
 
 function initApp() {
@@ -42,7 +43,8 @@ function connectToRealtimeStream() {
     if (realtimeEventSource) return;
     function createSource() {
         try {
-            realtimeEventSource = new EventSource('/stream');
+            // manual reconnects create a new EventSource, so pass the last seen id for replay
+            realtimeEventSource = new EventSource(realtimeLastEventId ? '/stream?last_event_id=' + encodeURIComponent(realtimeLastEventId) : '/stream');
         } catch (err) {
             console.error('EventSource creation failed', err);
             scheduleReconnect();
@@ -50,14 +52,18 @@ function connectToRealtimeStream() {
         }
         realtimeEventSource.onopen = function() { realtimeReconnectAttempts = 0; showNotification('Real-time connection established', 'success'); };
         realtimeEventSource.onmessage = function(event) {
+            if (event.lastEventId) realtimeLastEventId = event.lastEventId;
             let msg = event.data;
             try { msg = JSON.parse(msg.replace(/'/g, '"')); } catch (e) {}
             try {
-                if (msg && msg.type === 'resume_uploaded') {
+                if (msg && (msg.type === 'resume_uploaded' || msg.type === 'resume_processed')) {
                     showNotification('New resume uploaded: ' + (msg.filename || 'file'), 'info');
                     const info = document.getElementById('uploaded-file-info');
                     if (info && msg.filename) info.textContent = msg.filename;
                     loadRecentUploads();
+                } else if (msg && (msg.type === 'events_dropped' || msg.type === 'replay_incomplete')) {
+                    // some updates were missed; refresh instead of replaying them
+                    loadRecentUploads();
                 } else {
                     showNotification('Real-time update: ' + (msg.update || JSON.stringify(msg)), 'info');
                 }
@@ -615,7 +621,8 @@ function initializeDashboard() {
     }
 
     // Otherwise try to fetch the latest resume and its analysis from the server so the dashboard is dynamic
-    fetch('/api/resumes')
+    // only the newest resume is needed here
+    fetch('/api/resumes?limit=1')
         .then(r => r.json())
         .then(listResp => {
             const resumes = listResp && listResp.resumes ? listResp.resumes : [];
@@ -0,0 +1,167 @@
+"""
+Content-addressed upload store and extraction cache.
+
+Uploads are hashed (SHA-256) while they stream to disk and kept once per
+distinct content under ``<sha256><ext>``. Extraction results are cached in
+SQLite keyed by (content hash, extractor version), so a repeat upload of the
+same bytes skips PDF parsing and skill extraction entirely.
+
+Resume text is kept compressed in ``resume_texts`` (zstd when the
+``zstandard`` package is installed, else zlib), out of the hot ``resumes``
+table, and only read when a caller asks for it. The extraction cache stores
+its copy of the text with the same codec.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from datetime import datetime
+
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+
+CHUNK_SIZE = 64 * 1024
+TEXT_CODEC = 'zstd' if zstandard is not None else 'zlib'
+TEXT_COMPRESSION_LEVEL = 6
+
+
+def content_filename(content_hash, original_filename):
+    """Return the on-disk name for a blob: hash plus the original extension."""
+    ext = os.path.splitext(original_filename)[1].lower()
+    return f"{content_hash}{ext}"
+
+
+def save_upload(stream, upload_folder, original_filename):
+    """Stream an upload to the content-addressed store.
+
+    Returns (content_hash, file_path, saved_filename). If a blob with the same
+    content already exists the freshly written copy is discarded.
+    """
+    hasher = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=upload_folder, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                out.write(chunk)
+        # mkstemp creates 0600 files; match what a plain save would produce
+        os.chmod(tmp_path, 0o644)
+        content_hash = hasher.hexdigest()
+        saved_filename = content_filename(content_hash, original_filename)
+        file_path = os.path.join(upload_folder, saved_filename)
+        if os.path.exists(file_path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return content_hash, file_path, saved_filename
+
+
+def hash_file(file_path):
+    """Return the SHA-256 hex digest of a file on disk."""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def init_cache(db):
+    """Create the extraction cache table if it does not exist."""
+    db.execute('''CREATE TABLE IF NOT EXISTS extraction_cache (
+        content_hash TEXT NOT NULL,
+        extractor_version TEXT NOT NULL,
+        extracted_text TEXT,
+        extracted_skills TEXT,
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (content_hash, extractor_version)
+    )''')
+    columns = [r[1] for r in db.execute('PRAGMA table_info(extraction_cache)')]
+    if 'text_codec' not in columns:
+        # the text compressed as in resume_texts; extracted_text is only set on rows from before
+        db.execute('ALTER TABLE extraction_cache ADD COLUMN text_codec TEXT')
+        db.execute('ALTER TABLE extraction_cache ADD COLUMN text_body BLOB')
+
+
+def get_cached_extraction(db, content_hash, extractor_version):
+    """Return (text, skills) for a cached extraction, or None."""
+    row = db.execute(
+        'SELECT extracted_text, extracted_skills, text_codec, text_body FROM extraction_cache '
+        'WHERE content_hash = ? AND extractor_version = ?',
+        (content_hash, extractor_version)
+    ).fetchone()
+    if row is None:
+        return None
+    text = decompress_text(row[2], row[3]) if row[3] is not None else row[0]
+    return text or '', json.loads(row[1]) if row[1] else {}
+
+
+def put_cached_extraction(db, content_hash, extractor_version, text, skills):
+    """Store an extraction result, its text compressed (caller commits)."""
+    codec, body = compress_text(text) if text is not None else (None, None)
+    db.execute(
+        'INSERT OR REPLACE INTO extraction_cache (content_hash, extractor_version, extracted_skills, text_codec, '
+        'text_body, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+        (content_hash, extractor_version, json.dumps(skills), codec, body, datetime.utcnow().isoformat())
+    )
+
+
+def compress_cached_texts(db, batch_size=500):
+    """Compress the plain extracted_text of older cache rows into text_codec/text_body (caller commits)."""
+    while True:
+        rows = db.execute('SELECT rowid, extracted_text FROM extraction_cache WHERE extracted_text IS NOT NULL '
+                          'LIMIT ?', (batch_size,)).fetchall()
+        if not rows:
+            break
+        db.executemany('UPDATE extraction_cache SET text_codec = ?, text_body = ?, extracted_text = NULL '
+                       'WHERE rowid = ?', [(*compress_text(text), rowid) for rowid, text in rows])
+
+
+def init_texts(db):
+    """Create the compressed resume text table if it does not exist."""
+    db.execute('''CREATE TABLE IF NOT EXISTS resume_texts (
+        resume_id INTEGER PRIMARY KEY,
+        codec TEXT NOT NULL,
+        body BLOB NOT NULL
+    )''')
+
+
+def compress_text(text, codec=TEXT_CODEC):
+    """Return (codec, compressed bytes) for a text."""
+    data = text.encode('utf-8')
+    if codec == 'zstd':
+        return codec, zstandard.ZstdCompressor(level=TEXT_COMPRESSION_LEVEL).compress(data)
+    return 'zlib', zlib.compress(data, TEXT_COMPRESSION_LEVEL)
+
+
+def decompress_text(codec, body):
+    """Inverse of compress_text."""
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('zstandard is required to read zstd-compressed resume text')
+        data = zstandard.ZstdDecompressor().decompress(body)
+    else:
+        data = zlib.decompress(body)
+    return data.decode('utf-8')
+
+
+def put_resume_texts(db, items):
+    """Store (resume_id, text) pairs compressed; None texts are skipped (caller commits)."""
+    db.executemany('INSERT OR REPLACE INTO resume_texts (resume_id, codec, body) VALUES (?, ?, ?)',
+                   [(resume_id, *compress_text(text)) for resume_id, text in items if text is not None])
+
+
+def get_resume_text(db, resume_id):
+    """Return the stored text of a resume, or None if it has none."""
+    row = db.execute('SELECT codec, body FROM resume_texts WHERE resume_id = ?', (resume_id,)).fetchone()
+    return decompress_text(row[0], row[1]) if row else None
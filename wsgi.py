@@ -0,0 +1,7 @@
+"""
+WSGI entry point: ``gunicorn -c gunicorn.conf.py`` with GUNICORN_WORKER_CLASS=gthread,
+or any WSGI server. The default production setup serves asgi.py instead.
+"""
+from app import create_app
+
+app = create_app()